@@ -1,12 +1,24 @@
 import streamlit as st
-import pdfplumber
-import docx
-import re
 import pandas as pd
 from collections import Counter
 import plotly.express as px
 import plotly.graph_objects as go
+import time
 from io import BytesIO
+from ats.aggregates import SCORE_BINS, get_pipeline_stats
+from ats.batch import RESULT_FIELDS, iter_resume_files, screen_resumes
+from ats.charts import CHART_MODE, category_chart, gap_chart
+from ats.dedup import get_dedup_index
+from ats.extract import file_kind
+from ats.jobs import (DONE, FAILED, QUEUED, SERVER_MODE, TENANT_HEADER, QueueFull, UploadTooLarge,
+                      get_job_queue, tenant_name)
+from ats.metrics import METRICS, WINDOW_SECONDS, WINDOWS
+from ats.ocr import no_text_message
+from ats.positions import FILTER_FIELDS, get_position_catalog
+from ats.results import get_result_log, result_record
+from ats.scoring import ScoringModel, calculate_skill_match, rank_pool, section_credit
+from ats.sections import SECTION_WEIGHTS
+from ats.store import QueryError, get_candidate_store
 
 # Set page config
 st.set_page_config(
@@ -170,154 +182,136 @@ st.title("AI-Powered Applicant Tracking System")
 st.markdown("### Resume Parsing & Skill Matching")
 st.markdown("---")
 
-# Predefined job requirements
-JOB_POSITIONS = {
-    "Senior Python Developer": {
-        "required_skills": ["Python", "Django", "Flask", "REST API", "PostgreSQL", "Docker", "Git", "AWS"],
-        "preferred_skills": ["Machine Learning", "Kubernetes", "Redis", "Celery", "FastAPI", "Microservices"],
-        "experience_years": 5,
-        "description": "Looking for a senior Python developer with strong backend development skills"
-    },
-    "Data Scientist": {
-        "required_skills": ["Python", "Machine Learning", "Deep Learning", "TensorFlow", "PyTorch", "Pandas", "NumPy", "SQL"],
-        "preferred_skills": ["NLP", "Computer Vision", "Spark", "Hadoop", "AWS", "Docker", "MLOps"],
-        "experience_years": 3,
-        "description": "Seeking a data scientist with expertise in ML/DL and statistical analysis"
-    },
-    "Full Stack Developer": {
-        "required_skills": ["JavaScript", "React", "Node.js", "HTML", "CSS", "MongoDB", "Express", "Git"],
-        "preferred_skills": ["TypeScript", "Next.js", "GraphQL", "Docker", "AWS", "Redux", "Webpack"],
-        "experience_years": 4,
-        "description": "Need a full stack developer proficient in modern web technologies"
-    },
-    "DevOps Engineer": {
-        "required_skills": ["Docker", "Kubernetes", "CI/CD", "Jenkins", "AWS", "Linux", "Terraform", "Ansible"],
-        "preferred_skills": ["Python", "Bash", "Prometheus", "Grafana", "ELK Stack", "GitOps", "ArgoCD"],
-        "experience_years": 4,
-        "description": "Looking for a DevOps engineer to manage cloud infrastructure"
-    }
-}
-
-# Common tech skills for extraction
-TECH_SKILLS = [
-    # Programming Languages
-    "Python", "Java", "JavaScript", "TypeScript", "C++", "C#", "Ruby", "Go", "Rust", "Swift", "Kotlin",
-    "PHP", "R", "MATLAB", "Scala", "Perl", "Objective-C", "Dart", "Julia", "Elixir", "Clojure",
-    
-    # Web Technologies
-    "HTML", "CSS", "React", "Angular", "Vue.js", "Node.js", "Express", "Django", "Flask", "FastAPI",
-    "Spring Boot", "Ruby on Rails", "ASP.NET", "Laravel", "Next.js", "Nuxt.js", "Gatsby", "Redux",
-    "GraphQL", "REST API", "SOAP", "WebSockets", "jQuery", "Bootstrap", "Tailwind CSS", "Sass",
-    
-    # Databases
-    "MySQL", "PostgreSQL", "MongoDB", "Redis", "Elasticsearch", "Cassandra", "Oracle", "SQL Server",
-    "SQLite", "DynamoDB", "Neo4j", "CouchDB", "MariaDB", "Firestore", "RDS", "DocumentDB",
-    
-    # Cloud & DevOps
-    "AWS", "Azure", "GCP", "Docker", "Kubernetes", "Jenkins", "GitLab CI", "GitHub Actions",
-    "Terraform", "Ansible", "Puppet", "Chef", "CloudFormation", "CircleCI", "Travis CI",
-    "Prometheus", "Grafana", "ELK Stack", "Datadog", "New Relic", "Nginx", "Apache",
-    
-    # Data Science & ML
-    "Machine Learning", "Deep Learning", "TensorFlow", "PyTorch", "Keras", "Scikit-learn",
-    "Pandas", "NumPy", "Matplotlib", "Seaborn", "Jupyter", "NLP", "Computer Vision",
-    "Spark", "Hadoop", "Tableau", "Power BI", "Statistics", "Data Mining", "MLOps",
-    
-    # Other Technologies
-    "Git", "Linux", "Windows Server", "Agile", "Scrum", "JIRA", "Confluence", "Microservices",
-    "API Development", "Unit Testing", "Integration Testing", "CI/CD", "DevOps", "Cloud Computing",
-    "Cybersecurity", "Blockchain", "IoT", "AR/VR", "Mobile Development", "Android", "iOS"
-]
-
-def extract_text_from_pdf(pdf_file):
-    """Extract text from PDF file"""
-    text = ""
-    try:
-        with pdfplumber.open(pdf_file) as pdf:
-            for page in pdf.pages:
-                text += page.extract_text() or ""
-    except Exception as e:
-        st.error(f"Error reading PDF: {str(e)}")
-    return text
-
-def extract_text_from_docx(docx_file):
-    """Extract text from DOCX file"""
-    text = ""
-    try:
-        doc = docx.Document(docx_file)
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
-    except Exception as e:
-        st.error(f"Error reading DOCX: {str(e)}")
-    return text
-
-def extract_skills_from_text(text):
-    """Extract skills from resume text using pattern matching"""
-    text = text.upper()
-    found_skills = []
-    
-    for skill in TECH_SKILLS:
-        # Create regex pattern for whole word matching
-        pattern = r'\b' + re.escape(skill.upper()) + r'\b'
-        if re.search(pattern, text):
-            found_skills.append(skill)
-    
-    # Also extract years of experience
-    experience_pattern = r'(\d+)\+?\s*(?:years?|yrs?)\s*(?:of\s*)?(?:experience|exp)'
-    experience_matches = re.findall(experience_pattern, text, re.IGNORECASE)
-    years_experience = max([int(match) for match in experience_matches], default=0)
-    
-    return found_skills, years_experience
-
-def calculate_skill_match(candidate_skills, job_requirements):
-    """Calculate match percentage between candidate skills and job requirements"""
-    required_skills = [skill.upper() for skill in job_requirements["required_skills"]]
-    preferred_skills = [skill.upper() for skill in job_requirements["preferred_skills"]]
-    candidate_skills_upper = [skill.upper() for skill in candidate_skills]
-    
-    # Calculate matches
-    required_matches = sum(1 for skill in required_skills if skill in candidate_skills_upper)
-    preferred_matches = sum(1 for skill in preferred_skills if skill in candidate_skills_upper)
-    
-    # Calculate scores
-    required_score = (required_matches / len(required_skills) * 100) if required_skills else 0
-    preferred_score = (preferred_matches / len(preferred_skills) * 100) if preferred_skills else 0
-    
-    # Overall score (70% weight on required, 30% on preferred)
-    overall_score = (required_score * 0.7) + (preferred_score * 0.3)
-    
-    return {
-        "overall_score": overall_score,
-        "required_score": required_score,
-        "preferred_score": preferred_score,
-        "required_matches": required_matches,
-        "preferred_matches": preferred_matches,
-        "total_required": len(required_skills),
-        "total_preferred": len(preferred_skills)
-    }
-
 # Sidebar for job position selection
 with st.sidebar:
     st.header("Job Position Selection")
+    position_catalog = get_position_catalog()
+    if position_catalog.last_error:
+        st.warning(f"Position catalog not reloaded: {position_catalog.last_error}")
+    # One snapshot for the whole run, so a reload from another session cannot change it midway
+    catalog = position_catalog.snapshot()
+    
+    # Narrow large catalogs down before listing them
+    position_search = st.text_input("Search positions", placeholder="Title or keyword")
+    position_filters = {}
+    for field in FILTER_FIELDS:
+        values = catalog.filter_values(field)
+        if values:
+            position_filters[field] = st.selectbox(field.title(), options=[""] + values,
+                                                   format_func=lambda value: value or "All")
+    position_options = catalog.search(position_search, **position_filters)
+    if not position_options:
+        st.info("No positions match the search; showing all positions.")
+        position_options = catalog.search()
     selected_position = st.selectbox(
-        "Select Job Position",
-        options=list(JOB_POSITIONS.keys()),
+        f"Select Job Position ({len(position_options)} of {len(catalog)} shown)",
+        options=position_options,
         index=0
     )
+    if selected_position not in catalog:
+        # The position was removed from the catalog since the widget last ran
+        st.warning("The selected position is no longer in the catalog; pick another one.")
+        st.stop()
     
     st.markdown("### Job Requirements")
-    job_req = JOB_POSITIONS[selected_position]
+    job_req = catalog[selected_position]
     
     st.markdown(f"**Description:** {job_req['description']}")
     st.markdown(f"**Experience Required:** {job_req['experience_years']}+ years")
     
+    skill_weights = job_req.get("skill_weights") or {}
     st.markdown("**Required Skills:**")
     for skill in job_req["required_skills"]:
-        st.markdown(f"• {skill}")
+        weight = skill_weights.get(skill.upper())
+        st.markdown(f"• {skill}" + (f" (weight {weight:g})" if weight is not None else ""))
     
     st.markdown("**Preferred Skills:**")
     for skill in job_req["preferred_skills"]:
-        st.markdown(f"• {skill}")
+        weight = skill_weights.get(skill.upper())
+        st.markdown(f"• {skill}" + (f" (weight {weight:g})" if weight is not None else ""))
+    
+    # Overall score weights, applied to every score on the page
+    with st.expander("Scoring Weights"):
+        required_weight = st.slider("Required skills", 0.0, 1.0, 0.7, 0.05)
+        preferred_weight = st.slider("Preferred skills", 0.0, 1.0, 0.3, 0.05)
+        experience_weight = st.slider("Experience", 0.0, 1.0, 0.0, 0.05)
+        related_credit = st.checkbox("Partial credit for related skills",
+                                     help="e.g. Scikit-learn counts half toward Machine Learning")
+        weigh_sections = st.checkbox("Weigh skills by resume section",
+                                     help="Skills found only under Education, hobbies or the contact lines "
+                                          "count less than ones under Skills or a job")
+    section_weights = SECTION_WEIGHTS if weigh_sections else None
+    try:
+        scoring_model = ScoringModel(required_weight, preferred_weight, experience_weight, related_credit,
+                                     section_weights)
+    except ValueError:
+        st.warning("All scoring weights are zero; using the default weights.")
+        scoring_model = ScoringModel(related=related_credit, section_weights=section_weights)
+
+    # Off by default: signing costs a MinHash pass per document and only adds a flag
+    flag_duplicates = st.checkbox("Flag near-duplicate resumes",
+                                  help="Name the earlier upload each resume closely resembles")
+
+def record_screenings(records):
+    """Append screening results to the dataset and the requisition aggregates"""
+    records = list(records)
+    get_result_log().extend(records)
+    get_pipeline_stats().extend(records)
+
+
+def load_finished_job(job):
+    """Copy a finished upload job's results into session state"""
+    resume = job.result
+    st.session_state['resume_text'] = resume["text"]
+    st.session_state['filename'] = job.filename
+    st.session_state['loaded_job'] = job.id
+    st.session_state['duplicate_of'] = None
+    
+    # Flag a near-identical copy of an earlier resume
+    if flag_duplicates and resume["text"]:
+        dedup = get_dedup_index()
+        original, similarity = dedup.check_or_add(
+            dedup.signature(resume["text"]), {"filename": job.filename, "sha256": resume["sha256"]}
+        )
+        if original is not None and original["sha256"] != resume["sha256"]:
+            st.session_state['duplicate_of'] = (original["filename"], similarity)
+    st.session_state['extracted_skills'] = resume["skills"]
+    st.session_state['years_experience'] = resume["years_experience"]
+    st.session_state['skill_years'] = resume.get("skill_years", {})
+    st.session_state['skill_sections'] = resume["skill_sections"]
+    st.session_state['fuzzy_matches'] = resume.get("fuzzy_matches", {})
+    st.session_state['taxonomy_version'] = resume["taxonomy_version"]
+    st.session_state['resume_sha256'] = resume["sha256"]
+    
+    # Record the candidate for skill search
+    candidate_store = get_candidate_store()
+    if resume["sha256"] not in candidate_store:
+        candidate_store.add(resume["sha256"], job.filename, resume["skills"], resume["years_experience"],
+                            resume["skill_sections"])
+
+
+def current_tenant():
+    """Team this session's jobs are scheduled for on the shared queue"""
+    value = st.context.headers.get(TENANT_HEADER) if TENANT_HEADER else None
+    return tenant_name(value or st.query_params.get("team"))
+
+
+@st.fragment(run_every=1)
+def upload_job_status(job_id):
+    """Poll a background upload job without rerunning the whole page"""
+    job = get_job_queue().get(job_id)
+    if job is None or job.finished:
+        st.rerun()
+    
+    if job.state == QUEUED:
+        queue_stats = get_job_queue().stats()
+        st.info(f"Waiting for a worker... ({queue_stats['queued']} uploads queued)")
+    else:
+        st.info(f"Parsing {job.filename}... {job.pages} pages read "
+                f"({time.time() - job.started_at:.0f}s)")
+    if st.button("Cancel", key=f"cancel_{job_id}"):
+        get_job_queue().cancel(job_id)
+        st.rerun()
 
 # Main content area
 col1, col2 = st.columns([1, 1])
@@ -332,31 +326,45 @@ with col1:
     )
     
     if uploaded_file is not None:
-        # Extract text based on file type
-        if uploaded_file.type == "application/pdf":
-            text = extract_text_from_pdf(uploaded_file)
-        elif uploaded_file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-            text = extract_text_from_docx(uploaded_file)
-        else:  # txt file
-            text = str(uploaded_file.read(), "utf-8")
+        # Parsing runs on the shared background queue; this run only submits and polls
+        if st.session_state.get('upload_id') != uploaded_file.file_id:
+            with METRICS.timer("upload_read"):
+                upload_bytes = uploaded_file.getvalue()
+            try:
+                job = get_job_queue().submit(upload_bytes, uploaded_file.name, uploaded_file.type,
+                                             tenant=current_tenant())
+                st.session_state['upload_id'] = uploaded_file.file_id
+                st.session_state['upload_job'] = job.id
+            except QueueFull:
+                st.warning("The server is busy processing other uploads. Please try again in a moment.")
+            except UploadTooLarge as e:
+                st.error(str(e))
         
-        if text:
-            st.success(f"Successfully loaded: {uploaded_file.name}")
-            
-            # Extract skills
-            extracted_skills, years_experience = extract_skills_from_text(text)
-            
-            # Store in session state
-            st.session_state['resume_text'] = text
-            st.session_state['extracted_skills'] = extracted_skills
-            st.session_state['years_experience'] = years_experience
-            st.session_state['filename'] = uploaded_file.name
+        job = get_job_queue().get(st.session_state.get('upload_job'))
+        if job is not None and not job.finished:
+            upload_job_status(job.id)
+        elif job is not None and job.state == DONE:
+            if job.result["text"].strip():
+                st.success(f"Successfully loaded: {job.filename}")
+                if job.result.get("stats", {}).get("ocr_pages"):
+                    st.caption(f"Read {job.result['stats']['ocr_pages']} scanned pages with OCR")
+                if st.session_state.get('loaded_job') != job.id:
+                    load_finished_job(job)
+            else:
+                st.error(no_text_message(job.result.get("stats")))
+        elif job is not None and job.state == FAILED:
+            st.error(f"Error reading {file_kind(job.filename).upper()}: {job.error}")
+        elif job is not None:
+            st.info(f"Processing of {job.filename} was cancelled.")
 
 with col2:
     st.header("Skill Analysis")
     
     if 'extracted_skills' in st.session_state:
         st.markdown(f"**Resume:** {st.session_state['filename']}")
+        if st.session_state.get('duplicate_of'):
+            original_name, similarity = st.session_state['duplicate_of']
+            st.caption(f"Near-duplicate of {original_name} ({similarity:.0%} similar)")
         st.markdown(f"**Years of Experience:** {st.session_state['years_experience']}")
         
         # Display extracted skills
@@ -365,12 +373,44 @@ with col2:
         for skill in st.session_state['extracted_skills']:
             skills_html += f'<span class="skill-tag">{skill}</span>'
         st.markdown(skills_html, unsafe_allow_html=True)
+        fuzzy_matches = st.session_state.get('fuzzy_matches')
+        if fuzzy_matches:
+            st.caption("Matched from aliases and close spellings: " + ", ".join(
+                f"{phrase} → {skill}" for skill, phrase in fuzzy_matches.items()
+            ))
+        skill_years = st.session_state.get('skill_years')
+        if skill_years:
+            st.caption("Years used in dated roles: " + ", ".join(
+                f"{skill} {years:g}" for skill, years in sorted(skill_years.items(), key=lambda item: -item[1])
+            ))
+        skill_sections = st.session_state.get('skill_sections')
+        if scoring_model.section_weights and skill_sections:
+            credit = section_credit(skill_sections, scoring_model.section_weights)
+            reduced = [f"{skill} ({', '.join(sections)})" for skill, sections in skill_sections.items()
+                       if credit[skill.upper()] < 1.0]
+            if reduced:
+                st.caption("Reduced credit, found only outside the summary, skills and jobs: " + ", ".join(reduced))
         
         # Calculate match score
-        match_results = calculate_skill_match(
-            st.session_state['extracted_skills'],
-            JOB_POSITIONS[selected_position]
-        )
+        with METRICS.timer("scoring"):
+            match_results = calculate_skill_match(
+                st.session_state['extracted_skills'],
+                catalog[selected_position],
+                st.session_state['years_experience'],
+                scoring_model,
+                st.session_state.get('skill_sections')
+            )
+        
+        # Log each resume/position pair once, not on every rerun
+        logged_results = st.session_state.setdefault('logged_results', set())
+        result_key = (st.session_state.get('resume_sha256'), selected_position)
+        if result_key[0] and result_key not in logged_results:
+            record_screenings([result_record(
+                result_key[0], st.session_state['filename'], selected_position, catalog[selected_position],
+                match_results, st.session_state['extracted_skills'], st.session_state['years_experience'],
+                st.session_state.get('taxonomy_version')
+            )])
+            logged_results.add(result_key)
         
         st.markdown("### Match Results")
         
@@ -400,78 +440,41 @@ with col2:
                 f"{match_results['preferred_matches']}/{match_results['total_preferred']}",
                 f"{match_results['preferred_score']:.0f}%"
             )
+        if scoring_model.experience:
+            st.caption(f"Experience component: {match_results['experience_score']:.0f}% of the "
+                       f"{catalog[selected_position]['experience_years']} years required")
 
 # Visualization section
 if 'extracted_skills' in st.session_state:
     st.markdown("---")
     st.header("Detailed Analysis")
     
+    chart_mode = "light" if st.checkbox("Lightweight charts", value=CHART_MODE == "light",
+                                        help="Smaller charts built without pandas and plotly templates") else "full"
+    
+    # Figures are reused across reruns and sessions until the resume, position or taxonomy changes
+    resume_key = None
+    if st.session_state.get('resume_sha256'):
+        resume_key = (st.session_state['resume_sha256'], st.session_state.get('taxonomy_version'))
+    
     viz_col1, viz_col2 = st.columns(2)
     
     with viz_col1:
         # Skills gap analysis
-        job_req = JOB_POSITIONS[selected_position]
-        all_required_skills = job_req["required_skills"] + job_req["preferred_skills"]
+        job_req = catalog[selected_position]
         candidate_skills_upper = [skill.upper() for skill in st.session_state['extracted_skills']]
         
-        skill_status = []
-        for skill in all_required_skills:
-            status = "Matched" if skill.upper() in candidate_skills_upper else "Missing"
-            skill_type = "Required" if skill in job_req["required_skills"] else "Preferred"
-            skill_status.append({
-                "Skill": skill,
-                "Status": status,
-                "Type": skill_type
-            })
-        
-        df_skills = pd.DataFrame(skill_status)
-        
-        # Create a grouped bar chart with dark theme
-        fig = px.bar(
-            df_skills.groupby(['Type', 'Status']).size().reset_index(name='Count'),
-            x='Type',
-            y='Count',
-            color='Status',
-            title='Skills Gap Analysis',
-            color_discrete_map={'Matched': '#4ade80', 'Missing': '#ef4444'},
-            template='plotly_dark'
-        )
-        fig.update_layout(
-            plot_bgcolor='#1a1a1a',
-            paper_bgcolor='#1a1a1a',
-            font=dict(color='#ffffff', size=14, family="Arial Black")
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        with METRICS.timer("chart_skills_gap"):
+            fig = gap_chart(st.session_state['extracted_skills'], job_req, match_results,
+                            resume_key and resume_key + (selected_position, catalog.version), chart_mode)
+            st.plotly_chart(fig, use_container_width=True)
     
     with viz_col2:
         # Skill categories pie chart
-        skill_categories = {
-            "Languages": ["Python", "Java", "JavaScript", "TypeScript", "C++", "C#", "Ruby", "Go", "Rust", "Swift", "Kotlin", "PHP", "R"],
-            "Frameworks": ["React", "Angular", "Vue.js", "Django", "Flask", "Spring Boot", "Express", "FastAPI", "Next.js"],
-            "Databases": ["MySQL", "PostgreSQL", "MongoDB", "Redis", "Elasticsearch", "Cassandra", "Oracle", "SQL Server"],
-            "Cloud/DevOps": ["AWS", "Azure", "GCP", "Docker", "Kubernetes", "Jenkins", "Terraform", "Ansible"],
-            "Data Science": ["Machine Learning", "Deep Learning", "TensorFlow", "PyTorch", "Pandas", "NumPy", "NLP"]
-        }
-        
-        category_counts = {}
-        for category, skills in skill_categories.items():
-            count = sum(1 for skill in st.session_state['extracted_skills'] if skill in skills)
-            if count > 0:
-                category_counts[category] = count
-        
-        if category_counts:
-            fig_pie = px.pie(
-                values=list(category_counts.values()),
-                names=list(category_counts.keys()),
-                title='Candidate Skills by Category',
-                template='plotly_dark'
-            )
-            fig_pie.update_layout(
-                plot_bgcolor='#1a1a1a',
-                paper_bgcolor='#1a1a1a',
-                font=dict(color='#ffffff', size=14, family="Arial Black")
-            )
-            st.plotly_chart(fig_pie, use_container_width=True)
+        with METRICS.timer("chart_categories"):
+            fig_pie = category_chart(st.session_state['extracted_skills'], resume_key, chart_mode)
+            if fig_pie is not None:
+                st.plotly_chart(fig_pie, use_container_width=True)
     
     # Recommendation section
     st.markdown("### Recommendations")
@@ -505,6 +508,208 @@ if 'extracted_skills' in st.session_state:
                   f"but the position requires {job_req['experience_years']}+ years.")
     else:
         st.success(f"Experience requirement met: {st.session_state['years_experience']} years")
+    
+    # Reverse matching over the whole catalog
+    st.markdown("---")
+    st.header("Best-Fitting Positions")
+    top_k = st.slider("Positions to show", min_value=5, max_value=50, value=10, step=5)
+    with METRICS.timer("recommend"):
+        recommendations = catalog.index().top_k(
+            st.session_state['extracted_skills'],
+            st.session_state['years_experience'],
+            k=top_k,
+            model=scoring_model,
+            skill_sections=st.session_state.get('skill_sections')
+        )
+    if recommendations:
+        df_recommendations = pd.DataFrame({
+            "Position": [r["position"] for r in recommendations],
+            "Overall Match": [round(r["overall_score"], 1) for r in recommendations],
+            "Required": [f"{r['required_matches']}/{r['total_required']}" for r in recommendations],
+            "Preferred": [f"{r['preferred_matches']}/{r['total_preferred']}" for r in recommendations],
+            "Experience": [f"{r['experience_years']}+ years" + ("" if r["experience_met"] else " (short)")
+                           for r in recommendations],
+            "Missing Required Skills": [", ".join(r["missing_required"]) for r in recommendations],
+        })
+        st.dataframe(df_recommendations, use_container_width=True, hide_index=True)
+    else:
+        st.info("No open position shares a skill with this resume.")
+
+# Bulk screening section
+st.markdown("---")
+st.header("Bulk Resume Screening")
+st.markdown(f"Rank a whole batch of resumes against **{selected_position}**. "
+            "Upload many files or a zip archive of PDF, DOCX and TXT resumes.")
+
+def ranking_frame(rows):
+    """Build the ranking table from batch result rows"""
+    df = pd.DataFrame(rows).reindex(columns=RESULT_FIELDS)
+    df["skills"] = df["skills"].map(lambda skills: ", ".join(skills) if isinstance(skills, list) else "")
+    return df.sort_values("overall_score", ascending=False, na_position="last")
+
+
+batch_files = st.file_uploader(
+    "Choose resume files or zip archives",
+    type=['pdf', 'docx', 'txt', 'zip'],
+    accept_multiple_files=True,
+    help="Supported formats: PDF, DOCX, TXT, or ZIP archives containing them",
+    key="batch_uploader"
+)
+
+if batch_files and st.button("Screen Batch"):
+    files = list(iter_resume_files(batch_files))
+    progress = st.progress(0.0, text=f"Screening {len(files)} resumes...")
+    live_table = st.empty()
+    rows = []
+    # In server mode the batch shares the upload workers instead of starting a pool of its own
+    for row in screen_resumes(files, catalog[selected_position],
+                              dedup=get_dedup_index() if flag_duplicates else None, model=scoring_model,
+                              job_queue=get_job_queue() if SERVER_MODE else None, tenant=current_tenant()):
+        rows.append(row)
+        # Refresh the live table in steps so redraws do not dominate the run
+        if len(rows) % 25 == 0 or len(rows) == len(files):
+            progress.progress(len(rows) / len(files), text=f"Screened {len(rows)}/{len(files)} resumes")
+            live_table.dataframe(ranking_frame(rows).head(25), use_container_width=True, hide_index=True)
+    live_table.empty()
+    progress.empty()
+    get_candidate_store().add_many(
+        (row["sha256"], row["filename"], row["skills"], row["years_experience"], row["skill_sections"])
+        for row in rows if not row["error"]
+    )
+    record_screenings(
+        result_record(row["sha256"], row["filename"], selected_position, catalog[selected_position],
+                      row, row["skills"], row["years_experience"], row["taxonomy_version"])
+        for row in rows if not row["error"]
+    )
+    st.session_state['batch_results'] = rows
+    st.session_state['batch_position'] = selected_position
+
+if st.session_state.get('batch_results'):
+    st.markdown(f"**{len(st.session_state['batch_results'])} resumes screened against "
+                f"{st.session_state['batch_position']}**")
+    df_ranking = ranking_frame(st.session_state['batch_results'])
+
+    sort_col1, sort_col2, sort_col3 = st.columns([2, 1, 1])
+    with sort_col1:
+        sort_by = st.selectbox("Sort by", options=RESULT_FIELDS[1:7], index=0)
+    with sort_col2:
+        page_size = st.selectbox("Rows per page", options=[25, 50, 100, 250], index=1)
+    page_count = max(1, -(-len(df_ranking) // page_size))
+    with sort_col3:
+        page = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1)
+
+    df_ranking = df_ranking.sort_values(sort_by, ascending=False, na_position="last")
+    st.dataframe(
+        df_ranking.iloc[(page - 1) * page_size:page * page_size],
+        use_container_width=True,
+        hide_index=True
+    )
+    st.download_button(
+        label="Download Ranking CSV",
+        data=df_ranking.to_csv(index=False),
+        file_name=f"{st.session_state['batch_position'].replace(' ', '_')}_Ranking.csv",
+        mime="text/csv"
+    )
+
+# Requisition pipeline dashboard
+st.markdown("---")
+st.header("Requisition Pipeline")
+with METRICS.timer("pipeline_dashboard"):
+    pipeline = get_pipeline_stats().snapshot(selected_position, job_req['experience_years'])
+if not pipeline["applicants"]:
+    st.info(f"No resumes have been scored against {selected_position} yet.")
+else:
+    pipeline_col1, pipeline_col2, pipeline_col3 = st.columns(3)
+    pipeline_col1.metric("Applicants", f"{pipeline['applicants']:,}")
+    pipeline_col2.metric("Mean Match", f"{pipeline['mean_score']:.1f}%")
+    pipeline_col3.metric("Meet Experience", f"{pipeline['experience_met'] / pipeline['applicants']:.0%}")
+    
+    chart_col1, chart_col2, chart_col3 = st.columns(3)
+    band_width = 100 // SCORE_BINS
+    with chart_col1:
+        fig_scores = px.bar(
+            x=[f"{band * band_width}-{band * band_width + band_width}%" for band in range(SCORE_BINS)],
+            y=pipeline["score_bins"],
+            labels={"x": "Overall Match", "y": "Applicants"},
+            title='Match Distribution',
+            template='plotly_dark'
+        )
+        st.plotly_chart(fig_scores, use_container_width=True)
+    with chart_col2:
+        if pipeline["missing_required"]:
+            missing_skills, missing_counts = zip(*pipeline["missing_required"])
+            fig_missing = px.bar(
+                x=[count / pipeline["applicants"] * 100 for count in missing_counts],
+                y=list(missing_skills),
+                orientation="h",
+                labels={"x": "Applicants Missing (%)", "y": "Skill"},
+                title='Most Missing Required Skills',
+                template='plotly_dark'
+            )
+            fig_missing.update_layout(yaxis={"categoryorder": "total ascending"})
+            st.plotly_chart(fig_missing, use_container_width=True)
+        else:
+            st.success("Every applicant has all required skills.")
+    with chart_col3:
+        if pipeline["categories"]:
+            fig_mix = px.pie(
+                values=list(pipeline["categories"].values()),
+                names=list(pipeline["categories"].keys()),
+                title='Applicant Skills by Category',
+                template='plotly_dark'
+            )
+            st.plotly_chart(fig_mix, use_container_width=True)
+    
+    st.markdown("**Top Applicants**")
+    st.dataframe(
+        pd.DataFrame(pipeline["top_candidates"])[["filename", "overall_score"]],
+        use_container_width=True,
+        hide_index=True
+    )
+
+# Candidate search section
+st.markdown("---")
+st.header("Candidate Search")
+candidate_store = get_candidate_store()
+st.markdown(f"Search all **{len(candidate_store):,}** screened candidates by skill. "
+            "Combine skills with AND, OR, NOT and parentheses, e.g. `Kubernetes AND (Terraform OR Ansible)`.")
+
+search_col1, search_col2 = st.columns([3, 1])
+with search_col1:
+    skill_query = st.text_input("Skill query", placeholder="Python AND Django AND NOT PHP")
+with search_col2:
+    min_years = st.number_input("Minimum years", min_value=0, max_value=50, value=0, step=1)
+
+if skill_query or min_years:
+    try:
+        matching_ids = candidate_store.query_ids(skill_query, min_years=min_years or None)
+    except QueryError as e:
+        st.error(f"Invalid query: {str(e)}")
+    else:
+        st.markdown(f"**{len(matching_ids):,} matching candidates**")
+        if len(matching_ids):
+            df_candidates = pd.DataFrame(candidate_store.candidate(i) for i in matching_ids[:200])
+            df_candidates["skills"] = df_candidates["skills"].map(", ".join)
+            st.dataframe(
+                df_candidates[["name", "years_experience", "skills"]],
+                use_container_width=True,
+                hide_index=True
+            )
+            if len(matching_ids) > 200:
+                st.caption("Showing the first 200 matches")
+
+# Re-rank the whole stored pool under the sidebar weights
+if len(candidate_store) and st.checkbox(f"Rank all candidates against {selected_position}"):
+    start = time.perf_counter()
+    with METRICS.timer("pool_ranking"):
+        ranked = rank_pool(candidate_store, catalog.matrix(), selected_position, scoring_model, k=50)
+    st.caption(f"Scored {len(candidate_store):,} candidates in {(time.perf_counter() - start) * 1000:.0f} ms")
+    df_ranked = pd.DataFrame(ranked)
+    st.dataframe(
+        df_ranked[["name", "overall_score", "required_score", "preferred_score", "years_experience"]].round(1),
+        use_container_width=True,
+        hide_index=True
+    )
 
 # Sample resumes section
 st.markdown("---")
@@ -614,6 +819,85 @@ Bachelor of Science in Computer Science | Tech University | 2019
                 mime="text/plain"
             )
 
+# Diagnostics section
+with st.expander("Performance Diagnostics"):
+    metrics_snapshot = METRICS.snapshot()
+    counters = metrics_snapshot["counters"]
+    
+    diag_col1, diag_col2, diag_col3, diag_col4 = st.columns(4)
+    with diag_col1:
+        st.metric("Documents", f"{counters.get('documents', 0):,}")
+    with diag_col2:
+        lookups = counters.get('cache_hits', 0) + counters.get('cache_misses', 0)
+        st.metric("Cache Hit Rate", f"{counters.get('cache_hits', 0) / lookups:.0%}" if lookups else "n/a")
+    with diag_col3:
+        st.metric("Bytes Parsed", f"{counters.get('bytes', 0) / 1024 / 1024:.1f} MB")
+    with diag_col4:
+        st.metric("Pages Parsed", f"{counters.get('pages', 0):,}")
+    
+    queue_stats = get_job_queue().stats()
+    queue_col1, queue_col2, queue_col3, queue_col4 = st.columns(4)
+    queue_col1.metric("Workers Busy", f"{queue_stats['busy']}/{queue_stats['workers']}")
+    queue_col2.metric("Worker Utilization (1 min)", f"{queue_stats['utilization']:.0%}")
+    queue_col3.metric("Jobs Waiting", f"{sum(t['queued'] for t in queue_stats['tenants'].values()):,}")
+    rejected = counters.get('queue_full', 0) + counters.get('uploads_too_large', 0)
+    queue_col4.metric("Rejected Uploads", f"{rejected:,}")
+    if len(queue_stats["tenants"]) > 1:
+        st.dataframe(
+            pd.DataFrame([{"Team": tenant, "Waiting": values["queued"], "Running": values["running"]}
+                          for tenant, values in queue_stats["tenants"].items()]),
+            use_container_width=True,
+            hide_index=True
+        )
+    
+    if counters.get('image_pages'):
+        ocr_stage = metrics_snapshot["stages"].get("ocr", {})
+        ocr_col1, ocr_col2, ocr_col3, ocr_col4 = st.columns(4)
+        ocr_col1.metric("Scanned Pages", f"{counters['image_pages']:,}")
+        ocr_col2.metric("OCR Pages", f"{counters.get('ocr_pages', 0):,}")
+        ocr_col3.metric("OCR Cache Hits", f"{counters.get('ocr_cache_hits', 0):,}")
+        ocr_col4.metric("OCR Pages/s",
+                        f"{counters.get('ocr_pages', 0) / ocr_stage['sum_seconds']:.2f}"
+                        if ocr_stage.get("sum_seconds") else "n/a")
+    
+    if metrics_snapshot["stages"]:
+        st.markdown(f"**Stage latency (last {WINDOWS * WINDOW_SECONDS // 60} minutes)**")
+        st.dataframe(
+            pd.DataFrame([
+                {
+                    "Stage": stage,
+                    "Count": values["recent_count"],
+                    "Mean (ms)": values["recent_mean_seconds"] * 1000,
+                    "p50 (ms) ≤": values["recent_p50_seconds"] * 1000,
+                    "p95 (ms) ≤": values["recent_p95_seconds"] * 1000,
+                    "p99 (ms) ≤": values["recent_p99_seconds"] * 1000,
+                }
+                for stage, values in metrics_snapshot["stages"].items()
+            ]),
+            use_container_width=True,
+            hide_index=True
+        )
+    
+    if metrics_snapshot["documents"]:
+        st.markdown("**Recent documents**")
+        st.dataframe(pd.DataFrame(metrics_snapshot["documents"][::-1]), use_container_width=True, hide_index=True)
+    
+    export_col1, export_col2 = st.columns(2)
+    with export_col1:
+        st.download_button(
+            label="Export Prometheus Metrics",
+            data=METRICS.to_prometheus(),
+            file_name="ats_metrics.prom",
+            mime="text/plain"
+        )
+    with export_col2:
+        st.download_button(
+            label="Export JSON Metrics",
+            data=METRICS.to_json(),
+            file_name="ats_metrics.json",
+            mime="application/json"
+        )
+
 st.markdown("---")
 st.markdown(
     "<div style='text-align: center; color: #999999; padding: 2rem; font-weight: 600;'>"
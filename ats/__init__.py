@@ -0,0 +1,55 @@
+"""Resume parsing and skill matching core used by the Streamlit app and the CLI
+
+Everything listed in ``__all__`` is importable from the package root. Submodules
+are loaded on first attribute access, and the PDF/DOCX parsers and NumPy only
+when a function that needs them runs, so ``import ats`` stays cheap for
+scripts and cron jobs.
+"""
+import importlib
+
+_EXPORTS = {
+    "TECH_SKILLS": "ats.skills",
+    "SkillMatcher": "ats.skills",
+    "SkillScanner": "ats.skills",
+    "extract_skills_from_text": "ats.skills",
+    "SKILL_ALIASES": "ats.skills",
+    "SkillIndex": "ats.fuzzy",
+    "Taxonomy": "ats.taxonomy",
+    "get_taxonomy": "ats.taxonomy",
+    "ExperienceTracker": "ats.experience",
+    "SECTION_WEIGHTS": "ats.sections",
+    "JOB_POSITIONS": "ats.positions",
+    "PositionCatalog": "ats.positions",
+    "CatalogSnapshot": "ats.positions",
+    "get_position_catalog": "ats.positions",
+    "extract_text": "ats.extract",
+    "extract_text_from_pdf": "ats.extract",
+    "extract_text_from_docx": "ats.extract",
+    "iter_pdf_pages": "ats.extract",
+    "calculate_skill_match": "ats.scoring",
+    "PositionMatrix": "ats.scoring",
+    "score_matrix": "ats.scoring",
+    "ScoringModel": "ats.scoring",
+    "rank_pool": "ats.scoring",
+    "PositionIndex": "ats.recommend",
+    "recommend_positions": "ats.recommend",
+    "analyze_resume": "ats.cache",
+    "ResumeCache": "ats.cache",
+    "iter_resume_files": "ats.batch",
+    "screen_resumes": "ats.batch",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module 'ats' has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
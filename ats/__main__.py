@@ -0,0 +1,5 @@
+import sys
+
+from ats.cli import main
+
+sys.exit(main())
@@ -0,0 +1,226 @@
+"""Per-requisition pipeline aggregates updated as each resume is scored
+
+A requisition dashboard needs the score distribution, the required skills
+applicants miss most and the category mix of their skills. Rescanning every
+result for that grows with the pipeline, so each ``RequisitionStats`` keeps
+fixed-size counters that are bumped once per scored resume and read in
+constant time.
+
+The process-wide ``PipelineStats`` persists its counters to
+``_pipeline_stats.json`` in the results directory (a name the dataset
+reader skips) every ``SNAPSHOT_EVERY`` applicants and at exit. On first use
+it loads that snapshot and replays only the results screened after it, so
+dashboards survive restarts without a scan of the whole dataset. A
+candidate scored twice for a position counts once between two snapshots;
+the sets that remember them are emptied at each snapshot so they stay small.
+"""
+import atexit
+import datetime
+import heapq
+import json
+import os
+import tempfile
+import threading
+from collections import Counter
+
+from ats.taxonomy import get_taxonomy
+
+SCORE_BINS = 10
+TOP_CANDIDATES = 10
+# Years of experience are counted per year up to this cap
+MAX_YEARS = 50
+SNAPSHOT_FILE = "_pipeline_stats.json"
+# Persist the counters once this many applicants were added since the last snapshot
+SNAPSHOT_EVERY = 10000
+
+
+class RequisitionStats:
+    """Running aggregates for one position"""
+
+    def __init__(self, position):
+        self.position = position
+        self.applicants = 0
+        self.score_sum = 0.0
+        self.years = [0] * (MAX_YEARS + 1)
+        self.score_bins = [0] * SCORE_BINS
+        self.required_bins = [0] * SCORE_BINS
+        self.missing_required = Counter()
+        self.categories = Counter()
+        self._top = []
+        self._seen = set()
+
+    def add(self, record):
+        """Count one ``result_record``; a candidate already counted is ignored"""
+        if record["candidate_id"] in self._seen:
+            return False
+        self._seen.add(record["candidate_id"])
+        self.applicants += 1
+        self.score_sum += record["overall_score"]
+        self.years[min(max(int(record["years_experience"]), 0), MAX_YEARS)] += 1
+        self.score_bins[min(int(record["overall_score"] // (100 / SCORE_BINS)), SCORE_BINS - 1)] += 1
+        self.required_bins[min(int(record["required_score"] // (100 / SCORE_BINS)), SCORE_BINS - 1)] += 1
+        self.missing_required.update(record["missing_required"])
+        category_of = get_taxonomy().category_of
+        self.categories.update(category_of[skill] for skill in record["skills"] if skill in category_of)
+
+        entry = (record["overall_score"], record["candidate_id"], record["filename"])
+        if len(self._top) < TOP_CANDIDATES:
+            heapq.heappush(self._top, entry)
+        elif entry > self._top[0]:
+            heapq.heapreplace(self._top, entry)
+        return True
+
+    def state(self):
+        """Counters as JSON-ready data, without the candidates already seen"""
+        return {
+            "applicants": self.applicants,
+            "score_sum": self.score_sum,
+            "years": self.years,
+            "score_bins": self.score_bins,
+            "required_bins": self.required_bins,
+            "missing_required": dict(self.missing_required),
+            "categories": dict(self.categories),
+            "top": self._top,
+        }
+
+    @classmethod
+    def from_state(cls, position, state):
+        stats = cls(position)
+        stats.applicants = state["applicants"]
+        stats.score_sum = state["score_sum"]
+        stats.years = list(state["years"])
+        stats.score_bins = list(state["score_bins"])
+        stats.required_bins = list(state["required_bins"])
+        stats.missing_required = Counter(state["missing_required"])
+        stats.categories = Counter(state["categories"])
+        stats._top = [tuple(entry) for entry in state["top"]]
+        heapq.heapify(stats._top)
+        return stats
+
+    def snapshot(self, experience_years=0, missing_limit=15):
+        """Dashboard view; its cost does not depend on the number of applicants"""
+        return {
+            "position": self.position,
+            "applicants": self.applicants,
+            "mean_score": self.score_sum / self.applicants if self.applicants else 0.0,
+            "experience_met": sum(self.years[min(experience_years, MAX_YEARS):]),
+            "score_bins": list(self.score_bins),
+            "required_bins": list(self.required_bins),
+            "missing_required": self.missing_required.most_common(missing_limit),
+            "categories": dict(self.categories),
+            "top_candidates": [{"overall_score": score, "candidate_id": candidate_id, "filename": filename}
+                               for score, candidate_id, filename in sorted(self._top, reverse=True)],
+        }
+
+
+class PipelineStats:
+    """``RequisitionStats`` for every position that has seen a resume.
+
+    With a ``directory`` the counters are persisted there (see ``save``).
+    ``through`` is the ``screened_at`` of the newest record counted.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self.through = None
+        self._lock = threading.Lock()
+        self._requisitions = {}
+        self._unsaved = 0
+
+    def add(self, record):
+        with self._lock:
+            stats = self._requisitions.get(record["position"])
+            if stats is None:
+                stats = self._requisitions[record["position"]] = RequisitionStats(record["position"])
+            added = stats.add(record)
+            if self.through is None or record["screened_at"] > self.through:
+                self.through = record["screened_at"]
+            self._unsaved += added
+            due = self.directory is not None and self._unsaved >= SNAPSHOT_EVERY
+        if due:
+            self.save()
+        return added
+
+    def extend(self, records):
+        for record in records:
+            self.add(record)
+
+    def snapshot(self, position, experience_years=0):
+        with self._lock:
+            stats = self._requisitions.get(position) or RequisitionStats(position)
+            return stats.snapshot(experience_years)
+
+    @property
+    def _snapshot_path(self):
+        return os.path.join(self.directory, SNAPSHOT_FILE)
+
+    def save(self):
+        """Write the counters to ``SNAPSHOT_FILE`` and forget the candidates already seen"""
+        with self._lock:
+            if not self._unsaved:
+                return
+            payload = json.dumps({
+                "through": self.through.isoformat() if self.through else None,
+                "requisitions": {position: stats.state() for position, stats in self._requisitions.items()},
+            })
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".", suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp_path, self._snapshot_path)
+            for stats in self._requisitions.values():
+                stats._seen.clear()
+            self._unsaved = 0
+
+    def load_results(self, directory):
+        """Seed the counters from the last snapshot, then the results screened after it"""
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        from ats.results import open_dataset
+
+        try:
+            with open(os.path.join(directory, SNAPSHOT_FILE), encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            snapshot = None
+        if snapshot is not None:
+            with self._lock:
+                self._requisitions = {position: RequisitionStats.from_state(position, state)
+                                      for position, state in snapshot["requisitions"].items()}
+                if snapshot["through"]:
+                    self.through = datetime.datetime.fromisoformat(snapshot["through"])
+
+        dataset = open_dataset(directory)
+        if dataset is None:
+            return 0
+        columns = ["screened_at", "candidate_id", "filename", "position", "overall_score", "required_score",
+                   "years_experience", "skills", "missing_required"]
+        expression = None
+        if self.through is not None:
+            # The date partitions let the scan skip the days the snapshot covers
+            expression = ((ds.field("date") >= self.through.strftime("%Y-%m-%d"))
+                          & (ds.field("screened_at") > pa.scalar(self.through, pa.timestamp("ms", tz="UTC"))))
+        count = 0
+        for batch in dataset.to_batches(columns=columns, filter=expression):
+            for record in batch.to_pylist():
+                count += self.add(record)
+        return count
+
+
+_default_stats = None
+_default_lock = threading.Lock()
+
+
+def get_pipeline_stats():
+    """Process-wide aggregates, seeded from ``ATS_RESULTS_DIR`` the first time and saved there"""
+    from ats.results import results_dir
+
+    global _default_stats
+    with _default_lock:
+        if _default_stats is None:
+            _default_stats = PipelineStats(results_dir())
+            if _default_stats.load_results(results_dir()):
+                _default_stats.save()
+            atexit.register(_default_stats.save)
+        return _default_stats
@@ -0,0 +1,218 @@
+"""Bulk resume screening on a process pool"""
+import multiprocessing
+import os
+import queue
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from io import BytesIO
+
+from ats import extract, ocr
+from ats.cache import analyze_resume
+from ats.dedup import get_minhasher
+from ats.extract import SUPPORTED_EXTENSIONS
+from ats.metrics import METRICS
+from ats.scoring import calculate_skill_match
+
+# Columns of a screening result row, in display order
+RESULT_FIELDS = ["filename", "overall_score", "required_score", "preferred_score",
+                 "required_matches", "preferred_matches", "years_experience", "skills", "error", "duplicate_of"]
+
+# Pause before resubmitting when the shared queue is full and none of this batch's jobs are running
+QUEUE_RETRY_SECONDS = 0.25
+
+
+def iter_resume_files(uploads):
+    """Yield (filename, bytes) for every resume in the uploads, expanding zip archives.
+
+    ``uploads`` is an iterable of objects with ``name`` and ``getvalue()``
+    (Streamlit ``UploadedFile``) or plain ``(name, bytes)`` tuples. A zip
+    archive that cannot be read yields an error row (a dict with
+    ``filename`` and ``error``) instead, which ``screen_resumes`` passes on.
+    """
+    for upload in uploads:
+        if isinstance(upload, tuple):
+            name, data = upload
+        else:
+            name, data = upload.name, upload.getvalue()
+
+        if name.lower().endswith(".zip"):
+            try:
+                with zipfile.ZipFile(BytesIO(data)) as archive:
+                    for info in archive.infolist():
+                        member = info.filename
+                        if info.is_dir() or member.startswith("__MACOSX/"):
+                            continue
+                        if os.path.basename(member).startswith("."):
+                            continue
+                        if member.lower().endswith(SUPPORTED_EXTENSIONS):
+                            yield member, archive.read(info)
+            except zipfile.BadZipFile as e:
+                yield {"filename": name, "error": f"Could not read the zip archive: {e}"}
+        elif name.lower().endswith(SUPPORTED_EXTENSIONS):
+            yield name, data
+
+
+def score_analysis(row, resume, cache_hit, job_requirements, with_signature=False, model=None):
+    """Fill a result row from an ``analyze_resume`` entry; returns the row"""
+    row["cache_hit"] = cache_hit
+    row["stats"] = resume.get("stats")
+    row.update(calculate_skill_match(resume["skills"], job_requirements, resume["years_experience"], model,
+                                     resume["skill_sections"]))
+    row["years_experience"] = resume["years_experience"]
+    row["skills"] = resume["skills"]
+    row["skill_sections"] = resume["skill_sections"]
+    row["sha256"] = resume["sha256"]
+    row["taxonomy_version"] = resume["taxonomy_version"]
+    row["error"] = "" if resume["text"].strip() else ocr.no_text_message(resume.get("stats"))
+    if with_signature and resume["text"]:
+        row["signature"] = get_minhasher().signature(resume["text"])
+    return row
+
+
+def score_resume(filename, data, job_requirements, with_signature=False, model=None):
+    """Extract, match and score one resume; runs inside a worker process"""
+    row = {"filename": filename}
+    try:
+        resume, cache_hit = analyze_resume(data, filename)
+        score_analysis(row, resume, cache_hit, job_requirements, with_signature, model)
+    except Exception as e:
+        row["error"] = str(e)
+    return row
+
+
+def apply_duplicate(row, dedup):
+    """Look the row up in a ``DedupIndex`` by its signature.
+
+    A near-duplicate of an earlier document keeps its own results and names
+    that document in ``duplicate_of`` with their ``similarity``; otherwise
+    the row is indexed as a new original. Returns the row.
+    """
+    signature = row.pop("signature", None)
+    if signature is None:
+        return row
+    original, similarity = dedup.check_or_add(signature, {"filename": row["filename"], "sha256": row["sha256"]})
+    if original is not None:
+        METRICS.increment("near_duplicates")
+        row["duplicate_of"] = original["filename"]
+        row["similarity"] = similarity
+    return row
+
+
+def _init_worker():
+    """Batch workers already run in parallel; keep PDF parsing and OCR inside each worker"""
+    extract.PDF_WORKERS = 1
+    ocr.OCR_WORKERS = 1
+
+
+def pool_context():
+    """Process start method that is safe inside a threaded server"""
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def screen_resumes(files, job_requirements, max_workers=None, max_in_flight=None, dedup=None, model=None,
+                   job_queue=None, tenant=None):
+    """Score every (filename, bytes) pair, yielding result rows as they finish.
+
+    Only ``max_in_flight`` documents are queued at a time so a 5,000 file
+    batch never holds every pickled payload in the pool at once. ``model``
+    is the ``ScoringModel`` for every row.
+
+    Near-duplicate flagging is opt-in: only with a ``DedupIndex`` as
+    ``dedup`` do workers also sign the extracted text, and near-duplicates
+    of earlier documents are flagged (see ``apply_duplicate``). Flagging
+    saves no processing, since the signature needs the full text; repeat
+    uploads of the same file are served by the analysis cache instead.
+
+    With a ``JobQueue`` as ``job_queue`` the documents are extracted on that
+    shared pool as jobs of ``tenant`` instead of on a pool of their own, and
+    scored in the calling thread.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or max_workers * 4
+    files = iter(files)
+    if job_queue is not None:
+        yield from _screen_on_queue(files, job_requirements, job_queue, tenant, max_in_flight, dedup, model)
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=pool_context(),
+                             initializer=_init_worker) as pool:
+        pending = set()
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < max_in_flight:
+                try:
+                    item = next(files)
+                except StopIteration:
+                    exhausted = True
+                    break
+                if isinstance(item, dict):
+                    yield item
+                    continue
+                filename, data = item
+                pending.add(pool.submit(score_resume, filename, data, job_requirements,
+                                        dedup is not None, model))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                row = future.result()
+                if "stats" in row:
+                    METRICS.record_document(row["filename"], row["stats"], row["cache_hit"])
+                if dedup is not None:
+                    apply_duplicate(row, dedup)
+                yield row
+
+
+def _screen_on_queue(files, job_requirements, job_queue, tenant, max_in_flight, dedup, model):
+    """``screen_resumes`` on a ``JobQueue``; the queue records the documents' metrics"""
+    from ats.jobs import DEFAULT_TENANT, DONE, QueueFull, UploadTooLarge
+
+    tenant = tenant or DEFAULT_TENANT
+    finished = queue.SimpleQueue()
+    in_flight = 0
+    waiting = None
+    exhausted = False
+    while in_flight or waiting or not exhausted:
+        while in_flight < max_in_flight:
+            if waiting is None:
+                waiting = next(files, None)
+                if waiting is None:
+                    exhausted = True
+                    break
+                if isinstance(waiting, dict):
+                    yield waiting
+                    waiting = None
+                    continue
+            filename, data = waiting
+            try:
+                job = job_queue.submit(data, filename, tenant=tenant)
+            except QueueFull:
+                break
+            except UploadTooLarge as e:
+                waiting = None
+                yield {"filename": filename, "error": str(e)}
+                continue
+            waiting = None
+            in_flight += 1
+            job_queue.add_done_callback(job, lambda job, filename=filename: finished.put((filename, job)))
+        if not in_flight:
+            if waiting is not None:
+                time.sleep(QUEUE_RETRY_SECONDS)
+                continue
+            break
+
+        filename, job = finished.get()
+        in_flight -= 1
+        row = {"filename": filename}
+        if job.state == DONE:
+            try:
+                score_analysis(row, job.result, job.cache_hit, job_requirements, dedup is not None, model)
+            except Exception as e:
+                row["error"] = str(e)
+        else:
+            row["error"] = job.error or "Cancelled"
+        if dedup is not None:
+            apply_duplicate(row, dedup)
+        yield row
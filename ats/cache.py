@@ -0,0 +1,233 @@
+"""Content-addressed cache for extracted resume text and skills"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from io import BytesIO
+
+from cachetools import LRUCache
+
+from ats import skills as skill_module
+from ats.extract import file_kind, iter_text_chunks
+from ats.skills import SkillScanner
+from ats.taxonomy import get_taxonomy
+
+# Bumped whenever extraction starts producing different text or fields for the same bytes
+EXTRACT_VERSION = 6
+
+
+def content_key(sha256, taxonomy_version=None):
+    """Cache key for a resume: hash of the file bytes, taxonomy version, extractor version and matching mode.
+
+    Cached skills are only valid for the taxonomy that produced them;
+    ``taxonomy_version`` defaults to the current ``get_taxonomy().tag``.
+    """
+    key = f"{sha256}-t{taxonomy_version or get_taxonomy().tag}-x{EXTRACT_VERSION}"
+    # Read at call time; the CLI switches fuzzy matching on after import
+    if skill_module.FUZZY_MATCHING:
+        key += "-fuzzy"
+    return key
+
+
+def _entry_size(entry):
+    return len(entry["text"]) + 64 * len(entry["skills"]) + 256
+
+
+class DiskTier:
+    """Directory of JSON entries evicted oldest-access-first above ``max_bytes``"""
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._total = sum(entry.stat().st_size for entry in os.scandir(directory)
+                          if entry.name.endswith(".json"))
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path)  # mark as recently used for eviction
+            return entry
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key, entry):
+        payload = json.dumps(entry).encode("utf-8")
+        if len(payload) > self.max_bytes:
+            return
+        path = self._path(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+        with self._lock:
+            try:
+                self._total -= os.path.getsize(path)
+            except OSError:
+                pass
+            # Atomic rename so concurrent readers never see a partial entry
+            os.replace(tmp_path, path)
+            self._total += len(payload)
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        entries = sorted((entry for entry in os.scandir(self.directory) if entry.name.endswith(".json")),
+                         key=lambda entry: entry.stat().st_mtime)
+        for entry in entries:
+            if self._total <= self.max_bytes * 0.9:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+                self._total -= size
+            except OSError:
+                pass
+
+
+class ResumeCache:
+    """In-memory LRU of analysed resumes with an optional on-disk tier"""
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, disk_dir=None, disk_max_bytes=1024 * 1024 * 1024):
+        self._memory = LRUCache(maxsize=max_bytes, getsizeof=_entry_size)
+        self._disk = DiskTier(disk_dir, disk_max_bytes) if disk_dir else None
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._memory.get(key)
+        if entry is None and self._disk is not None:
+            entry = self._disk.get(key)
+            if entry is not None:
+                self._remember(key, entry)
+        return entry
+
+    def _remember(self, key, entry):
+        # Entries larger than the whole memory tier only go to disk
+        if _entry_size(entry) > self._memory.maxsize:
+            return
+        with self._lock:
+            self._memory[key] = entry
+
+    def put(self, key, entry):
+        self._remember(key, entry)
+        if self._disk is not None:
+            self._disk.put(key, entry)
+
+    def get_or_compute(self, key, compute):
+        """Return (entry, hit); concurrent callers for one key compute it only once"""
+        entry = self.get(key)
+        # Counters change under the lock: the cache is shared by sessions and queue threads
+        with self._lock:
+            if entry is not None:
+                self.hits += 1
+                return entry, True
+            event = self._inflight.get(key)
+            owner = event is None
+            if owner:
+                event = self._inflight[key] = threading.Event()
+                self.misses += 1
+        if not owner:
+            event.wait()
+            entry = self.get(key)
+            with self._lock:
+                if entry is not None:
+                    self.hits += 1
+                    return entry, True
+                self.misses += 1
+
+        try:
+            entry = compute()
+            self.put(key, entry)
+            return entry, False
+        finally:
+            if owner:
+                with self._lock:
+                    self._inflight.pop(key, None)
+                event.set()
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_resume_cache():
+    """Process-wide cache shared by every session.
+
+    ``ATS_CACHE_MAX_MB`` sizes the memory tier and ``ATS_CACHE_DIR`` /
+    ``ATS_CACHE_DISK_MAX_MB`` enable the disk tier.
+    """
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ResumeCache(
+                max_bytes=int(os.environ.get("ATS_CACHE_MAX_MB", "64")) * 1024 * 1024,
+                disk_dir=os.environ.get("ATS_CACHE_DIR") or None,
+                disk_max_bytes=int(os.environ.get("ATS_CACHE_DISK_MAX_MB", "1024")) * 1024 * 1024,
+            )
+        return _default_cache
+
+
+def analyze_bytes(data, filename, mime_type=None, sha256=None, on_chunk=None, taxonomy=None):
+    """Extract text, skills and years of experience from file bytes, bypassing the cache.
+
+    ``on_chunk(count)`` is called after each parsed chunk (page for PDFs);
+    raising from it aborts the extraction. The result's ``stats`` hold the
+    time spent extracting and matching, the byte size and the page count.
+    """
+    # Skill matching runs on each page as soon as it is parsed
+    scanner = SkillScanner(taxonomy=taxonomy)
+    pieces = []
+    ocr_stats = {}
+    skills_seconds = 0.0
+    start = time.perf_counter()
+    for chunk in iter_text_chunks(BytesIO(data), filename, mime_type, ocr_stats):
+        chunk_start = time.perf_counter()
+        scanner.feed(chunk)
+        skills_seconds += time.perf_counter() - chunk_start
+        pieces.append(chunk)
+        if on_chunk is not None:
+            on_chunk(len(pieces))
+    chunk_start = time.perf_counter()
+    skills, years_experience = scanner.finish()
+    skills_seconds += time.perf_counter() - chunk_start
+    stats = {
+        "extract_seconds": time.perf_counter() - start - skills_seconds,
+        "skills_seconds": skills_seconds,
+        "bytes": len(data),
+        "pages": len(pieces) if file_kind(filename, mime_type) == "pdf" else 1,
+        **ocr_stats,
+    }
+    return {"sha256": sha256 or hashlib.sha256(data).hexdigest(), "text": "".join(pieces),
+            "skills": skills, "years_experience": years_experience, "skill_years": scanner.skill_years,
+            "skill_sections": scanner.skill_sections, "fuzzy_matches": scanner.fuzzy_matches,
+            "taxonomy_version": scanner.taxonomy.tag, "stats": stats}
+
+
+def analyze_resume(data, filename, mime_type=None, cache=None):
+    """Extract text, skills and years of experience for a resume, using the cache.
+
+    Returns ``(entry, hit)`` where ``entry`` holds ``sha256`` (of the file
+    bytes), ``text``, ``skills``, ``years_experience``, ``skill_years``
+    (years credited to each skill from dated jobs), ``skill_sections``
+    (resume sections each skill appeared in) and ``fuzzy_matches``
+    (skills credited through an alias or close spelling, see ``SkillScanner``),
+    plus the ``taxonomy_version`` that produced them. Extraction errors
+    propagate and are not cached.
+    """
+    cache = cache or get_resume_cache()
+    sha256 = hashlib.sha256(data).hexdigest()
+    # One taxonomy for the key and the extraction, even if a new one is swapped in between
+    taxonomy = get_taxonomy()
+    return cache.get_or_compute(content_key(sha256, taxonomy.tag),
+                                lambda: analyze_bytes(data, filename, mime_type, sha256, taxonomy=taxonomy))
@@ -0,0 +1,164 @@
+"""Plotly figures for the single-resume analysis
+
+Built here rather than inline in the Streamlit script so the benchmark
+suite can time figure construction the same way the app does it.
+
+``gap_chart`` and ``category_chart`` are what the app calls. Given a
+``key`` such as (resume hash, position, taxonomy version) they return the
+figure built for that key before, from an LRU cache shared by all sessions,
+so a rerun that changes nothing in the analysis builds nothing. In the
+``light`` mode (default: ``ATS_CHART_MODE``) figures are built with
+``plotly.graph_objects`` straight from the match results: no pandas, no
+plotly.express and no embedded template, which makes the spec Streamlit
+serializes on every rerun a fraction of the size.
+"""
+import os
+import threading
+from collections import Counter
+
+from cachetools import LRUCache
+
+from ats.taxonomy import get_taxonomy
+
+# "full" (plotly.express with the plotly_dark template) or "light"
+CHART_MODE = os.environ.get("ATS_CHART_MODE", "full")
+FIGURE_CACHE_SIZE = int(os.environ.get("ATS_FIGURE_CACHE_SIZE", "256"))
+CHART_MODES = ("full", "light")
+
+STATUS_COLORS = {'Matched': '#4ade80', 'Missing': '#ef4444'}
+
+# Shared dark styling of the analysis charts
+DARK_LAYOUT = dict(
+    plot_bgcolor='#1a1a1a',
+    paper_bgcolor='#1a1a1a',
+    font=dict(color='#ffffff', size=14, family="Arial Black")
+)
+
+
+def skill_status(candidate_skills, job_requirements):
+    """Matched/Missing status of every required and preferred skill of a position"""
+    candidate_skills_upper = {skill.upper() for skill in candidate_skills}
+    required = job_requirements["required_skills"]
+    rows = []
+    for skill in required + job_requirements["preferred_skills"]:
+        rows.append({
+            "Skill": skill,
+            "Status": "Matched" if skill.upper() in candidate_skills_upper else "Missing",
+            "Type": "Required" if skill in required else "Preferred"
+        })
+    return rows
+
+
+def category_counts(candidate_skills):
+    """Number of the candidate's skills in each non-empty skill category, in taxonomy order"""
+    taxonomy = get_taxonomy()
+    found = Counter(taxonomy.category_of[skill] for skill in candidate_skills if skill in taxonomy.category_of)
+    return {category: found[category] for category in taxonomy.categories if found[category]}
+
+
+def skills_gap_figure(candidate_skills, job_requirements):
+    """Grouped bar chart of matched and missing skills by requirement type"""
+    import pandas as pd
+    import plotly.express as px
+
+    df_skills = pd.DataFrame(skill_status(candidate_skills, job_requirements))
+    fig = px.bar(
+        df_skills.groupby(['Type', 'Status']).size().reset_index(name='Count'),
+        x='Type',
+        y='Count',
+        color='Status',
+        title='Skills Gap Analysis',
+        color_discrete_map=STATUS_COLORS,
+        template='plotly_dark'
+    )
+    fig.update_layout(**DARK_LAYOUT)
+    return fig
+
+
+def category_figure(candidate_skills):
+    """Pie chart of the candidate's skills by category, or None without categorized skills"""
+    import plotly.express as px
+
+    counts = category_counts(candidate_skills)
+    if not counts:
+        return None
+    fig = px.pie(
+        values=list(counts.values()),
+        names=list(counts.keys()),
+        title='Candidate Skills by Category',
+        template='plotly_dark'
+    )
+    fig.update_layout(**DARK_LAYOUT)
+    return fig
+
+
+def light_gap_figure(match):
+    """Skills gap bars from the counts of a ``calculate_skill_match`` result"""
+    import plotly.graph_objects as go
+
+    types = [kind for kind in ("Required", "Preferred") if match[f"total_{kind.lower()}"]]
+    matched = [match[f"{kind.lower()}_matches"] for kind in types]
+    counts = {
+        "Matched": matched,
+        "Missing": [match[f"total_{kind.lower()}"] - count for kind, count in zip(types, matched)],
+    }
+    fig = go.Figure(
+        [go.Bar(x=types, y=values, name=status, marker_color=STATUS_COLORS[status])
+         for status, values in counts.items() if any(values)],
+        layout=dict(title='Skills Gap Analysis', barmode='relative', template='none',
+                    xaxis_title='Type', yaxis_title='Count', legend_title='Status')
+    )
+    fig.update_layout(**DARK_LAYOUT)
+    return fig
+
+
+def light_category_figure(candidate_skills):
+    """``category_figure`` without plotly.express and its template"""
+    import plotly.graph_objects as go
+
+    counts = category_counts(candidate_skills)
+    if not counts:
+        return None
+    fig = go.Figure(
+        [go.Pie(labels=list(counts.keys()), values=list(counts.values()))],
+        layout=dict(title='Candidate Skills by Category', template='none')
+    )
+    fig.update_layout(**DARK_LAYOUT)
+    return fig
+
+
+_figures = LRUCache(maxsize=FIGURE_CACHE_SIZE)
+_figures_lock = threading.Lock()
+_MISSING = object()
+
+
+def _memoized(kind, key, mode, build):
+    """The figure of ``kind`` built for ``key`` in ``mode``, built on first use; ``key=None`` skips the cache"""
+    if key is None:
+        return build()
+    cache_key = (kind, mode) + tuple(key)
+    with _figures_lock:
+        fig = _figures.get(cache_key, _MISSING)
+    if fig is _MISSING:
+        fig = build()
+        with _figures_lock:
+            _figures[cache_key] = fig
+    return fig
+
+
+def gap_chart(candidate_skills, job_requirements, match, key=None, mode=None):
+    """Skills gap figure for a resume and position; ``match`` is their ``calculate_skill_match`` result.
+
+    Cached figures are shared, so callers must not modify them.
+    """
+    mode = mode or CHART_MODE
+    if mode == "light":
+        return _memoized("gap", key, mode, lambda: light_gap_figure(match))
+    return _memoized("gap", key, mode, lambda: skills_gap_figure(candidate_skills, job_requirements))
+
+
+def category_chart(candidate_skills, key=None, mode=None):
+    """Category figure of a resume, or None; its ``key`` is (resume hash, taxonomy version)"""
+    mode = mode or CHART_MODE
+    build = light_category_figure if mode == "light" else category_figure
+    return _memoized("category", key, mode, lambda: build(candidate_skills))
@@ -0,0 +1,160 @@
+"""Command line screening: score resumes against a position without the Streamlit UI
+
+    python -m ats --position "Data Scientist" resumes/ > scores.jsonl
+    python -m ats --position "DevOps Engineer" --format csv batch.zip -o scores.csv
+    cat resume.pdf | python -m ats --position "Data Scientist" --stdin-name resume.pdf -
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+from ats import skills
+from ats.batch import RESULT_FIELDS, iter_resume_files, screen_resumes
+from ats.dedup import DedupIndex
+from ats.extract import SUPPORTED_EXTENSIONS
+from ats.positions import CatalogError, PositionCatalog, get_position_catalog
+from ats.results import ResultLog, result_record
+from ats.scoring import ScoringModel
+from ats.sections import SECTION_WEIGHTS
+
+
+def iter_input_files(paths, stdin_name):
+    """Yield (filename, bytes) for files, directories (recursively), zips and stdin"""
+    for path in paths:
+        if path == "-":
+            yield stdin_name, sys.stdin.buffer.read()
+        elif os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.lower().endswith(SUPPORTED_EXTENSIONS + (".zip",)):
+                        full_path = os.path.join(root, name)
+                        with open(full_path, "rb") as f:
+                            yield from iter_resume_files([(full_path, f.read())])
+        else:
+            with open(path, "rb") as f:
+                yield from iter_resume_files([(path, f.read())])
+
+
+class JsonlWriter:
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, row):
+        self.stream.write(json.dumps({field: row.get(field) for field in RESULT_FIELDS}) + "\n")
+
+
+class CsvWriter:
+    def __init__(self, stream):
+        self.writer = csv.DictWriter(stream, fieldnames=RESULT_FIELDS, extrasaction="ignore")
+        self.writer.writeheader()
+
+    def write(self, row):
+        row = dict(row)
+        row["skills"] = "; ".join(row.get("skills") or [])
+        self.writer.writerow(row)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m ats",
+        description="Score resumes against a job position and write one result per resume."
+    )
+    parser.add_argument("paths", nargs="*", default=["-"],
+                        help="resume files, directories or zip archives; '-' reads one resume from stdin")
+    parser.add_argument("-p", "--position", help="position name to score against")
+    parser.add_argument("-c", "--catalog",
+                        help="YAML, JSON or Parquet position catalog (default: $ATS_POSITIONS_FILE or built-in)")
+    parser.add_argument("-f", "--format", choices=["jsonl", "csv"], default="jsonl")
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("--stdin-name", default="stdin.txt",
+                        help="filename used to detect the type of a resume read from stdin")
+    parser.add_argument("--sort", action="store_true",
+                        help="buffer results and write them best match first")
+    parser.add_argument("--dedup", action="store_true",
+                        help="flag near-duplicate resumes with the first copy they resemble")
+    parser.add_argument("--weights", nargs=3, type=float, metavar=("REQUIRED", "PREFERRED", "EXPERIENCE"),
+                        default=(0.7, 0.3, 0.0), help="relative weights of the overall score (default: 0.7 0.3 0)")
+    parser.add_argument("--related", action="store_true",
+                        help="give partial credit for related skills, e.g. Scikit-learn toward Machine Learning")
+    parser.add_argument("--section-weights", action="store_true",
+                        help="weigh skills by the resume section they appear in, e.g. half for education only")
+    parser.add_argument("--fuzzy", action="store_true",
+                        help="also match skill aliases and close spellings, e.g. k8s or Kubernates for Kubernetes "
+                             "(default: $ATS_FUZZY_SKILLS)")
+    parser.add_argument("--results-dir",
+                        help="also append every result to the Parquet screening dataset in this directory")
+    parser.add_argument("--list-positions", action="store_true", help="print position names and exit")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    try:
+        catalog = PositionCatalog(args.catalog) if args.catalog else get_position_catalog()
+    except (OSError, CatalogError) as e:
+        print(f"Could not load the position catalog: {e}", file=sys.stderr)
+        return 2
+    if args.list_positions:
+        for name in catalog:
+            print(name)
+        return 0
+    if args.position not in catalog:
+        print(f"Unknown position {args.position!r}; use --list-positions to see the options",
+              file=sys.stderr)
+        return 2
+
+    try:
+        model = ScoringModel(*args.weights, related=args.related,
+                             section_weights=SECTION_WEIGHTS if args.section_weights else None)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+
+    if args.fuzzy:
+        # Worker processes read the mode from the environment when they import ats.skills
+        os.environ["ATS_FUZZY_SKILLS"] = "1"
+        skills.FUZZY_MATCHING = True
+
+    out = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    writer = CsvWriter(out) if args.format == "csv" else JsonlWriter(out)
+    workers = args.workers or os.cpu_count() or 1
+
+    result_log = ResultLog(args.results_dir) if args.results_dir else None
+    count = errors = 0
+    start = time.perf_counter()
+    try:
+        rows = screen_resumes(iter_input_files(args.paths, args.stdin_name),
+                              catalog[args.position], max_workers=workers,
+                              dedup=DedupIndex() if args.dedup else None, model=model)
+        if args.sort:
+            rows = sorted(rows, key=lambda row: row.get("overall_score") or 0, reverse=True)
+        for row in rows:
+            writer.write(row)
+            count += 1
+            errors += bool(row.get("error"))
+            if result_log is not None and not row.get("error"):
+                result_log.append(result_record(row["sha256"], row["filename"], args.position,
+                                                catalog[args.position], row, row["skills"],
+                                                row["years_experience"], row["taxonomy_version"]))
+    finally:
+        if result_log is not None:
+            result_log.flush()
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+
+    print(f"Scored {count} resumes against {args.position} in {elapsed:.2f}s "
+          f"({count / elapsed if elapsed else 0:.1f} docs/s, {workers} workers, {errors} errors)",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,242 @@
+"""Near-duplicate resume detection with shingled MinHash and banded LSH
+
+Every document is reduced to a ``num_perm`` MinHash signature over its word
+5-shingles. The signature is cut into ``bands`` bands; two documents become
+candidates when any band matches exactly, and candidates are confirmed by
+the fraction of equal signature slots (an estimate of shingle Jaccard
+similarity).
+
+Each band's buckets live in a sorted NumPy array of band hashes plus a
+small dict of recent inserts that is merged in periodically, so lookups are
+a binary search per band and memory is roughly ``bands * 12`` bytes per
+document plus ``num_perm * 4`` for the stored signature. ``max_documents``
+bounds the pool; beyond it the oldest documents are forgotten first.
+"""
+import os
+import re
+import threading
+import zlib
+
+# Signature length, similarity cut-off and pool size of the default index
+NUM_PERM = int(os.environ.get("ATS_DEDUP_NUM_PERM", "128"))
+THRESHOLD = float(os.environ.get("ATS_DEDUP_THRESHOLD", "0.8"))
+MAX_DOCUMENTS = int(os.environ.get("ATS_DEDUP_MAX_DOCS", "1000000"))
+
+_WORD = re.compile(r'\w+')
+_MERSENNE = (1 << 61) - 1
+_MAX_HASH = 0xFFFFFFFF
+
+
+class MinHasher:
+    """Computes MinHash signatures of word shingles"""
+
+    def __init__(self, num_perm=128, shingle_size=5, seed=1):
+        import numpy as np
+
+        rng = np.random.RandomState(seed)
+        # a, b < 2**31 and 32-bit shingle hashes keep a * x + b inside uint64
+        self.a = rng.randint(1, 1 << 31, num_perm).astype(np.uint64)[:, None]
+        self.b = rng.randint(0, 1 << 31, num_perm).astype(np.uint64)[:, None]
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+
+    def shingles(self, text):
+        """Unique 32-bit hashes of the text's word shingles"""
+        import numpy as np
+
+        tokens = _WORD.findall(text.lower())
+        hashes = np.array([zlib.crc32(token.encode("utf-8")) for token in tokens], dtype=np.uint64)
+        size = min(self.shingle_size, len(hashes))
+        if size == 0:
+            return hashes
+        count = len(hashes) - size + 1
+        shingles = np.zeros(count, dtype=np.uint64)
+        for offset in range(size):
+            shingles = (shingles * np.uint64(1000003) + hashes[offset:offset + count]) & np.uint64(_MAX_HASH)
+        return np.unique(shingles)
+
+    def signature(self, text, block=4096):
+        """MinHash signature of the text as a uint32 array"""
+        import numpy as np
+
+        shingles = self.shingles(text)
+        signature = np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+        # Permute in blocks so very long documents do not build a huge matrix
+        for start in range(0, len(shingles), block):
+            permuted = (self.a * shingles[start:start + block] + self.b) % np.uint64(_MERSENNE)
+            signature = np.minimum(signature, (permuted & np.uint64(_MAX_HASH)).min(axis=1))
+        return signature.astype(np.uint32)
+
+
+class _Band:
+    """Band hash -> document ids, as a sorted array plus a dict of recent inserts"""
+
+    MERGE_AT = 50000
+
+    def __init__(self):
+        import numpy as np
+
+        self.keys = np.zeros(0, dtype=np.uint64)
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.recent = {}
+        self.recent_size = 0
+
+    def add(self, key, doc_id):
+        self.recent.setdefault(key, []).append(doc_id)
+        self.recent_size += 1
+
+    def lookup(self, key):
+        import numpy as np
+
+        start = np.searchsorted(self.keys, np.uint64(key), side="left")
+        stop = np.searchsorted(self.keys, np.uint64(key), side="right")
+        return list(self.ids[start:stop]) + self.recent.get(key, [])
+
+    def merge(self, oldest_live):
+        """Fold recent inserts into the sorted arrays, dropping evicted ids"""
+        import numpy as np
+
+        keys = [key for key, ids in self.recent.items() for _ in ids]
+        ids = [doc_id for doc_ids in self.recent.values() for doc_id in doc_ids]
+        all_keys = np.concatenate([self.keys, np.array(keys, dtype=np.uint64)])
+        all_ids = np.concatenate([self.ids, np.array(ids, dtype=np.int64)])
+        live = all_ids >= oldest_live
+        all_keys, all_ids = all_keys[live], all_ids[live]
+        order = np.argsort(all_keys, kind="stable")
+        self.keys, self.ids = all_keys[order], all_ids[order]
+        self.recent = {}
+        self.recent_size = 0
+
+    def nbytes(self):
+        return self.keys.nbytes + self.ids.nbytes + self.recent_size * 100
+
+
+class DedupIndex:
+    """LSH index of MinHash signatures with a payload per document.
+
+    Signatures come from ``signature(text)`` or any ``MinHasher`` built with
+    the same ``num_perm`` (e.g. in a worker process). ``find`` returns
+    ``(payload, similarity)`` for the most similar earlier document at or
+    above ``threshold``, else ``(None, 0.0)``; ``check_or_add`` also indexes
+    the document when nothing similar exists.
+    """
+
+    def __init__(self, num_perm=None, bands=16, threshold=None, max_documents=None):
+        import numpy as np
+
+        num_perm = num_perm or NUM_PERM
+        threshold = THRESHOLD if threshold is None else threshold
+        max_documents = max_documents or MAX_DOCUMENTS
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.hasher = get_minhasher(num_perm)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.max_documents = max_documents
+        self._band_tables = [_Band() for _ in range(bands)]
+        self._signatures = np.zeros((min(max_documents, 1024), num_perm), dtype=np.uint32)
+        self._payloads = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._band_weights = (np.uint64(0x9E3779B97F4A7C15) ** np.arange(1, self.rows + 1, dtype=np.uint64))
+
+    @property
+    def oldest_live(self):
+        return max(0, self._next_id - self.max_documents)
+
+    def _band_keys(self, signature):
+        import numpy as np
+
+        rows = signature.astype(np.uint64).reshape(self.bands, self.rows)
+        with np.errstate(over="ignore"):
+            return [int(key) for key in (rows * self._band_weights).sum(axis=1)]
+
+    def _slot(self, doc_id):
+        return doc_id % self.max_documents
+
+    def _find(self, signature, band_keys):
+        import numpy as np
+
+        oldest = self.oldest_live
+        candidates = set()
+        for band, key in zip(self._band_tables, band_keys):
+            candidates.update(doc_id for doc_id in band.lookup(key) if doc_id >= oldest)
+        best, best_similarity = None, 0.0
+        for doc_id in candidates:
+            similarity = float(np.mean(self._signatures[self._slot(doc_id)] == signature))
+            if similarity >= self.threshold and similarity > best_similarity:
+                best, best_similarity = doc_id, similarity
+        if best is None:
+            return None, 0.0
+        return self._payloads[self._slot(best)], best_similarity
+
+    def _add(self, signature, band_keys, payload):
+        import numpy as np
+
+        doc_id = self._next_id
+        self._next_id += 1
+        slot = self._slot(doc_id)
+        if slot >= len(self._signatures):
+            grown = np.zeros((min(self.max_documents, len(self._signatures) * 2), self._signatures.shape[1]),
+                             dtype=np.uint32)
+            grown[:len(self._signatures)] = self._signatures
+            self._signatures = grown
+        self._signatures[slot] = signature
+        self._payloads[slot] = payload
+        for band, key in zip(self._band_tables, band_keys):
+            band.add(key, doc_id)
+            if band.recent_size >= _Band.MERGE_AT:
+                band.merge(self.oldest_live)
+        return doc_id
+
+    def signature(self, text):
+        return self.hasher.signature(text)
+
+    def find(self, signature):
+        """(payload, similarity) of the closest earlier document at or above the threshold"""
+        with self._lock:
+            return self._find(signature, self._band_keys(signature))
+
+    def add(self, signature, payload):
+        with self._lock:
+            return self._add(signature, self._band_keys(signature), payload)
+
+    def check_or_add(self, signature, payload):
+        """Return the near-duplicate's (payload, similarity), or index the document and return (None, 0.0)"""
+        band_keys = self._band_keys(signature)
+        with self._lock:
+            found = self._find(signature, band_keys)
+            if found[0] is None:
+                self._add(signature, band_keys, payload)
+            return found
+
+    def __len__(self):
+        return self._next_id - self.oldest_live
+
+    def nbytes(self):
+        """Approximate memory held by the index, excluding payload objects"""
+        return self._signatures.nbytes + sum(band.nbytes() for band in self._band_tables)
+
+
+_hashers = {}
+_default_index = None
+_default_lock = threading.Lock()
+
+
+def get_minhasher(num_perm=None):
+    """Shared MinHasher; every process builds identical permutations from the fixed seed"""
+    num_perm = num_perm or NUM_PERM
+    hasher = _hashers.get(num_perm)
+    if hasher is None:
+        hasher = _hashers[num_perm] = MinHasher(num_perm)
+    return hasher
+
+
+def get_dedup_index():
+    """Process-wide index sized by ``ATS_DEDUP_*`` settings"""
+    global _default_index
+    with _default_lock:
+        if _default_index is None:
+            _default_index = DedupIndex()
+        return _default_index
@@ -0,0 +1,180 @@
+"""Years of experience from stated totals and employment date ranges
+
+Resumes state experience two ways: "6+ years of experience" in a summary
+and date ranges such as "2018-2020" or "Mar 2020 - Present" next to each
+job. The scan pattern built by ``scan_pattern`` finds both, together with
+the skills, line breaks, section headings and education keywords, in the
+same single ``finditer`` pass as skill matching; ``ExperienceTracker`` turns
+those events into merged employment intervals.
+
+Context rules:
+
+* ranges under an Education heading or on a line naming a degree or school
+  are not employment;
+* a skill on a job's date line or below it, up to the next heading or date
+  line, is credited with that job's interval.
+
+Total experience is the larger of the stated years and the merged
+intervals, so it never drops below what the stated-years regex alone found.
+"""
+import datetime
+import re
+
+from ats.sections import HEADING, section_of
+
+# Stated experience, e.g. "6+ years of experience"
+EXPERIENCE_PATTERN = re.compile(
+    r'(\d+)\+?\s*(?:years?|yrs?)\s*(?:of\s*)?(?:experience|exp)', re.IGNORECASE
+)
+
+_MONTHS = {"JAN": 1, "FEB": 2, "MAR": 3, "APR": 4, "MAY": 5, "JUN": 6,
+           "JUL": 7, "AUG": 8, "SEP": 9, "OCT": 10, "NOV": 11, "DEC": 12}
+# Written as a trie: the range branch is tried at every word boundary
+_MONTH_START = r'(?:J(?:AN|U[NL])|FEB|MA[RY]|A(?:PR|UG)|SEP|OCT|NOV|DEC)'
+_MONTH = _MONTH_START + r'[A-Z]*\.?'
+_YEAR = r'(?:19[5-9]\d|20\d\d)'
+
+
+def _point(prefix):
+    return (rf'(?:(?P<{prefix}_month>{_MONTH})\s+|(?P<{prefix}_num>0?[1-9]|1[0-2])/)?'
+            rf'(?P<{prefix}_year>{_YEAR})\b')
+
+
+_RANGE = (_point("from") + r'\s*(?:-|–|—|TO\b|UNTIL\b|THROUGH\b)\s*'
+          r'(?:' + _point("to") + r'|(?P<present>PRESENT|CURRENT|NOW|TODAY|DATE)\b)')
+_STATED = r'(?P<stated>\d+)\+?\s*(?:YEARS?|YRS?)\s*(?:OF\s*)?(?:EXPERIENCE|EXP)'
+_EDUCATION = (r'(?P<education>BACHELOR|MASTER\'?S? (?:OF|IN|DEGREE)|UNIVERSITY|COLLEGE|DEGREE|DIPLOMA'
+              r'|PH\.? ?D|MBA|B\.SC?\.?|M\.SC?\.?|HIGH SCHOOL|SCHOOL OF|INSTITUTE OF)\b')
+
+# Longest date range or stated phrase the scanner must keep across chunks
+MAX_EVENT_CHARS = 64
+
+
+def scan_pattern(skill_alternation):
+    """One pattern for experience events and the zero-width skill lookahead.
+
+    Text must be upper-cased and start with a newline. ``match.lastgroup``
+    names the event: ``skill``, ``range``, ``stated``, ``education`` or
+    ``heading`` (a newline followed by a line holding only a section title,
+    see ``ats.sections``).
+    Plain newlines are not matched; callers number lines with ``str.count``.
+    The skill lookahead comes first and matches nothing, so a date range or
+    keyword starting at the same word is still found by the retry at that
+    position.
+    """
+    return re.compile(
+        r'(?=\b)(?:(?=(?P<skill>' + skill_alternation + r')\b)'
+        r'|(?=\d|' + _MONTH_START + r')(?P<range>' + _RANGE + r')'
+        r'|' + _STATED + r'|' + _EDUCATION + r')'
+        r'|\n' + HEADING
+    )
+
+
+def _month_index(match, prefix, end):
+    year = int(match.group(prefix + "_year"))
+    month_name = match.group(prefix + "_month")
+    month_number = match.group(prefix + "_num")
+    if month_name:
+        return year * 12 + _MONTHS[month_name[:3]] - 1 + end
+    if month_number:
+        return year * 12 + int(month_number) - 1 + end
+    # A bare year counts from January, so "2018-2020" is two years
+    return year * 12
+
+
+def merge_intervals(intervals):
+    """Merge overlapping or touching [start, end) month intervals"""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def _months(intervals):
+    return sum(end - start for start, end in merge_intervals(intervals))
+
+
+class ExperienceTracker:
+    """Collects scan events for one document and computes experience from them.
+
+    Events arrive in text order with the number of the line they start on;
+    a skill counts towards the job whose date line is the closest one above
+    it, or on the same line, within the current section.
+    """
+
+    def __init__(self, today=None):
+        today = today or datetime.date.today()
+        self.now = today.year * 12 + today.month
+        self.stated_years = 0
+        self.intervals = []
+        self._skill_intervals = {}
+        self._current = []
+        self._line = 0
+        self._line_ranges = []
+        self._line_skills = set()
+        self._line_education = False
+        self._in_education = False
+
+    def event(self, match, line):
+        """Apply one non-skill match of ``scan_pattern`` starting on ``line``"""
+        kind = match.lastgroup
+        if kind == "heading":
+            # The match starts at the newline before the heading
+            self._end_line()
+            self._line = line + 1
+            self._current = []
+            self._in_education = section_of(match.group("title")) == "education"
+            return
+        if line != self._line:
+            self._end_line()
+            self._line = line
+        if kind == "range":
+            self._range(match)
+        elif kind == "stated":
+            self.stated_years = max(self.stated_years, int(match.group("stated")))
+        elif kind == "education":
+            self._line_education = True
+
+    def skill(self, indices, line):
+        if line != self._line:
+            self._end_line()
+            self._line = line
+        self._line_skills.update(indices)
+
+    def _range(self, match):
+        start = _month_index(match, "from", 0)
+        end = self.now if match.group("present") else _month_index(match, "to", 1)
+        if start < end <= self.now + 12:
+            self._line_ranges.append((start, end))
+
+    def _end_line(self):
+        if self._line_ranges and not (self._line_education or self._in_education):
+            # Skills keep the positions of their intervals in self.intervals
+            self._current = range(len(self.intervals), len(self.intervals) + len(self._line_ranges))
+            self.intervals.extend(self._line_ranges)
+        elif self._line_ranges:
+            self._current = []
+        if self._line_skills and self._current:
+            for index in self._line_skills:
+                self._skill_intervals.setdefault(index, set()).update(self._current)
+        self._line_ranges = []
+        self._line_skills = set()
+        self._line_education = False
+
+    def finish(self):
+        """Close the last line; returns (total years, {skill index: years})"""
+        self._end_line()
+        range_years = _months(self.intervals) // 12
+        # Skills listed under the same jobs share one computation
+        years_of = {}
+        skill_years = {}
+        for index, positions in self._skill_intervals.items():
+            positions = frozenset(positions)
+            if positions not in years_of:
+                years_of[positions] = round(_months(self.intervals[i] for i in positions) / 12, 1)
+            skill_years[index] = years_of[positions]
+        return max(self.stated_years, range_years), skill_years
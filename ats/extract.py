@@ -0,0 +1,332 @@
+"""Text extraction from uploaded resume files"""
+import logging
+import multiprocessing
+import os
+import re
+import shutil
+import signal
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from io import BytesIO
+from xml.etree import ElementTree
+
+from ats import ocr
+
+logger = logging.getLogger(__name__)
+
+PDF_MIME = "application/pdf"
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+SUPPORTED_EXTENSIONS = (".pdf", ".docx", ".txt")
+
+# Limits applied to uploads; a multi-hundred page portfolio should not block a worker
+PDF_MAX_PAGES = int(os.environ.get("ATS_PDF_MAX_PAGES", "40"))
+PDF_MAX_CHARS = int(os.environ.get("ATS_PDF_MAX_CHARS", "400000"))
+PDF_PAGE_TIMEOUT = float(os.environ.get("ATS_PDF_PAGE_TIMEOUT", "10"))
+PDF_WORKERS = int(os.environ.get("ATS_PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Documents shorter than this are parsed in-process; the pool round trip costs more
+PARALLEL_MIN_PAGES = 8
+PAGES_PER_TASK = 4
+
+# DOCX paragraphs are handed on in chunks of roughly this many characters
+DOCX_CHUNK_CHARS = 8192
+
+
+class PageTimeout(Exception):
+    """A single PDF page took longer than the per-page timeout"""
+
+
+def _can_alarm():
+    """Whether this thread can enforce a page deadline: SIGALRM only reaches a process's main thread"""
+    return hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+
+
+@contextmanager
+def _deadline(seconds):
+    """Raise PageTimeout after ``seconds``; only enforceable where ``_can_alarm()``.
+
+    Yields a dict whose ``expired`` flag tells callers the alarm fired even if
+    the parser wrapped PageTimeout in its own exception type.
+    """
+    state = {"expired": False}
+    if not seconds or not _can_alarm():
+        yield state
+        return
+
+    def expire(signum, frame):
+        state["expired"] = True
+        raise PageTimeout(f"page took longer than {seconds}s")
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield state
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _page_text(page, page_timeout):
+    """Text of one page, or "" if it times out; releases the page's parsed objects"""
+    try:
+        with _deadline(page_timeout) as state:
+            return page.extract_text() or ""
+    except Exception:
+        # pdfplumber re-raises PageTimeout as PdfminerException
+        if state["expired"]:
+            return ""
+        raise
+    finally:
+        page.close()
+
+
+def _extract_page_range(path, start, stop, page_timeout):
+    """Worker task: text of pages [start, stop) of the PDF file at ``path``"""
+    import pdfplumber
+
+    with pdfplumber.open(path) as pdf:
+        return [_page_text(pdf.pages[i], page_timeout) for i in range(start, stop)]
+
+
+def _pdf_path(pdf_file):
+    """(path, temporary) of a PDF given as a path, bytes or a file object.
+
+    Page-range tasks open the document by path, so only the path is pickled
+    into each task; bytes and file objects are written to a temporary file
+    the caller removes.
+    """
+    if isinstance(pdf_file, (str, os.PathLike)):
+        return os.fspath(pdf_file), False
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    with os.fdopen(fd, "wb") as f:
+        if isinstance(pdf_file, (bytes, bytearray)):
+            f.write(pdf_file)
+        else:
+            pdf_file.seek(0)
+            shutil.copyfileobj(pdf_file, f)
+    return path, True
+
+
+_page_pool = None
+_page_pool_lock = threading.Lock()
+
+
+def _get_page_pool(workers):
+    """Shared pool for page-parallel extraction, created on first use"""
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is None:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            _page_pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+        return _page_pool
+
+
+def iter_pdf_pages(pdf_file, max_pages=None, max_chars=None, page_timeout=None, workers=1):
+    """Yield the text of each PDF page in order.
+
+    Stops after ``max_pages`` pages or once ``max_chars`` characters have been
+    yielded. Pages that exceed ``page_timeout`` seconds yield "". With
+    ``workers`` > 1, long documents are split into page ranges parsed on a
+    shared process pool; results are still yielded in page order as soon as
+    each range is ready, and only a few ranges are in flight at once.
+
+    The timeout is a SIGALRM timer, which only works on a process's main
+    thread. Called from any other thread (a Streamlit script, a server
+    thread) with a timeout, every document goes through the pool, whose
+    workers parse on their main thread; on platforms without ``setitimer``
+    no timeout applies and a warning is logged.
+    """
+    source = BytesIO(pdf_file) if isinstance(pdf_file, (bytes, bytearray)) else pdf_file
+
+    # Imported on first use so the library loads without the PDF stack
+    import pdfplumber
+
+    chars = 0
+    with pdfplumber.open(source) as pdf:
+        page_count = len(pdf.pages)
+        if max_pages is not None:
+            page_count = min(page_count, max_pages)
+
+        in_process = workers <= 1 or page_count < PARALLEL_MIN_PAGES
+        if page_timeout and not _can_alarm():
+            if hasattr(signal, "setitimer"):
+                # Off the main thread; a pool worker can enforce the deadline
+                in_process = False
+            else:
+                logger.warning("No per-page timeout on this platform; a stuck PDF page can block extraction")
+        if in_process:
+            for i in range(page_count):
+                text = _page_text(pdf.pages[i], page_timeout)
+                yield text
+                chars += len(text)
+                if max_chars is not None and chars >= max_chars:
+                    return
+            return
+
+    workers = max(workers, 1)
+    pool = _get_page_pool(workers)
+    ranges = [(start, min(start + PAGES_PER_TASK, page_count))
+              for start in range(0, page_count, PAGES_PER_TASK)]
+    window = workers * 2
+    path, temporary = _pdf_path(pdf_file)
+    futures = []
+    try:
+        for start, stop in ranges[:window]:
+            futures.append(pool.submit(_extract_page_range, path, start, stop, page_timeout))
+        submitted = len(futures)
+        for index in range(len(ranges)):
+            texts = futures[index].result()
+            futures[index] = None  # drop the finished range so memory stays bounded
+            if submitted < len(ranges):
+                start, stop = ranges[submitted]
+                futures.append(pool.submit(_extract_page_range, path, start, stop, page_timeout))
+                submitted += 1
+            for text in texts:
+                yield text
+                chars += len(text)
+                if max_chars is not None and chars >= max_chars:
+                    return
+    finally:
+        for future in futures:
+            if future is not None:
+                future.cancel()
+        if temporary:
+            os.remove(path)
+
+
+def extract_text_from_pdf(pdf_file, max_pages=None, max_chars=None, page_timeout=None, workers=1):
+    """Extract text from PDF file"""
+    return "".join(iter_pdf_pages(pdf_file, max_pages, max_chars, page_timeout, workers))
+
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+_DOCX_RUN_TEXT = {
+    _W + "tab": "\t",
+    _W + "ptab": "\t",
+    _W + "cr": "\n",
+    _W + "noBreakHyphen": "-",
+}
+_DOCX_HEADER_PART = re.compile(r'word/(header|footer)\d*\.xml$')
+
+
+def _iter_docx_part(part):
+    """Yield one line per paragraph of a WordprocessingML part, parsed incrementally.
+
+    Paragraphs nested in tables and text boxes are included. The VML
+    fallback copy of each text box (mc:Fallback) is skipped so its text is
+    not counted twice, and finished elements are cleared as the parse goes
+    so memory stays flat however long the part is.
+    """
+    paragraphs = []
+    stack = []
+    fallback_depth = 0
+    for event, elem in ElementTree.iterparse(part, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            stack.append(elem)
+            if tag == _MC_FALLBACK:
+                fallback_depth += 1
+            elif tag == _W + "p" and not fallback_depth:
+                paragraphs.append([])
+            continue
+
+        stack.pop()
+        if tag == _MC_FALLBACK:
+            fallback_depth -= 1
+        elif fallback_depth:
+            pass
+        elif tag == _W + "t":
+            if paragraphs and elem.text:
+                paragraphs[-1].append(elem.text)
+        elif tag == _W + "br":
+            if paragraphs and elem.get(_W + "type", "textWrapping") == "textWrapping":
+                paragraphs[-1].append("\n")
+        elif tag in _DOCX_RUN_TEXT:
+            if paragraphs:
+                paragraphs[-1].append(_DOCX_RUN_TEXT[tag])
+        elif tag == _W + "p":
+            yield "".join(paragraphs.pop()) + "\n"
+
+        # Drop finished top-level blocks (paragraphs, tables) under the body
+        if len(stack) == 2:
+            stack[1].clear()
+
+
+def iter_docx_text(docx_file):
+    """Yield DOCX text paragraph by paragraph: headers, then the body, then footers.
+
+    Reads the XML parts straight from the zip; images and other media parts
+    are never decompressed.
+    """
+    with zipfile.ZipFile(docx_file) as archive:
+        parts = {"header": [], "footer": []}
+        for name in archive.namelist():
+            match = _DOCX_HEADER_PART.match(name)
+            if match:
+                parts[match.group(1)].append(name)
+        for name in sorted(parts["header"]) + ["word/document.xml"] + sorted(parts["footer"]):
+            with archive.open(name) as part:
+                yield from _iter_docx_part(part)
+
+
+def extract_text_from_docx(docx_file):
+    """Extract text from DOCX file"""
+    return "".join(iter_docx_text(docx_file))
+
+
+def file_kind(filename, mime_type=None):
+    """Classify an upload as 'pdf', 'docx' or 'txt' from its MIME type or extension"""
+    if mime_type == PDF_MIME:
+        return "pdf"
+    if mime_type == DOCX_MIME:
+        return "docx"
+    ext = os.path.splitext(filename)[1].lower()
+    if ext in (".pdf", ".docx"):
+        return ext[1:]
+    return "txt"
+
+
+def iter_text_chunks(file, filename, mime_type=None, stats=None):
+    """Yield a file's text in chunks: PDFs page by page with the upload limits, others whole.
+
+    Image-only PDF pages go through the OCR fallback; its counters are added
+    to ``stats`` when a dict is given.
+    """
+    kind = file_kind(filename, mime_type)
+    if kind == "pdf":
+        data = file.read() if hasattr(file, "read") else file
+        pages = iter_pdf_pages(data, PDF_MAX_PAGES, PDF_MAX_CHARS, PDF_PAGE_TIMEOUT, PDF_WORKERS)
+        if not ocr.OCR_ENABLED:
+            yield from pages
+            return
+        ocr_stats = ocr.new_ocr_stats()
+        try:
+            yield from ocr.with_ocr_fallback(pages, data, ocr_stats)
+        finally:
+            if stats is not None:
+                stats.update(ocr_stats)
+    elif kind == "docx":
+        # Batch paragraphs so the skill scanner sees a few large chunks
+        pieces = []
+        size = 0
+        for paragraph in iter_docx_text(file):
+            pieces.append(paragraph)
+            size += len(paragraph)
+            if size >= DOCX_CHUNK_CHARS:
+                yield "".join(pieces)
+                pieces, size = [], 0
+        if pieces:
+            yield "".join(pieces)
+    else:
+        yield str(file.read(), "utf-8")
+
+
+def extract_text(file, filename, mime_type=None):
+    """Extract text from a file-like object based on its type"""
+    return "".join(iter_text_chunks(file, filename, mime_type))
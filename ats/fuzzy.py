@@ -0,0 +1,175 @@
+"""Alias and character n-gram matching of resume phrases to canonical skills
+
+Exact matching only credits a skill when its taxonomy spelling appears in the
+text, so "Postgres", "k8s" or "Kubernates" earn nothing. In fuzzy mode the
+skill scanner matches the aliases of the current taxonomy in its regular pass
+(they are extra keys of the ``SkillMatcher``) and hands every word and
+two-word phrase of the document to ``SkillIndex``:
+
+- a phrase equal to a skill or alias once spaces and punctuation are dropped
+  ("Node JS", "scikit learn") maps to that skill;
+- other single words of at least ``MIN_FUZZY_CHARS`` characters are compared
+  with every one-word skill and alias by the Dice similarity of their
+  character bigrams, all words of a document in one batch of NumPy
+  operations, and map to the most similar skill at or above
+  ``FUZZY_THRESHOLD`` ("Kubernates"), or ``SAME_LENGTH_THRESHOLD`` for a word
+  as long as the skill ("Terrafrom"). Word pairs are left out of this step:
+  "Migration Testing" is as close to "Integration Testing" as a typo.
+
+Everything is computed locally from the taxonomy; there is no model to
+download.
+"""
+import re
+
+# Words of upper-cased text, without trailing punctuation
+PHRASE_WORD = re.compile(r"[A-Z0-9][A-Z0-9+#./\-]*[A-Z0-9+#]|[A-Z0-9]")
+
+# Shorter keys only match exactly ("Go", "R", "C#" never match fuzzily)
+MIN_EXACT_CHARS = 3
+MIN_FUZZY_CHARS = 6
+MAX_FUZZY_CHARS = 40
+# Dice similarity of character bigrams; 0.8 accepts one typo in a ten-letter
+# word and rejects inflections such as "Expressed" for "Express". Swapped or
+# replaced letters keep the length and cost more bigrams ("Terrafrom")
+FUZZY_THRESHOLD = 0.8
+SAME_LENGTH_THRESHOLD = 0.7
+
+_NOT_KEY = re.compile(r"[^A-Z0-9+#]")
+# The only characters of PHRASE_WORD phrases that compact_key drops
+_PHRASE_DROP = str.maketrans("", "", " ./-")
+
+
+def compact_key(text):
+    """Upper-cased text without spaces and punctuation: "Node JS" and "Node.js" both give NODEJS"""
+    return _NOT_KEY.sub("", text.upper())
+
+
+def _bigram_codes(keys):
+    """(key number, bigram code) of every bigram of the padded keys, as NumPy arrays"""
+    import numpy as np
+
+    # "<KEY>" padding makes first and last letters count; NUL separates keys
+    data = np.frombuffer("".join(f"<{key}>\0" for key in keys).encode("ascii"), dtype=np.uint8)
+    lengths = np.fromiter((len(key) + 3 for key in keys), dtype=np.int64, count=len(keys))
+    owner = np.repeat(np.arange(len(keys)), lengths)[:-1]
+    valid = (data[:-1] != 0) & (data[1:] != 0)
+    codes = data[:-1].astype(np.int64) * 256 + data[1:]
+    return owner[valid], codes[valid]
+
+
+def index_tables(skills, aliases=None):
+    """(exact key -> skill index, dict of NumPy arrays) behind a ``SkillIndex``"""
+    import numpy as np
+
+    skills = list(skills)
+    position = {skill: i for i, skill in enumerate(skills)}
+    names = [(skill, i) for i, skill in enumerate(skills)]
+    names += [(alias, position[canonical]) for alias, canonical in (aliases or {}).items()
+              if canonical in position]
+
+    exact = {}
+    fuzzy = {}
+    for name, index in names:
+        key = compact_key(name)
+        if len(key) >= MIN_EXACT_CHARS:
+            exact.setdefault(key, index)
+        if len(key) >= MIN_FUZZY_CHARS and " " not in name.strip():
+            fuzzy.setdefault(key, index)
+    keys = list(fuzzy)
+
+    # Unique (entry, bigram) pairs, then postings grouped by bigram id
+    owner, codes = _bigram_codes(keys)
+    pairs = np.unique(owner * 65536 + codes)
+    owner, codes = pairs // 65536, pairs % 65536
+    vocabulary, bigram_ids = np.unique(codes, return_inverse=True)
+    # Keys use some 40 distinct characters, so bigram ids fit in int16
+    bigram_id = np.full(65536, -1, dtype=np.int16)
+    bigram_id[vocabulary] = np.arange(len(vocabulary))
+    posting_count = np.bincount(bigram_ids, minlength=len(vocabulary))
+    arrays = {
+        "entry_skill": np.array([fuzzy[key] for key in keys], dtype=np.int64),
+        "entry_length": np.array([len(key) for key in keys], dtype=np.int64),
+        "entry_size": np.bincount(owner, minlength=len(keys)),
+        "bigram_id": bigram_id,
+        "postings": owner[np.argsort(bigram_ids, kind="stable")],
+        "posting_count": posting_count,
+        "posting_start": np.cumsum(posting_count) - posting_count,
+    }
+    return exact, {name: array.astype(np.int32) if array.dtype == np.int64 else array
+                   for name, array in arrays.items()}
+
+
+class SkillIndex:
+    """Skills and aliases of a taxonomy, searchable by exact compact key and by bigram similarity.
+
+    ``match`` returns ``{skill index: phrase}``. The bigram postings are
+    stored as flat arrays so a whole document is scored with a few
+    ``np.repeat``/``np.bincount`` calls instead of a loop over phrases.
+    ``tables`` takes prebuilt ``index_tables`` output, such as the
+    memory-mapped arrays of a compiled taxonomy (see ``ats.taxonomy``).
+    """
+
+    def __init__(self, skills, aliases=None, tables=None):
+        self.skills = list(skills)
+        self._exact, arrays = tables or index_tables(self.skills, aliases)
+        self._entry_skill = arrays["entry_skill"]
+        self._entry_length = arrays["entry_length"]
+        self._entry_size = arrays["entry_size"]
+        self._bigram_id = arrays["bigram_id"]
+        self._postings = arrays["postings"]
+        self._posting_count = arrays["posting_count"]
+        self._posting_start = arrays["posting_start"]
+
+    def match(self, phrases):
+        """Map ``PHRASE_WORD`` words and word pairs to skills; returns {skill index: phrase}"""
+        import numpy as np
+
+        found = {}
+        candidates = []
+        exact = self._exact
+        for phrase in phrases:
+            key = phrase.translate(_PHRASE_DROP)
+            index = exact.get(key)
+            if index is not None:
+                found.setdefault(index, phrase)
+            elif MIN_FUZZY_CHARS <= len(key) <= MAX_FUZZY_CHARS and " " not in phrase:
+                candidates.append((key, phrase))
+        if not candidates or not len(self._entry_size):
+            return found
+
+        # Unique bigrams of each candidate; its size counts bigrams no skill has
+        owner, codes = _bigram_codes([key for key, _ in candidates])
+        pairs = np.unique(owner * 65536 + codes)
+        owner, codes = pairs // 65536, pairs % 65536
+        sizes = np.bincount(owner, minlength=len(candidates))
+        ids = self._bigram_id[codes]
+        known = ids >= 0
+        owner, ids = owner[known], ids[known]
+
+        # One (candidate, entry) hit per shared bigram, counted per cell
+        counts = self._posting_count[ids]
+        total = int(counts.sum())
+        offsets = np.repeat(self._posting_start[ids] - (np.cumsum(counts) - counts), counts) + np.arange(total)
+        entries = len(self._entry_size)
+        shared = np.bincount(np.repeat(owner, counts) * entries + self._postings[offsets],
+                             minlength=len(candidates) * entries).reshape(len(candidates), entries)
+        similarity = 2 * shared / (sizes[:, None] + self._entry_size[None, :])
+        best = similarity.argmax(axis=1)
+        score = similarity[np.arange(len(candidates)), best]
+        lengths = np.fromiter((len(key) for key, _ in candidates), dtype=np.int64, count=len(candidates))
+        threshold = np.where(lengths == self._entry_length[best], SAME_LENGTH_THRESHOLD, FUZZY_THRESHOLD)
+        for row in np.flatnonzero(score >= threshold):
+            found.setdefault(int(self._entry_skill[best[row]]), candidates[row][1])
+        return found
+
+
+_indexes = {}
+
+
+def get_skill_index(skills, aliases=None):
+    """Return the ``SkillIndex`` of a taxonomy, building it on first use"""
+    key = (tuple(skills), tuple(sorted((aliases or {}).items())))
+    index = _indexes.get(key)
+    if index is None:
+        index = _indexes[key] = SkillIndex(skills, aliases)
+    return index
@@ -0,0 +1,471 @@
+"""Background processing of uploads so page runs never block on parsing
+
+Uploads are submitted to a process-wide ``JobQueue`` backed by a bounded
+process pool. Worker processes report pages parsed over a multiprocessing
+queue and check a shared cancel flag between pages, so the page can poll a
+job's progress and cancel it while the Streamlit server threads stay free.
+
+Jobs wait in one queue per tenant (a recruiting team sharing the
+deployment) and are handed to the pool only when a worker is free, taking
+tenants in turn, so another team's single upload waits for a free worker
+rather than behind a whole batch of large PDFs (``benchmarks/load_test.py``
+measures what that buys). Per-tenant quotas cap how many of a team's jobs run
+and wait at once. In server mode (``ATS_SERVER_MODE``) batch screening goes
+through the same queue instead of a pool of its own, so every extraction of
+the deployment shares one set of workers.
+"""
+import hashlib
+import itertools
+import os
+import re
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from ats import extract, ocr
+from ats.batch import pool_context
+from ats.cache import analyze_bytes, content_key, get_resume_cache
+from ats.metrics import METRICS
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# Send batch screening through the shared queue as well as single uploads
+SERVER_MODE = os.environ.get("ATS_SERVER_MODE", "0") != "0"
+
+DEFAULT_TENANT = "default"
+# Request header naming the session's tenant; the app falls back to the ?team= query parameter
+TENANT_HEADER = os.environ.get("ATS_TENANT_HEADER", "")
+_NOT_TENANT_CHAR = re.compile(r"[^A-Za-z0-9_.-]")
+
+# Finished jobs are kept this long for pages to pick up their results
+JOB_RETENTION_SECONDS = 15 * 60
+# Period of the worker utilization in ``stats``
+UTILIZATION_SECONDS = 60
+
+
+class QueueFull(Exception):
+    """The queue is at capacity; the caller should retry later"""
+
+
+class UploadTooLarge(ValueError):
+    """The upload is over the queue's size limit"""
+
+
+class JobCancelled(Exception):
+    """Raised inside a worker when its job was cancelled"""
+
+
+def tenant_name(value):
+    """Tenant for a header or query parameter value: up to 64 letters, digits, ".", "_" and "-".
+
+    Tenants only share out the workers; they are not an access control.
+    """
+    return _NOT_TENANT_CHAR.sub("", value or "")[:64] or DEFAULT_TENANT
+
+
+class Job:
+    """State of one upload as seen by the page"""
+
+    def __init__(self, job_id, filename, sha256, tenant=DEFAULT_TENANT):
+        self.id = job_id
+        self.filename = filename
+        self.sha256 = sha256
+        self.tenant = tenant
+        self.state = QUEUED
+        self.pages = 0
+        self.result = None
+        self.error = None
+        self.cache_hit = False
+        self.submitted_at = time.time()
+        self.dispatched_at = None
+        self.started_at = None
+        self.finished_at = None
+        self._future = None
+        # The pool the job was handed to, to tell a dead pool from its replacement
+        self._pool = None
+        self._slot = None
+        # (data, mime_type) until the job is handed to the pool
+        self._payload = None
+        self._callbacks = []
+
+    @property
+    def finished(self):
+        return self.state in (DONE, FAILED, CANCELLED)
+
+
+# Worker process globals, set by _init_worker
+_progress = None
+_cancel_flags = None
+
+
+def _init_worker(progress, cancel_flags):
+    global _progress, _cancel_flags
+    _progress = progress
+    _cancel_flags = cancel_flags
+    extract.PDF_WORKERS = 1
+    ocr.OCR_WORKERS = 1
+
+
+def _process_upload(job_id, slot, data, filename, mime_type, sha256):
+    """Worker task: analyse one upload, reporting each parsed chunk"""
+    _progress.put((job_id, 0))
+
+    def on_chunk(count):
+        if _cancel_flags[slot]:
+            raise JobCancelled()
+        _progress.put((job_id, count))
+
+    return analyze_bytes(data, filename, mime_type, sha256, on_chunk)
+
+
+class JobQueue:
+    """Bounded pool of upload jobs with progress, cancellation, backpressure and per-tenant fairness.
+
+    At most ``max_workers`` jobs parse at once and at most ``max_pending``
+    more wait; further submissions raise ``QueueFull``. Identical bytes
+    submitted while a job is active join that job, and bytes already in the
+    resume cache complete immediately without touching the pool.
+
+    Waiting jobs are kept per tenant and dispatched round-robin: each free
+    worker takes the oldest job of the next tenant in turn.
+    ``tenant_max_running`` caps the workers one tenant may hold and
+    ``tenant_max_pending`` the jobs it may have waiting (``QueueFull``);
+    uploads over ``max_upload_bytes`` raise ``UploadTooLarge``. Zero or None
+    means no limit.
+
+    A worker that dies (killed, out of memory) breaks the whole process
+    pool: the jobs it held fail, the pool is replaced with a new one on the
+    same progress queue and cancel flags, and waiting jobs run there.
+    """
+
+    def __init__(self, max_workers=None, max_pending=32, cache=None, tenant_max_running=None,
+                 tenant_max_pending=None, max_upload_bytes=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.tenant_max_running = tenant_max_running
+        self.tenant_max_pending = tenant_max_pending
+        self.max_upload_bytes = max_upload_bytes
+        self.cache = cache or get_resume_cache()
+
+        self._context = pool_context()
+        self._progress = self._context.Queue()
+        slots = self.max_workers + self.max_pending
+        self._cancel_flags = self._context.Array("b", slots, lock=False)
+        self._free_slots = list(range(slots))
+        self._pool = self._new_pool()
+
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._active_by_hash = {}
+        self._ids = itertools.count(1)
+        # Waiting jobs per tenant, in the order tenants get their next turn
+        self._waiting = {}
+        self._running = Counter()
+        self._in_pool = set()
+        # (dispatched_at, finished_at) of jobs that left the pool, for utilization
+        self._recent_runs = deque()
+        self._listener = threading.Thread(target=self._listen, name="ats-job-progress", daemon=True)
+        self._listener.start()
+
+    def _new_pool(self):
+        return ProcessPoolExecutor(max_workers=self.max_workers, mp_context=self._context,
+                                   initializer=_init_worker, initargs=(self._progress, self._cancel_flags))
+
+    def _replace_pool(self, broken):
+        """Swap a broken pool for a new one; caller holds the lock"""
+        if broken is not self._pool:
+            return
+        METRICS.increment("pool_restarts")
+        self._pool = self._new_pool()
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _listen(self):
+        """Apply progress messages from the workers"""
+        while True:
+            message = self._progress.get()
+            if message is None:
+                return
+            job_id, pages = message
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is not None and not job.finished:
+                    if job.state == QUEUED:
+                        job.state = RUNNING
+                        job.started_at = time.time()
+                    job.pages = pages
+
+    def submit(self, data, filename, mime_type=None, tenant=DEFAULT_TENANT):
+        """Queue an upload for ``tenant`` and return its Job"""
+        if self.max_upload_bytes and len(data) > self.max_upload_bytes:
+            METRICS.increment("uploads_too_large")
+            raise UploadTooLarge(f"{filename} is {len(data) / 1024 / 1024:.1f} MB; "
+                                 f"the limit is {self.max_upload_bytes / 1024 / 1024:.1f} MB")
+        sha256 = hashlib.sha256(data).hexdigest()
+        cached = self.cache.get(content_key(sha256))
+
+        with self._lock:
+            self._prune()
+            job = Job(next(self._ids), filename, sha256, tenant)
+            if cached is not None:
+                job.state = DONE
+                job.result = cached
+                job.cache_hit = True
+                job.started_at = job.finished_at = job.submitted_at
+                self._jobs[job.id] = job
+                METRICS.record_document(filename, None, cache_hit=True, tenant=tenant)
+                return job
+
+            active = self._active_by_hash.get(sha256)
+            if active is not None:
+                return self._jobs[active]
+            if not self._free_slots:
+                METRICS.increment("queue_full")
+                raise QueueFull(f"{self.max_workers + self.max_pending} uploads already in progress")
+            waiting = self._waiting.get(tenant)
+            if self.tenant_max_pending and waiting and len(waiting) >= self.tenant_max_pending:
+                METRICS.increment("queue_full")
+                raise QueueFull(f"{len(waiting)} uploads of {tenant} already waiting")
+
+            job._slot = self._free_slots.pop()
+            self._cancel_flags[job._slot] = 0
+            job._payload = (data, mime_type)
+            if waiting is None:
+                # A tenant with nothing waiting joins at the back of the line
+                waiting = self._waiting[tenant] = deque()
+            waiting.append(job)
+            self._jobs[job.id] = job
+            self._active_by_hash[sha256] = job.id
+            dispatched = self._dispatch()
+        self._watch(dispatched)
+        return job
+
+    def _next_job(self):
+        """Oldest job of the first tenant in turn that is under its quota; caller holds the lock"""
+        for tenant, waiting in self._waiting.items():
+            if self.tenant_max_running and self._running[tenant] >= self.tenant_max_running:
+                continue
+            job = waiting.popleft()
+            # The tenant goes to the back of the line
+            del self._waiting[tenant]
+            if waiting:
+                self._waiting[tenant] = waiting
+            return job
+        return None
+
+    def _release(self, job):
+        """Give back a finished job's slot and hash; caller holds the lock and runs the returned callbacks"""
+        job.finished_at = time.time()
+        self._free_slots.append(job._slot)
+        if self._active_by_hash.get(job.sha256) == job.id:
+            del self._active_by_hash[job.sha256]
+        callbacks, job._callbacks = job._callbacks, []
+        return callbacks
+
+    def _dispatch(self):
+        """Hand waiting jobs to free workers; caller holds the lock and passes the result to _watch.
+
+        Returns the jobs handed to the pool and (job, callbacks) of jobs the
+        pool refused, which fail without running.
+        """
+        dispatched = []
+        failed = []
+        while len(self._in_pool) < self.max_workers:
+            job = self._next_job()
+            if job is None:
+                break
+            data, mime_type = job._payload
+            job._payload = None
+            try:
+                try:
+                    job._future = self._pool.submit(_process_upload, job.id, job._slot, data, job.filename,
+                                                    mime_type, job.sha256)
+                except BrokenProcessPool:
+                    # A worker died and the pool's jobs have not all finished yet
+                    self._replace_pool(self._pool)
+                    job._future = self._pool.submit(_process_upload, job.id, job._slot, data, job.filename,
+                                                    mime_type, job.sha256)
+            except Exception as e:
+                job.state, job.error = FAILED, f"Could not start processing: {e}"
+                failed.append((job, self._release(job)))
+                continue
+            job._pool = self._pool
+            job.dispatched_at = time.time()
+            self._running[job.tenant] += 1
+            self._in_pool.add(job)
+            dispatched.append(job)
+        self._publish()
+        return dispatched, failed
+
+    def _watch(self, dispatched):
+        # Outside the lock: a future that is already done runs the callback right away
+        jobs, failed = dispatched
+        for job in jobs:
+            job._future.add_done_callback(lambda future, job=job: self._finish(job, future))
+        for job, callbacks in failed:
+            for callback in callbacks:
+                callback(job)
+
+    def _publish(self):
+        """Queue depth and running jobs per tenant as metric gauges; caller holds the lock"""
+        for tenant in set(self._running) | set(self._waiting):
+            METRICS.set_gauge("queue_depth", len(self._waiting.get(tenant, ())), tenant=tenant)
+            METRICS.set_gauge("jobs_running", self._running[tenant], tenant=tenant)
+        METRICS.set_gauge("workers_busy", len(self._in_pool))
+        METRICS.set_gauge("workers", self.max_workers)
+        # Idle tenants were just published at zero; forget them
+        self._running = +self._running
+
+    def _finish(self, job, future):
+        error = None
+        result = None
+        try:
+            result = future.result()
+        except (CancelledError, JobCancelled):
+            pass
+        except Exception as e:
+            error = e
+
+        if result is not None:
+            # Keyed by the taxonomy the worker used, which may be newer than the one at submit
+            self.cache.put(content_key(job.sha256, result["taxonomy_version"]), result)
+        with self._lock:
+            if job.state != CANCELLED:
+                if result is not None:
+                    job.state, job.result = DONE, result
+                elif error is not None:
+                    job.state, job.error = FAILED, str(error)
+                else:
+                    job.state = CANCELLED
+            if isinstance(error, BrokenProcessPool):
+                self._replace_pool(job._pool)
+            job._pool = None
+            callbacks = self._release(job)
+            self._in_pool.discard(job)
+            self._running[job.tenant] -= 1
+            self._recent_runs.append((job.dispatched_at, job.finished_at))
+            dispatched = self._dispatch()
+        self._watch(dispatched)
+        METRICS.increment("worker_busy_seconds", job.finished_at - job.dispatched_at)
+        if result is not None:
+            METRICS.record_document(job.filename, result["stats"], cache_hit=False, tenant=job.tenant,
+                                    queue_wait_seconds=job.dispatched_at - job.submitted_at,
+                                    job_seconds=job.finished_at - job.submitted_at)
+        for callback in callbacks:
+            callback(job)
+
+    def add_done_callback(self, job, callback):
+        """Call ``callback(job)`` once the job finishes, right away if it already has"""
+        with self._lock:
+            if not job.finished:
+                job._callbacks.append(callback)
+                return
+        callback(job)
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """Cancel a queued or running job; returns False if it already finished"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return False
+            job.state = CANCELLED
+            if self._active_by_hash.get(job.sha256) == job.id:
+                del self._active_by_hash[job.sha256]
+            if job._future is not None:
+                # A running worker notices the flag before its next page
+                self._cancel_flags[job._slot] = 1
+                future = job._future
+            else:
+                # Still waiting for a worker: drop it from its tenant's queue
+                waiting = self._waiting[job.tenant]
+                waiting.remove(job)
+                if not waiting:
+                    del self._waiting[job.tenant]
+                job._payload = None
+                callbacks = self._release(job)
+                self._publish()
+                future = None
+        if future is not None:
+            future.cancel()
+        else:
+            for callback in callbacks:
+                callback(job)
+        return True
+
+    def _prune(self):
+        """Forget finished jobs past their retention; caller holds the lock"""
+        cutoff = time.time() - JOB_RETENTION_SECONDS
+        for job_id in [job_id for job_id, job in self._jobs.items()
+                       if job.finished_at is not None and job.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    def _utilization(self, now):
+        """Share of worker time spent on jobs over the last ``UTILIZATION_SECONDS``; caller holds the lock"""
+        start = now - UTILIZATION_SECONDS
+        while self._recent_runs and self._recent_runs[0][1] < start:
+            self._recent_runs.popleft()
+        busy = sum(end - max(begin, start) for begin, end in self._recent_runs)
+        busy += sum(now - max(job.dispatched_at, start) for job in self._in_pool)
+        return busy / (self.max_workers * UTILIZATION_SECONDS)
+
+    def stats(self):
+        with self._lock:
+            states = [job.state for job in self._jobs.values()]
+            tenants = {
+                tenant: {"queued": len(self._waiting.get(tenant, ())), "running": self._running[tenant]}
+                for tenant in sorted(set(self._running) | set(self._waiting))
+            }
+            busy = len(self._in_pool)
+            utilization = self._utilization(time.time())
+        return {
+            "queued": states.count(QUEUED),
+            "running": states.count(RUNNING),
+            "capacity": self.max_workers + self.max_pending,
+            "workers": self.max_workers,
+            "busy": busy,
+            "utilization": utilization,
+            "tenants": tenants,
+        }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        # Stop the listener before closing the queue it reads from
+        self._progress.put(None)
+        self._listener.join()
+        self._progress.close()
+        self._progress.join_thread()
+
+
+_default_queue = None
+_default_lock = threading.Lock()
+
+
+def get_job_queue():
+    """Process-wide queue shared by every session.
+
+    ``ATS_JOB_WORKERS`` sizes the pool (default: CPU count) and
+    ``ATS_JOB_MAX_PENDING`` bounds how many uploads may wait.
+    ``ATS_TENANT_MAX_RUNNING`` and ``ATS_TENANT_MAX_PENDING`` set the
+    per-tenant quotas and ``ATS_MAX_UPLOAD_MB`` the largest accepted upload
+    (default: no limit for all three).
+    """
+    global _default_queue
+    with _default_lock:
+        if _default_queue is None:
+            _default_queue = JobQueue(
+                max_workers=int(os.environ.get("ATS_JOB_WORKERS", "0")) or None,
+                max_pending=int(os.environ.get("ATS_JOB_MAX_PENDING", "32")),
+                tenant_max_running=int(os.environ.get("ATS_TENANT_MAX_RUNNING", "0")),
+                tenant_max_pending=int(os.environ.get("ATS_TENANT_MAX_PENDING", "0")),
+                max_upload_bytes=int(float(os.environ.get("ATS_MAX_UPLOAD_MB", "0")) * 1024 * 1024),
+            )
+        return _default_queue
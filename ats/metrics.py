@@ -0,0 +1,190 @@
+"""Per-stage latency and throughput metrics with Prometheus and JSON export
+
+Recording is a lock plus a bisect into fixed buckets, cheap enough to leave
+on in production. Each stage keeps cumulative bucket counts (for Prometheus)
+and a ring of one-minute windows (for the recent quantiles shown in the
+diagnostics panel). Gauges hold current values such as the job queue depth
+of each tenant.
+"""
+import json
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+
+# Upper bounds in seconds; the last bucket is +Inf
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+WINDOW_SECONDS = 60
+WINDOWS = 10
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Histogram:
+    """Bucketed durations, cumulative and over the last ``WINDOWS`` minutes"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._recent = deque(maxlen=WINDOWS)
+
+    def observe(self, value, now):
+        index = bisect_left(BUCKETS, value)
+        self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+        window = int(now // WINDOW_SECONDS)
+        if not self._recent or self._recent[-1][0] != window:
+            self._recent.append([window, [0] * len(self.counts), 0.0, 0])
+        recent = self._recent[-1]
+        recent[1][index] += 1
+        recent[2] += value
+        recent[3] += 1
+
+    def recent(self, now):
+        """(bucket counts, sum, count) over the windows still inside the rolling period"""
+        oldest = int(now // WINDOW_SECONDS) - WINDOWS + 1
+        counts = [0] * len(self.counts)
+        total, count = 0.0, 0
+        for window, window_counts, window_sum, window_count in self._recent:
+            if window >= oldest:
+                counts = [a + b for a, b in zip(counts, window_counts)]
+                total += window_sum
+                count += window_count
+        return counts, total, count
+
+    @staticmethod
+    def quantile(counts, q):
+        """Bucket upper bound below which a fraction ``q`` of observations fall"""
+        target = q * sum(counts)
+        seen = 0
+        for index, bucket_count in enumerate(counts):
+            seen += bucket_count
+            if bucket_count and seen >= target:
+                return BUCKETS[index] if index < len(BUCKETS) else float("inf")
+        return 0.0
+
+
+class Metrics:
+    """Stage histograms, counters, gauges and a short log of recent documents"""
+
+    def __init__(self, recent_documents=200):
+        self._lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+        # (name, sorted label items) -> value
+        self.gauges = {}
+        self.documents = deque(maxlen=recent_documents)
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram()
+            histogram.observe(seconds, time.time())
+
+    @contextmanager
+    def timer(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def increment(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def set_gauge(self, name, value, **labels):
+        with self._lock:
+            self.gauges[(name, tuple(sorted(labels.items())))] = value
+
+    def record_document(self, filename, stats, cache_hit, **extra):
+        """Record the extraction stats of one analysed document.
+
+        ``stats`` is the dict ``analyze_bytes`` attaches to its result; it may
+        come from another process. Cache hits only count, they have no stages.
+        """
+        self.increment("documents")
+        self.increment("cache_hits" if cache_hit else "cache_misses")
+        document = {"time": time.time(), "filename": filename, "cache_hit": cache_hit, **extra}
+        if not cache_hit and stats:
+            self.increment("bytes", stats["bytes"])
+            self.increment("pages", stats["pages"])
+            for stage in ("extract", "skills"):
+                self.observe(stage, stats[stage + "_seconds"])
+            # OCR only runs for scanned pages; keep its latency out of documents without any
+            if stats.get("ocr_pages"):
+                self.observe("ocr", stats["ocr_seconds"])
+            for counter in ("image_pages", "ocr_pages", "ocr_cache_hits", "ocr_timeouts", "ocr_errors"):
+                if stats.get(counter):
+                    self.increment(counter, stats[counter])
+            document.update(stats)
+        for stage, seconds in extra.items():
+            if stage.endswith("_seconds"):
+                self.observe(stage[:-len("_seconds")], seconds)
+        with self._lock:
+            self.documents.append(document)
+
+    def snapshot(self):
+        """Plain-dict view of every stage and counter"""
+        now = time.time()
+        with self._lock:
+            stages = {}
+            for stage, histogram in sorted(self.histograms.items()):
+                counts, total, count = histogram.recent(now)
+                stages[stage] = {
+                    "count": histogram.count,
+                    "sum_seconds": histogram.sum,
+                    "recent_count": count,
+                    "recent_mean_seconds": total / count if count else 0.0,
+                    "recent_p50_seconds": Histogram.quantile(counts, 0.5),
+                    "recent_p95_seconds": Histogram.quantile(counts, 0.95),
+                    "recent_p99_seconds": Histogram.quantile(counts, 0.99),
+                }
+            return {
+                "stages": stages,
+                "counters": dict(self.counters),
+                "gauges": [{"name": name, **dict(labels), "value": value}
+                           for (name, labels), value in sorted(self.gauges.items())],
+                "documents": list(self.documents),
+            }
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self):
+        """Prometheus text exposition format"""
+        lines = [
+            "# HELP ats_stage_duration_seconds Time spent in each resume processing stage.",
+            "# TYPE ats_stage_duration_seconds histogram",
+        ]
+        with self._lock:
+            for stage, histogram in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(BUCKETS + ("+Inf",), histogram.counts):
+                    cumulative += bucket_count
+                    lines.append(f'ats_stage_duration_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'ats_stage_duration_seconds_sum{{stage="{stage}"}} {histogram.sum}')
+                lines.append(f'ats_stage_duration_seconds_count{{stage="{stage}"}} {histogram.count}')
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"# TYPE ats_{name}_total counter")
+                lines.append(f"ats_{name}_total {value}")
+            typed = set()
+            for (name, labels), value in sorted(self.gauges.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE ats_{name} gauge")
+                    typed.add(name)
+                label_text = ",".join(f'{key}="{_escape_label(label)}"' for key, label in labels)
+                lines.append(f"ats_{name}{{{label_text}}} {value}" if label_text else f"ats_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry
+METRICS = Metrics()
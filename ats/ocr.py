@@ -0,0 +1,204 @@
+"""OCR fallback for scanned PDF pages
+
+Pages whose text layer comes back empty are rendered with pypdfium2 and
+read by a local Tesseract binary. Each page runs in its own ``tesseract``
+process, at most ``OCR_WORKERS`` at a time, killed after
+``OCR_PAGE_TIMEOUT`` seconds. Results are cached by a hash of the rendered
+page, so the same scan inside another PDF is read only once.
+
+Tesseract is an optional system dependency (``apt install tesseract-ocr``).
+Without it, image-only pages are counted in the stats so callers can say
+why a PDF produced no text.
+"""
+import hashlib
+import os
+import shutil
+import subprocess
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from cachetools import LRUCache
+
+OCR_ENABLED = os.environ.get("ATS_OCR", "1") != "0"
+OCR_WORKERS = int(os.environ.get("ATS_OCR_WORKERS", "2"))
+OCR_PAGE_TIMEOUT = float(os.environ.get("ATS_OCR_PAGE_TIMEOUT", "30"))
+OCR_MAX_PAGES = int(os.environ.get("ATS_OCR_MAX_PAGES", "10"))
+OCR_DPI = int(os.environ.get("ATS_OCR_DPI", "200"))
+OCR_LANG = os.environ.get("ATS_OCR_LANG", "eng")
+OCR_CACHE_PAGES = int(os.environ.get("ATS_OCR_CACHE_PAGES", "2048"))
+
+# Pages with fewer non-blank characters than this count as image-only
+MIN_TEXT_CHARS = 16
+
+
+class OcrTimeout(Exception):
+    """Tesseract took longer than the per-page timeout"""
+
+
+_tesseract_path = None
+
+
+def tesseract_path():
+    """Path of the tesseract binary, or None when OCR is unavailable"""
+    global _tesseract_path
+    if _tesseract_path is None:
+        _tesseract_path = shutil.which(os.environ.get("ATS_TESSERACT", "tesseract")) or ""
+    return _tesseract_path or None
+
+
+def ocr_available():
+    return OCR_ENABLED and tesseract_path() is not None
+
+
+def is_image_only(text):
+    return len("".join(text.split())) < MIN_TEXT_CHARS
+
+
+def render_page(document, index, dpi=OCR_DPI):
+    """Render one page of a ``pypdfium2.PdfDocument`` as an 8-bit grayscale PGM"""
+    page = document[index]
+    try:
+        bitmap = page.render(scale=dpi / 72, grayscale=True)
+        image = bitmap.to_pil().convert("L")
+    finally:
+        page.close()
+    header = f"P5 {image.width} {image.height} 255\n".encode("ascii")
+    return header + image.tobytes()
+
+
+def run_tesseract(image, lang=OCR_LANG, timeout=OCR_PAGE_TIMEOUT):
+    """Text of a PGM/PNG image; the tesseract process is killed after ``timeout``"""
+    # One thread per tesseract process; parallelism comes from the pool
+    env = dict(os.environ, OMP_THREAD_LIMIT="1")
+    try:
+        result = subprocess.run([tesseract_path(), "stdin", "stdout", "-l", lang, "--psm", "3"],
+                                input=image, capture_output=True, timeout=timeout, env=env)
+    except subprocess.TimeoutExpired:
+        raise OcrTimeout(f"OCR of one page took longer than {timeout}s") from None
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.decode("utf-8", "replace").strip() or "tesseract failed")
+    return result.stdout.decode("utf-8", "replace")
+
+
+class PageOcr:
+    """Bounded pool of tesseract processes with a page-hash result cache"""
+
+    def __init__(self, workers=None, cache_pages=None, lang=OCR_LANG, dpi=OCR_DPI):
+        self.workers = workers or OCR_WORKERS
+        self.lang = lang
+        self.dpi = dpi
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ats-ocr")
+        self._cache = LRUCache(maxsize=cache_pages or OCR_CACHE_PAGES)
+        self._lock = threading.Lock()
+
+    def _page_key(self, image):
+        return hashlib.sha256(image).hexdigest() + f"-{self.lang}"
+
+    def submit(self, document, index, stats):
+        """Render a page now and return its text, from the cache or as a future"""
+        start = time.perf_counter()
+        image = render_page(document, index, self.dpi)
+        stats["ocr_render_seconds"] += time.perf_counter() - start
+        key = self._page_key(image)
+        with self._lock:
+            text = self._cache.get(key)
+        if text is not None:
+            stats["ocr_cache_hits"] += 1
+            return text
+        return self._pool.submit(self._read, key, image)
+
+    def _read(self, key, image):
+        start = time.perf_counter()
+        text = run_tesseract(image, self.lang)
+        with self._lock:
+            self._cache[key] = text
+        return text, time.perf_counter() - start
+
+
+_default_ocr = None
+_default_lock = threading.Lock()
+
+
+def get_page_ocr():
+    """Process-wide OCR pool sized by ``ATS_OCR_WORKERS``"""
+    global _default_ocr
+    with _default_lock:
+        if _default_ocr is None:
+            _default_ocr = PageOcr()
+        return _default_ocr
+
+
+def new_ocr_stats():
+    return {"image_pages": 0, "ocr_pages": 0, "ocr_cache_hits": 0, "ocr_timeouts": 0, "ocr_errors": 0,
+            "ocr_seconds": 0.0, "ocr_render_seconds": 0.0}
+
+
+def no_text_message(stats):
+    """Why a document produced no text, for showing to the user"""
+    stats = stats or {}
+    if not stats.get("image_pages"):
+        return "No text extracted"
+    if stats.get("ocr_timeouts") or stats.get("ocr_errors"):
+        return "No text extracted: the PDF is a scanned image and OCR failed or timed out"
+    if not ocr_available():
+        return "No text extracted: the PDF is a scanned image and OCR is not available on this server"
+    return "No text extracted: the PDF is a scanned image and OCR found no text"
+
+
+def with_ocr_fallback(pages, pdf_data, stats, max_pages=None):
+    """Yield page texts in order, replacing image-only pages with their OCR text.
+
+    ``pages`` yields the text layer of each page. Image-only pages are
+    rendered as they are met and read in the background while later pages
+    keep streaming; output waits only when an unread OCR page is next in
+    line. At most ``max_pages`` pages per document are sent to OCR, and
+    ``stats`` (see ``new_ocr_stats``) is updated in place.
+    """
+    max_pages = OCR_MAX_PAGES if max_pages is None else max_pages
+    available = ocr_available()
+    document = None
+    pending = deque()
+
+    def resolve(item):
+        if isinstance(item, str):
+            return item
+        future, text_layer = item
+        try:
+            text, seconds = future.result()
+        except OcrTimeout:
+            stats["ocr_timeouts"] += 1
+            return text_layer
+        except (OSError, RuntimeError):
+            stats["ocr_errors"] += 1
+            return text_layer
+        stats["ocr_pages"] += 1
+        stats["ocr_seconds"] += seconds
+        return text
+
+    def ready(item):
+        return isinstance(item, str) or item[0].done()
+
+    try:
+        for index, text in enumerate(pages):
+            if is_image_only(text):
+                stats["image_pages"] += 1
+                if available and stats["image_pages"] <= max_pages:
+                    if document is None:
+                        import pypdfium2
+
+                        document = pypdfium2.PdfDocument(pdf_data)
+                    result = get_page_ocr().submit(document, index, stats)
+                    text = result if isinstance(result, str) else (result, text)
+            pending.append(text)
+            while pending and ready(pending[0]):
+                yield resolve(pending.popleft())
+        while pending:
+            yield resolve(pending.popleft())
+    finally:
+        for item in pending:
+            if not isinstance(item, str):
+                item[0].cancel()
+        if document is not None:
+            document.close()
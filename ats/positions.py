@@ -0,0 +1,348 @@
+"""Open positions and their skill requirements
+
+``JOB_POSITIONS`` is the built-in catalog. Live requisitions come from a
+YAML, JSON or Parquet file loaded into a ``PositionCatalog``, which compiles
+every position once (normalized skill lists, upper-cased requirement tuples,
+per-skill weights, a shared ``PositionMatrix`` and ``PositionIndex``) into an
+immutable ``CatalogSnapshot`` and publishes a new snapshot when the file
+changes. The matrix and index are rebuilt when a new taxonomy version is
+published as well.
+
+A position may weight some skills above or below the default of 1::
+
+    Data Engineer:
+      required_skills: [Python, Spark, SQL]
+      preferred_skills: [Airflow]
+      skill_weights: {Spark: 2, SQL: 0.5}
+"""
+import json
+import os
+import threading
+import time
+
+from ats.taxonomy import get_taxonomy
+
+# Predefined job requirements
+JOB_POSITIONS = {
+    "Senior Python Developer": {
+        "required_skills": ["Python", "Django", "Flask", "REST API", "PostgreSQL", "Docker", "Git", "AWS"],
+        "preferred_skills": ["Machine Learning", "Kubernetes", "Redis", "Celery", "FastAPI", "Microservices"],
+        "experience_years": 5,
+        "description": "Looking for a senior Python developer with strong backend development skills"
+    },
+    "Data Scientist": {
+        "required_skills": ["Python", "Machine Learning", "Deep Learning", "TensorFlow", "PyTorch", "Pandas", "NumPy", "SQL"],
+        "preferred_skills": ["NLP", "Computer Vision", "Spark", "Hadoop", "AWS", "Docker", "MLOps"],
+        "experience_years": 3,
+        "description": "Seeking a data scientist with expertise in ML/DL and statistical analysis"
+    },
+    "Full Stack Developer": {
+        "required_skills": ["JavaScript", "React", "Node.js", "HTML", "CSS", "MongoDB", "Express", "Git"],
+        "preferred_skills": ["TypeScript", "Next.js", "GraphQL", "Docker", "AWS", "Redux", "Webpack"],
+        "experience_years": 4,
+        "description": "Need a full stack developer proficient in modern web technologies"
+    },
+    "DevOps Engineer": {
+        "required_skills": ["Docker", "Kubernetes", "CI/CD", "Jenkins", "AWS", "Linux", "Terraform", "Ansible"],
+        "preferred_skills": ["Python", "Bash", "Prometheus", "Grafana", "ELK Stack", "GitOps", "ArgoCD"],
+        "experience_years": 4,
+        "description": "Looking for a DevOps engineer to manage cloud infrastructure"
+    }
+}
+
+
+# Optional columns kept on each position and offered as sidebar filters
+FILTER_FIELDS = ("department", "location")
+
+# Seconds between checks of the catalog file for changes
+RELOAD_CHECK_SECONDS = 1.0
+
+
+class CatalogError(ValueError):
+    """A position catalog file could not be read"""
+
+
+def _skill_list(value, name, field):
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    try:
+        skills = [str(skill).strip() for skill in value]
+    except TypeError:
+        raise CatalogError(f"{name}: {field} must be a list of skills") from None
+    # Drop blanks and repeats so every path counts a skill once
+    seen = set()
+    unique = []
+    for skill in skills:
+        if skill and skill.upper() not in seen:
+            seen.add(skill.upper())
+            unique.append(skill)
+    return unique
+
+
+def _skill_weights(value, name, skills):
+    """{upper-cased skill: weight} for the listed skills whose weight is not 1"""
+    if not value:
+        return {}
+    try:
+        # Parquet map columns arrive as lists of (key, value) pairs
+        items = dict(value).items()
+    except (TypeError, ValueError):
+        raise CatalogError(f"{name}: skill_weights must map skills to weights") from None
+    listed = {skill.upper() for skill in skills}
+    weights = {}
+    for skill, weight in items:
+        try:
+            weight = float(weight)
+        except (TypeError, ValueError):
+            raise CatalogError(f"{name}: weight of {skill} must be a number") from None
+        if weight < 0:
+            raise CatalogError(f"{name}: weight of {skill} must not be negative")
+        skill = str(skill).strip()
+        if skill.upper() not in listed:
+            raise CatalogError(f"{name}: weighted skill {skill} is not a required or preferred skill")
+        if weight != 1.0:
+            weights[skill.upper()] = weight
+    return weights
+
+
+def compile_position(name, spec):
+    """Normalize one position spec into the dict the scorers expect"""
+    if not isinstance(spec, dict):
+        raise CatalogError(f"{name}: expected a mapping of position fields")
+    required = _skill_list(spec.get("required_skills"), name, "required_skills")
+    preferred = _skill_list(spec.get("preferred_skills"), name, "preferred_skills")
+    try:
+        experience_years = int(spec.get("experience_years") or 0)
+    except (TypeError, ValueError):
+        raise CatalogError(f"{name}: experience_years must be a number") from None
+    position = {
+        "required_skills": required,
+        "preferred_skills": preferred,
+        "experience_years": experience_years,
+        "description": str(spec.get("description") or ""),
+        "required_upper": tuple(skill.upper() for skill in required),
+        "preferred_upper": tuple(skill.upper() for skill in preferred),
+        "skill_weights": _skill_weights(spec.get("skill_weights"), name, required + preferred),
+    }
+    for field in FILTER_FIELDS:
+        if spec.get(field):
+            position[field] = str(spec[field])
+    return position
+
+
+def _read_records(path):
+    """Raw {name: spec} mapping from a YAML, JSON or Parquet file"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".parquet":
+        import pyarrow.parquet as pq
+
+        data = pq.read_table(path).to_pylist()
+    elif extension in (".yaml", ".yml"):
+        import yaml
+
+        with open(path, encoding="utf-8") as f:
+            try:
+                data = yaml.safe_load(f)
+            except yaml.YAMLError as e:
+                raise CatalogError(f"Invalid YAML: {e}") from None
+    elif extension == ".json":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    else:
+        raise CatalogError(f"Unsupported catalog format: {extension or path}")
+
+    # Either {name: spec} or a list of specs with a "name" field
+    if isinstance(data, dict):
+        data = data.get("positions", data)
+    if isinstance(data, dict):
+        return data
+    if isinstance(data, list):
+        records = {}
+        for spec in data:
+            if not isinstance(spec, dict) or not spec.get("name"):
+                raise CatalogError("Every position in a list needs a name")
+            records[str(spec["name"])] = spec
+        return records
+    raise CatalogError("A catalog must be a mapping or a list of positions")
+
+
+class CatalogSnapshot:
+    """One loaded version of a catalog: its positions, search keys and version.
+
+    A snapshot is never changed after it is built; a reload publishes a new
+    one, so code that reads one snapshot sees positions, search keys and the
+    compiled matrix and index of the same version. Compiled structures are
+    built on first use and rebuilt when a new taxonomy version is published.
+    """
+
+    def __init__(self, positions, version):
+        self.positions = positions
+        self.version = version
+        self.loaded_at = time.time()
+        self._search_keys = {name: f"{name} {position['description']}".lower()
+                             for name, position in positions.items()}
+        self._structures = {}
+
+    def __getitem__(self, name):
+        return self.positions[name]
+
+    def __contains__(self, name):
+        return name in self.positions
+
+    def __iter__(self):
+        return iter(self.positions)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def _compiled(self, kind, build):
+        """Structure built from the positions once per taxonomy version"""
+        tag = get_taxonomy().tag
+        cached = self._structures.get(kind)
+        if cached is None or cached[0] != tag:
+            cached = self._structures[kind] = (tag, build(self.positions))
+        return cached[1]
+
+    def matrix(self):
+        """``PositionMatrix`` of every position, for scoring many candidates at once"""
+        from ats.scoring import PositionMatrix
+
+        return self._compiled("matrix", PositionMatrix)
+
+    def index(self):
+        """``PositionIndex`` of every position, for ranking positions for one resume"""
+        from ats.recommend import PositionIndex
+
+        return self._compiled("index", PositionIndex)
+
+    def filter_values(self, field):
+        """Sorted distinct values of an optional field such as ``department``"""
+        return sorted({position[field] for position in self.positions.values() if field in position})
+
+    def search(self, text="", limit=200, **filters):
+        """Names whose title or description contains every word of ``text``"""
+        words = text.lower().split()
+        filters = {field: value for field, value in filters.items() if value}
+        names = []
+        for name, key in self._search_keys.items():
+            if all(word in key for word in words):
+                position = self.positions[name]
+                if all(position.get(field) == value for field, value in filters.items()):
+                    names.append(name)
+                    if len(names) >= limit:
+                        break
+        return names
+
+
+class PositionCatalog:
+    """Compiled positions from a catalog file, reloaded when the file changes.
+
+    Each load publishes a new ``CatalogSnapshot`` in one assignment, so
+    readers never see a half-loaded catalog. The catalog's own methods each
+    read the current snapshot once; a caller that makes several lookups
+    (a page run) should take ``snapshot()`` once and use it throughout. A
+    reload that fails keeps the previous snapshot and stores the error in
+    ``last_error``. Without a path the catalog holds ``JOB_POSITIONS``.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._signature = None
+        self._checked_at = 0.0
+        self._snapshot = None
+        if path:
+            self._signature = self._file_signature()
+            self._install(_read_records(path))
+        else:
+            self._install(JOB_POSITIONS)
+
+    def _file_signature(self):
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _install(self, records):
+        positions = {str(name): compile_position(name, spec) for name, spec in records.items()}
+        if not positions:
+            raise CatalogError("The catalog has no positions")
+        version = self._snapshot.version + 1 if self._snapshot else 1
+        self._snapshot = CatalogSnapshot(positions, version)
+        self.last_error = None
+
+    def snapshot(self):
+        """The currently loaded ``CatalogSnapshot``"""
+        return self._snapshot
+
+    @property
+    def positions(self):
+        return self._snapshot.positions
+
+    @property
+    def version(self):
+        return self._snapshot.version
+
+    @property
+    def loaded_at(self):
+        return self._snapshot.loaded_at
+
+    def refresh(self):
+        """Reload if the file changed since the last load; returns True after a reload"""
+        now = time.monotonic()
+        if not self.path or now - self._checked_at < RELOAD_CHECK_SECONDS:
+            return False
+        with self._lock:
+            self._checked_at = now
+            try:
+                signature = self._file_signature()
+                if signature == self._signature:
+                    return False
+                self._signature = signature
+                self._install(_read_records(self.path))
+            except (OSError, ValueError) as e:
+                self.last_error = str(e)
+                return False
+            return True
+
+    def __getitem__(self, name):
+        return self._snapshot[name]
+
+    def __contains__(self, name):
+        return name in self._snapshot
+
+    def __iter__(self):
+        return iter(self._snapshot)
+
+    def __len__(self):
+        return len(self._snapshot)
+
+    def matrix(self):
+        return self._snapshot.matrix()
+
+    def index(self):
+        return self._snapshot.index()
+
+    def filter_values(self, field):
+        return self._snapshot.filter_values(field)
+
+    def search(self, text="", limit=200, **filters):
+        return self._snapshot.search(text, limit, **filters)
+
+
+_default_catalog = None
+_default_lock = threading.Lock()
+
+
+def get_position_catalog():
+    """Process-wide catalog from ``ATS_POSITIONS_FILE``, or the built-in positions.
+
+    Each call checks (at most once a second) whether the file changed.
+    """
+    global _default_catalog
+    with _default_lock:
+        if _default_catalog is None:
+            _default_catalog = PositionCatalog(os.environ.get("ATS_POSITIONS_FILE") or None)
+    _default_catalog.refresh()
+    return _default_catalog
@@ -0,0 +1,156 @@
+"""Reverse matching: the best-fitting positions for one resume
+
+``PositionIndex`` inverts the positions' required and preferred skills into
+posting arrays of position numbers. Ranking a resume concatenates the
+postings of the skills it lists and counts them with ``np.bincount``, so
+only positions sharing at least one skill get a score and the cost grows
+with the resume's postings, not with the size of the catalog. Skill weights
+ride along the postings and go into the same ``bincount``.
+"""
+from ats.scoring import DEFAULT_MODEL, related_credit, section_credit
+
+
+class PositionIndex:
+    """Inverted index from upper-cased skill to the positions that list it"""
+
+    def __init__(self, positions):
+        import numpy as np
+
+        self.names = list(positions)
+        self.positions = positions
+        required, preferred = {}, {}
+        required_weight_total, preferred_weight_total = [], []
+        for number, job in enumerate(positions.values()):
+            weights = job.get("skill_weights") or {}
+            for postings, kind, totals in ((required, "required", required_weight_total),
+                                           (preferred, "preferred", preferred_weight_total)):
+                total = 0.0
+                for skill in _upper(job, kind):
+                    weight = weights.get(skill, 1.0)
+                    postings.setdefault(skill, ([], []))
+                    postings[skill][0].append(number)
+                    postings[skill][1].append(weight)
+                    total += weight
+                totals.append(total)
+        self.required = {skill: np.array(ids, dtype=np.int32) for skill, (ids, _) in required.items()}
+        self.preferred = {skill: np.array(ids, dtype=np.int32) for skill, (ids, _) in preferred.items()}
+        self.required_weights = {skill: np.array(weights) for skill, (_, weights) in required.items()}
+        self.preferred_weights = {skill: np.array(weights) for skill, (_, weights) in preferred.items()}
+        self.total_required = np.array([len(_upper(job, "required")) for job in positions.values()],
+                                       dtype=np.int64)
+        self.total_preferred = np.array([len(_upper(job, "preferred")) for job in positions.values()],
+                                        dtype=np.int64)
+        self.required_weight_total = np.array(required_weight_total)
+        self.preferred_weight_total = np.array(preferred_weight_total)
+        self.experience_years = np.array([job.get("experience_years", 0) for job in positions.values()],
+                                         dtype=np.int64)
+
+    def _matches(self, postings, skills):
+        import numpy as np
+
+        lists = [postings[skill] for skill in skills if skill in postings]
+        if not lists:
+            return np.zeros(len(self.names), dtype=np.int64)
+        return np.bincount(np.concatenate(lists), minlength=len(self.names))
+
+    def _covered(self, postings, weights, credit):
+        """Weighted coverage per position; ``credit`` maps skills to 1 or a related-skill share"""
+        import numpy as np
+
+        skills = [skill for skill in credit if skill in postings]
+        if not skills:
+            return np.zeros(len(self.names))
+        return np.bincount(np.concatenate([postings[skill] for skill in skills]),
+                           weights=np.concatenate([weights[skill] * credit[skill] for skill in skills]),
+                           minlength=len(self.names))
+
+    def top_k(self, skills, years_experience=None, k=10, min_score=0.0, model=None, skill_sections=None):
+        """Best-fitting positions for a skill list, highest overall score first.
+
+        Scores equal those of ``calculate_skill_match`` under the same
+        ``ScoringModel`` and ``skill_sections``; positions that share no skill with the resume are
+        not ranked, even when experience alone would give them a score. Ties
+        go to positions whose experience requirement the candidate meets,
+        then to catalog order. Each result also carries the missing required
+        skills.
+        """
+        import numpy as np
+
+        model = model or DEFAULT_MODEL
+        skills = {skill.upper() for skill in skills}
+        strength = None
+        if model.section_weights and skill_sections:
+            strength = section_credit(skill_sections, model.section_weights)
+        credit = {skill: strength.get(skill, 1.0) if strength else 1.0 for skill in skills}
+        if model.related:
+            credit.update(related_credit(skills, strength))
+        required_matches = self._matches(self.required, skills)
+        preferred_matches = self._matches(self.preferred, skills)
+        required_covered = self._covered(self.required, self.required_weights, credit)
+        preferred_covered = self._covered(self.preferred, self.preferred_weights, credit)
+        touched = np.flatnonzero(required_matches + preferred_matches + required_covered + preferred_covered)
+        if not len(touched):
+            return []
+
+        required_matches = required_matches[touched]
+        preferred_matches = preferred_matches[touched]
+        total_required = self.total_required[touched]
+        total_preferred = self.total_preferred[touched]
+        required_weight_total = self.required_weight_total[touched]
+        preferred_weight_total = self.preferred_weight_total[touched]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            required_score = np.where(required_weight_total > 0,
+                                      required_covered[touched] / required_weight_total * 100, 0.0)
+            preferred_score = np.where(preferred_weight_total > 0,
+                                       preferred_covered[touched] / preferred_weight_total * 100, 0.0)
+            experience_score = None
+            if years_experience is not None:
+                required_years = self.experience_years[touched]
+                experience_score = np.where(required_years > 0,
+                                            np.minimum(years_experience / required_years, 1.0) * 100, 100.0)
+        overall_score = model.overall(required_score, preferred_score, experience_score)
+
+        experience_met = (self.experience_years[touched] <= years_experience
+                          if years_experience is not None else np.ones(len(touched), dtype=bool))
+        keep = np.flatnonzero(overall_score >= min_score)
+        if len(keep) > k:
+            # Everything tied with the k-th best score still competes on the tie-breaks
+            cutoff = np.partition(overall_score[keep], len(keep) - k)[len(keep) - k]
+            keep = keep[overall_score[keep] >= cutoff]
+        order = keep[np.lexsort((touched[keep], ~experience_met[keep], -overall_score[keep]))][:k]
+
+        results = []
+        for i in order:
+            name = self.names[touched[i]]
+            job = self.positions[name]
+            results.append({
+                "position": name,
+                "overall_score": float(overall_score[i]),
+                "required_score": float(required_score[i]),
+                "preferred_score": float(preferred_score[i]),
+                "experience_score": float(experience_score[i]) if experience_score is not None else None,
+                "required_matches": int(required_matches[i]),
+                "preferred_matches": int(preferred_matches[i]),
+                "total_required": int(total_required[i]),
+                "total_preferred": int(total_preferred[i]),
+                "experience_years": int(self.experience_years[touched[i]]),
+                "experience_met": bool(experience_met[i]),
+                "missing_required": [skill for skill in job["required_skills"] if skill.upper() not in skills],
+            })
+        return results
+
+
+def _upper(job, kind):
+    upper = job.get(kind + "_upper")
+    return upper if upper is not None else [skill.upper() for skill in job[kind + "_skills"]]
+
+
+def recommend_positions(skills, years_experience=None, positions=None, k=10, model=None, skill_sections=None):
+    """Top ``k`` positions for a resume's skills from a catalog, dict or ``PositionIndex``"""
+    from ats.positions import get_position_catalog
+
+    if positions is None:
+        positions = get_position_catalog()
+    if not isinstance(positions, PositionIndex):
+        positions = positions.index() if hasattr(positions, "index") else PositionIndex(positions)
+    return positions.top_k(skills, years_experience, k, model=model, skill_sections=skill_sections)
@@ -0,0 +1,230 @@
+"""Screening results appended to a date-partitioned Parquet dataset
+
+Every scored (resume, position) pair becomes one row. Rows are buffered in
+memory and written as one Parquet file per day partition when the buffer
+fills up or ages, so the dataset grows by a few large files instead of one
+file per screening::
+
+    screening_results/
+        date=2024-05-01/part-1714557600000-3f2a.parquet
+        date=2024-05-02/...
+
+Files are sorted by position, so the row group statistics let the readers
+below skip everything but the requested positions and days.
+"""
+import atexit
+import datetime
+import os
+import threading
+import time
+import uuid
+from collections import Counter
+
+# Flush the buffer once it holds this many rows or its oldest row is this old
+FLUSH_ROWS = 1000
+FLUSH_SECONDS = 30
+
+# Match fields copied from calculate_skill_match
+MATCH_FIELDS = ("overall_score", "required_score", "preferred_score", "required_matches",
+                "preferred_matches", "total_required", "total_preferred")
+
+
+def _schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ("screened_at", pa.timestamp("ms", tz="UTC")),
+        ("candidate_id", pa.string()),
+        ("filename", pa.string()),
+        ("position", pa.string()),
+        ("overall_score", pa.float64()),
+        ("required_score", pa.float64()),
+        ("preferred_score", pa.float64()),
+        ("required_matches", pa.int32()),
+        ("preferred_matches", pa.int32()),
+        ("total_required", pa.int32()),
+        ("total_preferred", pa.int32()),
+        ("years_experience", pa.int32()),
+        ("skills", pa.list_(pa.string())),
+        ("missing_required", pa.list_(pa.string())),
+        # Null in files written before taxonomy versions were recorded
+        ("taxonomy_version", pa.string()),
+    ])
+
+
+def result_record(candidate_id, filename, position, job_requirements, match, skills, years_experience,
+                  taxonomy_version=None):
+    """One dataset row for a resume scored against a position, with the taxonomy that extracted its skills"""
+    candidate_skills = {skill.upper() for skill in skills}
+    record = {
+        "screened_at": datetime.datetime.now(datetime.timezone.utc),
+        "candidate_id": candidate_id,
+        "filename": filename,
+        "position": position,
+        "years_experience": int(years_experience),
+        "skills": list(skills),
+        "missing_required": [skill for skill in job_requirements["required_skills"]
+                             if skill.upper() not in candidate_skills],
+        "taxonomy_version": taxonomy_version,
+    }
+    for field in MATCH_FIELDS:
+        record[field] = match[field]
+    return record
+
+
+class ResultLog:
+    """Buffered appender for the screening results dataset"""
+
+    def __init__(self, directory, flush_rows=FLUSH_ROWS, flush_seconds=FLUSH_SECONDS):
+        self.directory = directory
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._oldest = None
+        self.rows_written = 0
+        self.files_written = 0
+
+    def append(self, record):
+        self.extend([record])
+
+    def extend(self, records):
+        with self._lock:
+            self._buffer.extend(records)
+            if self._buffer and self._oldest is None:
+                self._oldest = time.monotonic()
+            due = (len(self._buffer) >= self.flush_rows
+                   or (self._oldest is not None and time.monotonic() - self._oldest >= self.flush_seconds))
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered rows, one file per day"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        with self._lock:
+            records, self._buffer, self._oldest = self._buffer, [], None
+            if not records:
+                return
+            by_date = {}
+            for record in records:
+                by_date.setdefault(record["screened_at"].strftime("%Y-%m-%d"), []).append(record)
+            for date, rows in by_date.items():
+                rows.sort(key=lambda row: row["position"])
+                table = pa.Table.from_pylist(rows, schema=_schema())
+                partition = os.path.join(self.directory, f"date={date}")
+                os.makedirs(partition, exist_ok=True)
+                name = f"part-{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}.parquet"
+                # Write under a hidden name so readers never see a partial file
+                tmp_path = os.path.join(partition, "." + name)
+                pq.write_table(table, tmp_path, row_group_size=64 * 1024, compression="zstd")
+                os.replace(tmp_path, os.path.join(partition, name))
+                self.rows_written += len(rows)
+                self.files_written += 1
+
+    @property
+    def pending(self):
+        return len(self._buffer)
+
+
+def open_dataset(directory):
+    """The results as a lazily read ``pyarrow.dataset``, or None before the first flush"""
+    import pyarrow.dataset as ds
+
+    if not os.path.isdir(directory):
+        return None
+    return ds.dataset(directory, format="parquet", partitioning="hive", schema=_with_date(_schema()))
+
+
+def _with_date(schema):
+    import pyarrow as pa
+
+    return schema.append(pa.field("date", pa.string()))
+
+
+def _filter(position=None, since=None, until=None):
+    """Dataset expression; ``since``/``until`` are ``datetime.date`` bounds on the partitions"""
+    import pyarrow.dataset as ds
+
+    expression = None
+    conditions = []
+    if position:
+        conditions.append(ds.field("position") == position)
+    if since:
+        conditions.append(ds.field("date") >= since.isoformat())
+    if until:
+        conditions.append(ds.field("date") <= until.isoformat())
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def positions_summary(directory, since=None, until=None):
+    """Screenings, mean and best overall score per position, most screened first"""
+    dataset = open_dataset(directory)
+    if dataset is None:
+        return []
+    table = dataset.to_table(columns=["position", "overall_score"], filter=_filter(since=since, until=until))
+    if not table.num_rows:
+        return []
+    grouped = table.group_by("position").aggregate([("overall_score", "count"), ("overall_score", "mean"),
+                                                    ("overall_score", "max")])
+    rows = [{"position": row["position"], "screenings": row["overall_score_count"],
+             "mean_score": row["overall_score_mean"], "best_score": row["overall_score_max"]}
+            for row in grouped.to_pylist()]
+    return sorted(rows, key=lambda row: row["screenings"], reverse=True)
+
+
+def skill_gap_stats(directory, position=None, since=None, until=None):
+    """How often each required skill was missing, streamed batch by batch.
+
+    Returns ``(screenings, Counter of skill -> times missing)``; only the
+    ``missing_required`` column of matching row groups is read.
+    """
+    import pyarrow.compute as pc
+
+    dataset = open_dataset(directory)
+    missing = Counter()
+    screenings = 0
+    if dataset is None:
+        return screenings, missing
+    for batch in dataset.to_batches(columns=["missing_required"], filter=_filter(position, since, until)):
+        screenings += batch.num_rows
+        counts = pc.value_counts(pc.list_flatten(batch.column(0)))
+        for item in counts.to_pylist():
+            if item["values"] is not None:
+                missing[item["values"]] += item["counts"]
+    return screenings, missing
+
+
+def score_histogram(directory, position=None, since=None, until=None, bins=10):
+    """Counts of overall scores in ``bins`` equal bands from 0 to 100"""
+    import numpy as np
+
+    dataset = open_dataset(directory)
+    counts = np.zeros(bins, dtype=np.int64)
+    if dataset is None:
+        return counts
+    for batch in dataset.to_batches(columns=["overall_score"], filter=_filter(position, since, until)):
+        scores = batch.column(0).to_numpy(zero_copy_only=False)
+        counts += np.histogram(scores, bins=bins, range=(0, 100))[0]
+    return counts
+
+
+_default_log = None
+_default_lock = threading.Lock()
+
+
+def results_dir():
+    return os.environ.get("ATS_RESULTS_DIR", "screening_results")
+
+
+def get_result_log():
+    """Process-wide log in ``ATS_RESULTS_DIR`` (default ``screening_results``), flushed at exit"""
+    global _default_log
+    with _default_lock:
+        if _default_log is None:
+            _default_log = ResultLog(results_dir())
+            atexit.register(_default_log.flush)
+        return _default_log
@@ -0,0 +1,345 @@
+"""Candidate to position skill scoring
+
+A match has three components: how much of the required skills and of the
+preferred skills the candidate covers, and how much of the position's
+experience requirement they meet. Coverage is weighted per skill when the
+position has ``skill_weights``, and with related-skill credit on, a skill
+related to a broader one in the current taxonomy earns partial credit
+toward it (Scikit-learn toward Machine Learning). With section weights on, a
+skill earns the weight of the best resume section it appears in (see
+``ats.sections``), so one mentioned only under Education counts half; this
+holds for single resumes, pool ranking and position recommendations alike.
+``ScoringModel`` holds the weights of the three components; the default
+reproduces the original 70/30 required/preferred split with experience and
+sections left out.
+"""
+from ats.taxonomy import get_taxonomy
+
+
+class ScoringModel:
+    """Weights of the required, preferred and experience components of the overall score.
+
+    Weights are relative; the overall score divides by their sum. The
+    experience component is left out when a candidate's years are unknown.
+    ``section_weights`` maps resume sections to the credit a skill found
+    there earns (e.g. ``SECTION_WEIGHTS``); it needs the candidate's
+    ``skill_sections``, which ``calculate_skill_match``, ``PositionIndex``
+    and the candidate store (for ``rank_pool``) all take.
+    """
+
+    def __init__(self, required=0.7, preferred=0.3, experience=0.0, related=False, section_weights=None):
+        if min(required, preferred, experience) < 0 or required + preferred + experience <= 0:
+            raise ValueError("Scoring weights must be non-negative and not all zero")
+        self.required = required
+        self.preferred = preferred
+        self.experience = experience
+        self.related = related
+        self.section_weights = section_weights
+
+    def __repr__(self):
+        return (f"ScoringModel(required={self.required}, preferred={self.preferred}, "
+                f"experience={self.experience}, related={self.related}, "
+                f"section_weights={self.section_weights})")
+
+    def overall(self, required_score, preferred_score, experience_score=None):
+        """Weighted mean of the component scores; works on scalars and NumPy arrays"""
+        score = required_score * self.required + preferred_score * self.preferred
+        if experience_score is None or not self.experience:
+            total = self.required + self.preferred
+            # Only experience is weighted but the years are unknown
+            return score / total if total else score * 0.0
+        return (score + experience_score * self.experience) / (self.required + self.preferred + self.experience)
+
+
+DEFAULT_MODEL = ScoringModel()
+
+
+def experience_score(years_experience, experience_years):
+    """Share of the required years a candidate has, capped at 100"""
+    if not experience_years or experience_years <= 0:
+        return 100.0
+    return min(years_experience / experience_years, 1.0) * 100
+
+
+def section_credit(skill_sections, section_weights):
+    """{upper-cased skill: weight of the best section it appears in}"""
+    return {skill.upper(): max(section_weights.get(section, 1.0) for section in sections)
+            for skill, sections in skill_sections.items() if sections}
+
+
+def related_credit(candidate_skills_upper, strength=None):
+    """{upper-cased skill: credit} a candidate earns through related skills only"""
+    credit = {}
+    related = get_taxonomy().related_upper
+    for skill in candidate_skills_upper:
+        for target, value in related.get(skill, {}).items():
+            if strength:
+                value *= strength.get(skill, 1.0)
+            if target not in candidate_skills_upper and value > credit.get(target, 0.0):
+                credit[target] = value
+    return credit
+
+
+def _coverage(skills, candidate_skills_upper, weights, credit, strength=None):
+    """(exact matches, weighted coverage in percent) of one skill list"""
+    matches = 0
+    matched = total = 0.0
+    for skill in skills:
+        weight = weights.get(skill, 1.0)
+        total += weight
+        if skill in candidate_skills_upper:
+            matches += 1
+            matched += weight * strength.get(skill, 1.0) if strength else weight
+        elif skill in credit:
+            matched += weight * credit[skill]
+    return matches, (matched / total * 100) if total else 0
+
+
+def calculate_skill_match(candidate_skills, job_requirements, years_experience=None, model=None,
+                          skill_sections=None):
+    """Calculate match percentage between candidate skills and job requirements.
+
+    ``skill_sections`` (from ``SkillScanner``) lets ``model.section_weights``
+    scale each skill's credit; skills without sections get full credit.
+    """
+    model = model or DEFAULT_MODEL
+    # Catalog positions carry their skills already upper-cased
+    required_skills = job_requirements.get("required_upper")
+    if required_skills is None:
+        required_skills = [skill.upper() for skill in job_requirements["required_skills"]]
+    preferred_skills = job_requirements.get("preferred_upper")
+    if preferred_skills is None:
+        preferred_skills = [skill.upper() for skill in job_requirements["preferred_skills"]]
+    candidate_skills_upper = {skill.upper() for skill in candidate_skills}
+    weights = job_requirements.get("skill_weights") or {}
+    strength = None
+    if model.section_weights and skill_sections:
+        strength = section_credit(skill_sections, model.section_weights)
+    credit = related_credit(candidate_skills_upper, strength) if model.related else {}
+
+    # Calculate matches and weighted scores
+    required_matches, required_score = _coverage(required_skills, candidate_skills_upper, weights, credit,
+                                                 strength)
+    preferred_matches, preferred_score = _coverage(preferred_skills, candidate_skills_upper, weights, credit,
+                                                   strength)
+
+    experience = None
+    if years_experience is not None:
+        experience = experience_score(years_experience, job_requirements.get("experience_years", 0))
+    overall_score = model.overall(required_score, preferred_score, experience)
+
+    return {
+        "overall_score": overall_score,
+        "required_score": required_score,
+        "preferred_score": preferred_score,
+        "experience_score": experience,
+        "required_matches": required_matches,
+        "preferred_matches": preferred_matches,
+        "total_required": len(required_skills),
+        "total_preferred": len(preferred_skills)
+    }
+
+
+class PositionMatrix:
+    """Positions compiled into count and weight matrices over a skill vocabulary.
+
+    Rows of ``required`` and ``preferred`` are vocabulary entries, columns are
+    positions; a cell holds how often the skill is listed for the position so
+    duplicated requirements count exactly as they do in ``calculate_skill_match``.
+    ``required_weights`` and ``preferred_weights`` hold the same cells scaled
+    by the position's skill weights. Everything is float64, like the sums of
+    ``calculate_skill_match``, so weighted scores agree with it to rounding.
+    The vocabulary also takes in every skill the taxonomy relates to a listed
+    skill, so one encoding of the candidates serves both plain and
+    related-skill scoring; ``taxonomy_tag`` is the taxonomy it was built with.
+    """
+
+    def __init__(self, positions):
+        import numpy as np
+
+        self.names = list(positions)
+        self.columns = {name: column for column, name in enumerate(self.names)}
+        self.vocabulary = {}
+        for job in positions.values():
+            for skill in job["required_skills"] + job["preferred_skills"]:
+                self.vocabulary.setdefault(skill.upper(), len(self.vocabulary))
+        taxonomy = get_taxonomy()
+        self.taxonomy_tag = taxonomy.tag
+        related = [(skill, target, credit) for skill, targets in taxonomy.related_upper.items()
+                   for target, credit in targets.items() if target in self.vocabulary]
+        for skill, _, _ in related:
+            self.vocabulary.setdefault(skill, len(self.vocabulary))
+        self.skills = list(self.vocabulary)
+        self._related_from = np.array([self.vocabulary[skill] for skill, _, _ in related], dtype=np.int64)
+        self._related_to = np.array([self.vocabulary[target] for _, target, _ in related], dtype=np.int64)
+        self._related_credit = np.array([credit for _, _, credit in related], dtype=np.float64)
+
+        shape = (len(self.vocabulary), len(self.names))
+        self.required = np.zeros(shape, dtype=np.float64)
+        self.preferred = np.zeros(shape, dtype=np.float64)
+        self.required_weights = np.zeros(shape, dtype=np.float64)
+        self.preferred_weights = np.zeros(shape, dtype=np.float64)
+        for column, job in enumerate(positions.values()):
+            weights = job.get("skill_weights") or {}
+            for skill in job["required_skills"]:
+                row = self.vocabulary[skill.upper()]
+                self.required[row, column] += 1
+                self.required_weights[row, column] += weights.get(skill.upper(), 1.0)
+            for skill in job["preferred_skills"]:
+                row = self.vocabulary[skill.upper()]
+                self.preferred[row, column] += 1
+                self.preferred_weights[row, column] += weights.get(skill.upper(), 1.0)
+        self.total_required = self.required.sum(axis=0).astype(np.int64)
+        self.total_preferred = self.preferred.sum(axis=0).astype(np.int64)
+        self.required_weight_total = self.required_weights.sum(axis=0)
+        self.preferred_weight_total = self.preferred_weights.sum(axis=0)
+        self.experience_years = np.array([job.get("experience_years", 0) for job in positions.values()],
+                                         dtype=np.float64)
+
+    def encode(self, candidates):
+        """Encode candidate skill lists as a 0/1 matrix over the vocabulary"""
+        import numpy as np
+
+        encoded = np.zeros((len(candidates), len(self.vocabulary)), dtype=np.float64)
+        vocabulary = self.vocabulary
+        rows, cols = [], []
+        for row, skills in enumerate(candidates):
+            for skill in skills:
+                col = vocabulary.get(skill.upper())
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+        encoded[rows, cols] = 1
+        return encoded
+
+    def credit(self, encoded, strength=None):
+        """Encoded candidates with related-skill credit added where a skill is missing.
+
+        ``strength`` holds each listed skill's section credit (see
+        ``CandidateStore.section_strength``); related credit then scales
+        with the source skill's, as in ``related_credit``.
+        """
+        import numpy as np
+
+        base = encoded if strength is None else strength
+        credited = base.copy()
+        for source, target, value in zip(self._related_from, self._related_to, self._related_credit):
+            np.maximum(credited[:, target], base[:, source] * value, out=credited[:, target])
+        if strength is not None:
+            # A skill the candidate lists keeps its own credit
+            listed = encoded > 0
+            credited[listed] = strength[listed]
+        return credited
+
+    def score(self, encoded, years=None, model=None, columns=None, credited=None, strength=None):
+        """Score encoded candidates against every position, or only ``columns``.
+
+        ``years`` is an array of years of experience per candidate.
+        ``credited`` may pass a cached ``credit(encoded, strength)`` for
+        related-skill scoring. ``strength`` is the candidates' section credit
+        per skill, used when ``model.section_weights`` is set. Returns arrays
+        of shape (candidates, positions) with the keys of
+        ``calculate_skill_match``.
+        """
+        import numpy as np
+
+        model = model or DEFAULT_MODEL
+        columns = slice(None) if columns is None else columns
+        if not model.section_weights:
+            strength = None
+        coverage = encoded if strength is None else strength
+        if model.related:
+            coverage = credited if credited is not None else self.credit(encoded, strength)
+
+        # One pass over the candidates for all four products; 0/1 products
+        # of at most a few hundred terms are exact
+        counts = [self.required[:, columns], self.preferred[:, columns]]
+        weights = [self.required_weights[:, columns], self.preferred_weights[:, columns]]
+        if coverage is encoded:
+            products = np.split(encoded @ np.hstack(counts + weights), 4, axis=1)
+        else:
+            products = (np.split(encoded @ np.hstack(counts), 2, axis=1)
+                        + np.split(coverage @ np.hstack(weights), 2, axis=1))
+        required_matches = products[0].astype(np.int64)
+        preferred_matches = products[1].astype(np.int64)
+        required_score = _percent(products[2], self.required_weight_total[columns])
+        preferred_score = _percent(products[3], self.preferred_weight_total[columns])
+
+        experience = None
+        if years is not None:
+            required_years = self.experience_years[columns]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                share = np.minimum(np.asarray(years, dtype=np.float64)[:, None] / required_years, 1.0)
+            experience = np.where(required_years > 0, share * 100, 100.0)
+        overall_score = model.overall(required_score, preferred_score, experience)
+
+        shape = required_matches.shape
+        return {
+            "overall_score": overall_score,
+            "required_score": required_score,
+            "preferred_score": preferred_score,
+            "experience_score": experience,
+            "required_matches": required_matches,
+            "preferred_matches": preferred_matches,
+            "total_required": np.broadcast_to(self.total_required[columns], shape),
+            "total_preferred": np.broadcast_to(self.total_preferred[columns], shape),
+        }
+
+
+def _percent(matches, totals):
+    """matches / total * 100 per column, 0 where the position lists no skills"""
+    import numpy as np
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        score = matches / totals * 100
+    return np.where(totals > 0, score, 0.0)
+
+
+def score_matrix(candidates, positions, years=None, model=None):
+    """Score every candidate against every position in a few matrix operations.
+
+    ``candidates`` is a list of skill lists and ``positions`` either a
+    ``JOB_POSITIONS``-style dict or a prebuilt ``PositionMatrix``; ``years``
+    optionally lists each candidate's years of experience. Returns arrays of
+    shape (candidates, positions) with the same keys and values as
+    ``calculate_skill_match``.
+    """
+    if not isinstance(positions, PositionMatrix):
+        positions = PositionMatrix(positions)
+    return positions.score(positions.encode(candidates), years, model)
+
+
+def rank_pool(store, matrix, position, model=None, k=50):
+    """Top ``k`` stored candidates for one position of a ``PositionMatrix``.
+
+    The store's candidates are encoded once per store version (see
+    ``CandidateStore.skill_matrix``), so re-ranking the whole pool after a
+    weight change is a few matrix-vector products; section weights use the
+    store's section credit (``CandidateStore.section_strength``). Returns a
+    list of dicts with the candidate id, name, years and match fields, best
+    first.
+    """
+    import numpy as np
+
+    model = model or DEFAULT_MODEL
+    column = [matrix.columns[position]]
+    encoded, years, credited = store.skill_matrix(matrix)
+    if not len(years):
+        return []
+    strength = None
+    if model.section_weights:
+        strength, credited = store.section_strength(matrix, model.section_weights)
+    scores = matrix.score(encoded, years, model, column, credited if model.related else None, strength)
+    overall = scores["overall_score"][:, 0]
+    if len(overall) > k:
+        top = np.argpartition(-overall, k - 1)[:k]
+    else:
+        top = np.arange(len(overall))
+    # Best score first, then the earlier candidate
+    top = top[np.lexsort((top, -overall[top]))]
+    return [{
+        "id": int(i),
+        "name": store.names[i],
+        "years_experience": int(years[i]),
+        **{key: (value[i, 0].item() if value is not None else None) for key, value in scores.items()},
+    } for i in top]
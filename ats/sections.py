@@ -0,0 +1,40 @@
+"""Resume sections from their headings
+
+Resumes put a title such as "TECHNICAL SKILLS" or "PROFESSIONAL EXPERIENCE"
+on a line of its own above each section. ``HEADING`` recognises those lines,
+and ``section_of`` maps a title to one of ``SECTIONS``. Text above the
+first heading (name and contact lines) is the ``header`` section.
+
+There is no separate segmentation pass: the scan pattern of
+``ats.experience`` matches the heading lines, so ``SkillScanner`` follows
+the current section during its own pass and reports where each skill
+appeared (``skill_sections``). ``SECTION_WEIGHTS`` is the credit a
+skill earns from each section when a ``ScoringModel`` weighs sections.
+"""
+SECTIONS = ("header", "summary", "skills", "experience", "education", "other")
+
+# A line holding nothing but a section title, on upper-cased text; the
+# title is captured without its qualifier ("PROFESSIONAL ", "TECHNICAL ")
+HEADING = (r'[ \t]*(?P<heading>(?:PROFESSIONAL |WORK |RELEVANT |TECHNICAL |CORE |KEY )?'
+           r'(?P<title>EXPERIENCE|EMPLOYMENT(?: HISTORY)?|WORK HISTORY|CAREER HISTORY|EDUCATION'
+           r'|ACADEMIC BACKGROUND|SKILLS|SUMMARY|PROFILE|OBJECTIVE|PROJECTS|CERTIFICATIONS?|AWARDS'
+           r'|PUBLICATIONS|INTERESTS|LANGUAGES|ACTIVITIES|VOLUNTEER(?:ING)?))[ \t]*:?[ \t]*\r?(?=\n|\Z)')
+
+_TITLES = {
+    "summary": ("SUMMARY", "PROFILE", "OBJECTIVE"),
+    "skills": ("SKILLS", "LANGUAGES", "CERTIFICATION", "CERTIFICATIONS"),
+    "experience": ("EXPERIENCE", "EMPLOYMENT", "EMPLOYMENT HISTORY", "WORK HISTORY", "CAREER HISTORY",
+                   "PROJECTS"),
+    "education": ("EDUCATION", "ACADEMIC BACKGROUND"),
+}
+_SECTION_OF = {title: section for section, titles in _TITLES.items() for title in titles}
+
+# Credit of a skill by the best section it appears in. Skills listed only
+# under education or hobbies, or only in the contact lines, count less
+SECTION_WEIGHTS = {"header": 0.25, "summary": 1.0, "skills": 1.0, "experience": 1.0, "education": 0.5,
+                   "other": 0.5}
+
+
+def section_of(title):
+    """Section of a ``HEADING`` title; titles outside ``_TITLES`` are ``other``"""
+    return _SECTION_OF.get(title, "other")
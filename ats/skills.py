@@ -0,0 +1,266 @@
+"""Skill taxonomy and single-pass skill matcher"""
+import os
+import re
+
+from ats.experience import MAX_EVENT_CHARS, ExperienceTracker, scan_pattern
+from ats.fuzzy import PHRASE_WORD, get_skill_index
+from ats.sections import SECTIONS, section_of
+from ats.taxonomy import get_taxonomy, matcher_tables
+
+# Also credit aliases and close spellings of skills (see ats.fuzzy)
+FUZZY_MATCHING = os.environ.get("ATS_FUZZY_SKILLS", "0") != "0"
+
+# The taxonomy this process started with (see ats.taxonomy), kept for
+# callers that want plain lists. Extraction, scoring and the candidate store
+# read get_taxonomy() instead, so a newly published version applies to them
+# without a restart
+_TAXONOMY = get_taxonomy()
+TECH_SKILLS = list(_TAXONOMY.skills)
+# Skill groups shown in the category charts
+SKILL_CATEGORIES = {category: list(skills) for category, skills in _TAXONOMY.categories.items()}
+# Partial credit a skill earns toward a broader or equivalent requirement when
+# related-skill scoring is on; 1.0 marks a synonym
+RELATED_SKILLS = {skill: dict(targets) for skill, targets in _TAXONOMY.related.items()}
+# Other names of a skill, matched in fuzzy mode. Close spellings, spacing or
+# punctuation variants ("Node JS", "Kubernates") and names that contain the
+# skill as a word ("AWS Lambda", "React.js") need no entry
+SKILL_ALIASES = dict(_TAXONOMY.aliases)
+
+
+class SkillMatcher:
+    """Finds every skill of a taxonomy in one pass over the text.
+
+    Results are identical to running ``\\b<SKILL>\\b`` for each skill on the
+    upper-cased text, including the quirky boundaries around tokens such as
+    "C++", "C#" or "CI/CD". The combined pattern is a zero-width lookahead so
+    overlapping skills ("REST API" / "API Development") are all reported;
+    shorter skills that share a start position with a longer match are
+    confirmed with their own anchored pattern. ``aliases`` maps other names
+    to skills of the taxonomy; they are matched like skills and report the
+    skill they stand for.
+    """
+
+    def __init__(self, skills, aliases=None, tables=None):
+        self.skills = list(skills)
+        # Prebuilt tables come from a compiled taxonomy
+        tables = tables or matcher_tables(self.skills, aliases)
+        self._index = tables["index"]
+        # Upper-cased alias -> alias as written in the table
+        self._aliases = tables["aliases"]
+        self._longest = max(map(len, self._index))
+        self._pattern = re.compile(r'(?=\b(' + tables["trie"] + r')\b)')
+        # Skills plus experience events, for SkillScanner
+        self._scan_pattern = scan_pattern(tables["trie"])
+
+        # Skills that are a strict prefix of another skill
+        self._prefixes = {
+            key: [(re.compile(r'\b' + re.escape(other) + r'\b'), self._index[other]) for other in shorter]
+            for key, shorter in tables["prefixes"].items()
+        }
+
+    def find_indices(self, upper_text):
+        """Return the set of taxonomy indices found in already upper-cased text"""
+        found = set()
+        prefixes = self._prefixes
+        for match in self._pattern.finditer(upper_text):
+            key = match.group(1)
+            found.update(self._index[key])
+            if key in prefixes:
+                start = match.start()
+                for pattern, indices in prefixes[key]:
+                    if pattern.match(upper_text, start):
+                        found.update(indices)
+        return found
+
+    def find(self, text):
+        """Return matched skills in taxonomy order"""
+        indices = self.find_indices(text.upper())
+        return [skill for i, skill in enumerate(self.skills) if i in indices]
+
+
+class SkillScanner:
+    """Incremental skill and experience extraction over text that arrives in chunks.
+
+    Feeding the pages of a document one by one gives the same skills as
+    ``extract_skills_from_text`` on the concatenated text, while only a short
+    tail of the previous chunk is kept for matches that cross a page break.
+    Skills, stated years and employment date ranges all come from one pass
+    of the matcher's scan pattern (see ``ats.experience``).
+
+    With ``fuzzy`` (default: ``ATS_FUZZY_SKILLS``) the scanner also matches
+    the taxonomy aliases and collects the words and word pairs of each complete
+    line for ``SkillIndex``, which ``finish`` runs once over all of them.
+    ``fuzzy_matches`` then maps each skill matched through an alias or a
+    close spelling to that alias or phrase. Skills found by similarity get
+    no ``skill_years``.
+
+    Heading lines are events of the same pass, so the scanner follows the
+    current section (see ``ats.sections``) and ``skill_sections`` lists the
+    sections each skill appeared in, without a separate segmentation pass.
+    Skills found by similarity get no ``skill_sections`` either.
+
+    Without a ``matcher`` the tables of ``taxonomy`` (default: the current
+    ``get_taxonomy()``) are used, and ``taxonomy.tag`` names the version
+    that produced the results.
+    """
+
+    def __init__(self, matcher=None, today=None, fuzzy=None, taxonomy=None):
+        fuzzy = FUZZY_MATCHING if fuzzy is None else fuzzy
+        self.taxonomy = taxonomy or get_taxonomy()
+        self.matcher = matcher or self.taxonomy.matcher(fuzzy)
+        self.index = None
+        if fuzzy:
+            self.index = self.taxonomy.index() if matcher is None else get_skill_index(matcher.skills,
+                                                                                      self.taxonomy.aliases)
+        self.experience = ExperienceTracker(today)
+        self._keep = max(self.matcher._longest + 1, MAX_EVENT_CHARS)
+        # The scan pattern sees headings after a newline, including on the first line
+        self._buffer = "\n"
+        self._scan_from = 0
+        self._found = set()
+        # Newlines before _line_from, counted up to the last event
+        self._line = 0
+        self._line_from = 0
+        self.skill_years = {}
+        # Section of the text being scanned and the skill indices seen in each section
+        self.section = "header"
+        self._section_found = {section: set() for section in SECTIONS}
+        self.skill_sections = {}
+        # Fuzzy mode: phrases seen so far, the unfinished last line and aliases matched
+        self._phrases = set()
+        self._partial_line = ""
+        self._alias_keys = set()
+        self.fuzzy_matches = {}
+
+    def _scan(self, upper_text, start, stop):
+        """Handle matches starting in [start, stop); returns the end of the last one"""
+        index = self.matcher._index
+        prefixes = self.matcher._prefixes
+        aliases = self.matcher._aliases
+        found = self._found
+        event = self.experience.event
+        skill = self.experience.skill
+        line = self._line
+        line_from = self._line_from
+        in_section = self._section_found[self.section]
+        consumed = start
+        for match in self.matcher._scan_pattern.finditer(upper_text, start):
+            position = match.start()
+            if position >= stop:
+                break
+            consumed = match.end()
+            line += upper_text.count("\n", line_from, position)
+            line_from = position
+            if match.lastgroup != "skill":
+                event(match, line)
+                if match.lastgroup == "heading":
+                    self.section = section_of(match.group("title"))
+                    in_section = self._section_found[self.section]
+                continue
+            key = match.group("skill")
+            indices = index[key]
+            if key in prefixes:
+                indices = list(indices)
+                for pattern, shorter in prefixes[key]:
+                    if pattern.match(upper_text, position):
+                        indices.extend(shorter)
+            if key in aliases:
+                # Credited in finish, so exact matches can be told apart
+                self._alias_keys.add(key)
+                found.update(indices[len(index[key]):])
+            else:
+                found.update(indices)
+            in_section.update(indices)
+            skill(indices, line)
+        self._line = line + upper_text.count("\n", line_from, stop)
+        self._line_from = stop
+        return consumed
+
+    def _collect(self, upper_text, final=False):
+        """Add the words and word pairs of complete lines to the fuzzy phrases"""
+        text = self._partial_line + upper_text
+        if not final:
+            text, _, self._partial_line = text.rpartition("\n")
+        phrases = self._phrases
+        for line in text.split("\n"):
+            words = PHRASE_WORD.findall(line)
+            phrases.update(words)
+            phrases.update(map(" ".join, zip(words, words[1:])))
+
+    def feed(self, chunk):
+        """Scan a chunk of text; matches near its end wait for the next chunk"""
+        upper_chunk = chunk.upper()
+        self._buffer += upper_chunk
+        if self.index is not None:
+            self._collect(upper_chunk)
+        stop = len(self._buffer) - self._keep
+        if stop > self._scan_from:
+            resume = self._scan(self._buffer, self._scan_from, stop)
+            # Keep one character before the tail so \b sees the real neighbour,
+            # and skip whatever the last match already consumed past the cut
+            self._buffer = self._buffer[stop - 1:]
+            self._scan_from = max(1, resume - stop + 1)
+            self._line_from = 1
+
+    def finish(self):
+        """Scan the remaining tail and return (skills, years_experience)"""
+        self._scan(self._buffer, self._scan_from, len(self._buffer) + 1)
+        self._buffer = ""
+        years, skill_years = self.experience.finish()
+        if self.index is not None:
+            self._fuzzy_finish()
+        skills = [self.matcher.skills[i] for i in sorted(self._found)]
+        self.skill_years = {self.matcher.skills[i]: skill_years[i] for i in sorted(skill_years)}
+        sections = {}
+        for section, found in self._section_found.items():
+            # Alias indices are seen here even when finish did not credit them
+            for i in found & self._found:
+                sections.setdefault(i, []).append(section)
+        self.skill_sections = {self.matcher.skills[i]: sections[i] for i in sorted(sections)}
+        return skills, years
+
+    def _fuzzy_finish(self):
+        """Credit skills of the collected phrases and record how fuzzy skills were found"""
+        self._collect("", final=True)
+        names = self.matcher.skills
+        matches = {}
+        for key in sorted(self._alias_keys):
+            for i in self.matcher._index[key]:
+                if i not in self._found:
+                    matches.setdefault(i, self.matcher._aliases[key])
+        # Sorted so the reported phrase does not depend on set order
+        for i, phrase in self.index.match(sorted(self._phrases)).items():
+            if i not in self._found:
+                matches.setdefault(i, phrase)
+        self._found.update(matches)
+        self.fuzzy_matches = {names[i]: matches[i] for i in sorted(matches)}
+
+
+_matchers = {}
+
+
+def get_matcher(skills=None, aliases=None):
+    """Return the compiled matcher for a taxonomy, building it on first use"""
+    if skills is None and not aliases:
+        return get_taxonomy().matcher()
+    key = (tuple(get_taxonomy().skills if skills is None else skills), tuple(sorted((aliases or {}).items())))
+    matcher = _matchers.get(key)
+    if matcher is None:
+        matcher = _matchers[key] = SkillMatcher(key[0], aliases)
+    return matcher
+
+
+def extract_skills_from_text(text, skills=None, fuzzy=None):
+    """Extract skills from resume text using pattern matching"""
+    fuzzy = FUZZY_MATCHING if fuzzy is None else fuzzy
+    matcher = None
+    if skills is not None:
+        matcher = get_matcher(skills, get_taxonomy().aliases if fuzzy else None)
+    # Skills and years of experience come from the same single pass
+    scanner = SkillScanner(matcher, fuzzy=fuzzy)
+    scanner.feed(text)
+    return scanner.finish()
+
+
+# Build the default matcher at import so the first resume pays nothing
+_TAXONOMY.matcher()
@@ -0,0 +1,499 @@
+"""Persistent candidate store with a skill -> candidate bitmap index
+
+Every screened resume gets a dense integer id. Each skill of the taxonomy
+owns one bitmap row (little-endian uint64 words, bit ``i`` = candidate
+``i``), so "Kubernetes AND Terraform, 5+ years" is two word-wise ANDs and a
+comparison over the years array regardless of how many candidates match.
+Unless it is given a fixed skill list, the store takes in the skills of
+every taxonomy version published while it runs (see ``ats.taxonomy``) and
+keeps the rows of skills a newer version dropped. Next to each skill row
+sits one row per resume section (``ats.sections``) marking the candidates
+that list the skill there, so pool ranking can weigh skills by section.
+
+On disk the store is a directory holding:
+
+* ``candidates.jsonl`` -- append-only log of every upsert, the source of truth
+* ``index.npz`` -- compressed snapshot of the bitmaps, years and metadata,
+  plus the log offset it covers; the log tail is replayed on open
+"""
+import json
+import os
+import re
+import tempfile
+import threading
+
+from ats.sections import SECTIONS
+from ats.taxonomy import get_taxonomy
+
+# Compact the log into a fresh snapshot once this many records (or half the
+# store, whichever is larger) have been appended since the last one
+SNAPSHOT_EVERY = 20000
+
+_TOKEN = re.compile(r'\s*(\(|\)|[^\s()]+)')
+_SECTION_IDS = {section: i for i, section in enumerate(SECTIONS)}
+_OPERATORS = {"AND", "OR", "NOT"}
+
+
+class QueryError(ValueError):
+    """A skill query could not be parsed"""
+
+
+def _join_blob(values):
+    import numpy as np
+
+    return np.frombuffer("\n".join(values).encode("utf-8"), dtype=np.uint8)
+
+
+def _split_blob(blob, count):
+    return bytes(blob).decode("utf-8").split("\n") if count else []
+
+
+class CandidateStore:
+    """Candidates, their skills and years of experience with boolean skill queries"""
+
+    def __init__(self, directory=None, skills=None):
+        import numpy as np
+
+        self.directory = directory
+        # Without a fixed skill list the vocabulary follows get_taxonomy()
+        self.follows_taxonomy = skills is None
+        self._taxonomy_tag = None
+        self.skills = []
+        self._skill_ids = {}
+        self._bits = np.zeros((0, 1), dtype="<u8")
+        # Section x skill x word: the candidates listing a skill under each section
+        self._section_bits = np.zeros((len(SECTIONS), 0, 1), dtype="<u8")
+        self._extend(get_taxonomy().skills if skills is None else skills)
+        if self.follows_taxonomy:
+            self._taxonomy_tag = get_taxonomy().tag
+        self._lock = threading.RLock()
+
+        self.count = 0
+        self.keys = []
+        self.names = []
+        self._ids = {}
+        self._years = np.zeros(64, dtype=np.int16)
+        self._pending = 0
+        self._log = None
+        # Bumped on every update; keys the cached dense encoding
+        self.version = 0
+        self._encoded = None
+        self._strength = None
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._load()
+            self._log = open(self._log_path, "a", encoding="utf-8")
+
+    @property
+    def _log_path(self):
+        return os.path.join(self.directory, "candidates.jsonl")
+
+    @property
+    def _snapshot_path(self):
+        return os.path.join(self.directory, "index.npz")
+
+    # -- persistence ---------------------------------------------------------
+
+    def _load(self):
+        import numpy as np
+
+        offset = 0
+        if os.path.exists(self._snapshot_path):
+            with np.load(self._snapshot_path) as snapshot:
+                self.count = int(snapshot["count"])
+                offset = int(snapshot["log_offset"])
+                self.keys = _split_blob(snapshot["keys"], self.count)
+                self.names = _split_blob(snapshot["names"], self.count)
+                self._years = snapshot["years"].copy()
+                stored = [str(skill) for skill in snapshot["skills"]]
+                bits = snapshot["bits"]
+                # Snapshots written before sections were stored have none
+                sections, section_bits = [], None
+                if "sections" in snapshot.files:
+                    sections = [str(section) for section in snapshot["sections"]]
+                    section_bits = snapshot["section_bits"]
+            if self.follows_taxonomy:
+                # Skills a newer taxonomy dropped stay searchable
+                self._extend(stored)
+            # Remap rows by skill name so a changed taxonomy keeps old postings
+            self._bits = np.zeros((len(self.skills), bits.shape[1]), dtype="<u8")
+            self._section_bits = np.zeros((len(SECTIONS),) + self._bits.shape, dtype="<u8")
+            for row, skill in enumerate(stored):
+                skill_id = self._skill_ids.get(skill.upper())
+                if skill_id is not None:
+                    self._bits[skill_id] = bits[row]
+                    for index, section in enumerate(sections):
+                        if section in _SECTION_IDS:
+                            self._section_bits[_SECTION_IDS[section], skill_id] = section_bits[index, row]
+            self._ids = {key: i for i, key in enumerate(self.keys)}
+
+        if os.path.exists(self._log_path):
+            with open(self._log_path, "rb") as log:
+                log.seek(offset)
+                for line in log:
+                    if line.strip():
+                        record = json.loads(line)
+                        self._apply(record["key"], record["name"], record["skills"], record["years"],
+                                    record.get("sections"))
+                        self._pending += 1
+
+    def save(self):
+        """Write a snapshot covering everything in the log"""
+        import numpy as np
+
+        if not self.directory:
+            return
+        with self._lock:
+            self._log.flush()
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".npz")
+            with os.fdopen(fd, "wb") as f:
+                np.savez_compressed(
+                    f,
+                    count=self.count,
+                    log_offset=self._log.tell(),
+                    skills=np.array(self.skills),
+                    bits=self._bits[:, :self._words(self.count)],
+                    sections=np.array(SECTIONS),
+                    section_bits=self._section_bits[:, :, :self._words(self.count)],
+                    years=self._years[:self.count],
+                    keys=_join_blob(self.keys),
+                    names=_join_blob(self.names),
+                )
+            os.replace(tmp_path, self._snapshot_path)
+            self._pending = 0
+
+    def close(self):
+        with self._lock:
+            if self._log is not None:
+                if self._pending:
+                    self.save()
+                self._log.close()
+                self._log = None
+
+    # -- updates -------------------------------------------------------------
+
+    @staticmethod
+    def _words(count):
+        return max(1, (count + 63) // 64)
+
+    def _extend(self, skills):
+        """Add an empty bitmap row for each skill the store does not index yet"""
+        import numpy as np
+
+        added = 0
+        for skill in skills:
+            if skill.upper() not in self._skill_ids:
+                self._skill_ids[skill.upper()] = len(self.skills)
+                self.skills.append(skill)
+                added += 1
+        if added:
+            self._bits = np.vstack([self._bits, np.zeros((added, self._bits.shape[1]), dtype="<u8")])
+            empty = np.zeros((len(SECTIONS), added, self._bits.shape[1]), dtype="<u8")
+            self._section_bits = np.concatenate([self._section_bits, empty], axis=1)
+
+    def _follow_taxonomy(self):
+        """Index the skills of a newly published taxonomy; caller holds the lock"""
+        if self.follows_taxonomy:
+            taxonomy = get_taxonomy()
+            if taxonomy.tag != self._taxonomy_tag:
+                self._extend(taxonomy.skills)
+                self._taxonomy_tag = taxonomy.tag
+
+    def _grow(self, count):
+        import numpy as np
+
+        words = self._words(count)
+        if words > self._bits.shape[1]:
+            grown = np.zeros((self._bits.shape[0], max(words, self._bits.shape[1] * 2)), dtype="<u8")
+            grown[:, :self._bits.shape[1]] = self._bits
+            self._bits = grown
+            grown = np.zeros(self._section_bits.shape[:2] + (self._bits.shape[1],), dtype="<u8")
+            grown[:, :, :self._section_bits.shape[2]] = self._section_bits
+            self._section_bits = grown
+        if count > len(self._years):
+            grown = np.zeros(max(count, len(self._years) * 2), dtype=np.int16)
+            grown[:len(self._years)] = self._years
+            self._years = grown
+
+    def _apply(self, key, name, skills, years, sections=None):
+        """Insert or replace a candidate in memory and return its id"""
+        import numpy as np
+
+        candidate_id = self._ids.get(key)
+        is_new = candidate_id is None
+        if is_new:
+            candidate_id = self.count
+            self._grow(self.count + 1)
+            self._ids[key] = candidate_id
+            self.keys.append(key)
+            self.names.append(name)
+            self.count += 1
+        else:
+            self.names[candidate_id] = name
+
+        word, bit = candidate_id >> 6, np.uint64(1 << (candidate_id & 63))
+        if not is_new:
+            self._bits[:, word] &= ~bit
+            self._section_bits[:, :, word] &= ~bit
+
+        if self.follows_taxonomy:
+            # Skills extracted with a taxonomy newer than the last one seen
+            self._extend(skills)
+        skill_ids = {self._skill_ids.get(skill.upper()) for skill in skills}
+        skill_ids.discard(None)
+        if skill_ids:
+            self._bits[list(skill_ids), word] |= bit
+        listed = {skill.upper() for skill in skills}
+        for skill, skill_sections in (sections or {}).items():
+            skill_id = self._skill_ids.get(skill.upper())
+            if skill_id is None or skill.upper() not in listed:
+                continue
+            for section in skill_sections:
+                if section in _SECTION_IDS:
+                    self._section_bits[_SECTION_IDS[section], skill_id, word] |= bit
+        self._years[candidate_id] = min(int(years), np.iinfo(np.int16).max)
+        return candidate_id
+
+    def add(self, key, name, skills, years_experience, skill_sections=None):
+        """Insert or update one screened resume; ``key`` is usually the content hash"""
+        return self.add_many([(key, name, skills, years_experience, skill_sections)])[0]
+
+    def add_many(self, records):
+        """Insert or update (key, name, skills, years_experience[, skill_sections]) records.
+
+        ``skill_sections`` (from ``SkillScanner``) maps skills to the resume
+        sections they appear in; without it the skills count in full when the
+        pool is ranked with section weights.
+        """
+        ids = []
+        with self._lock:
+            self._follow_taxonomy()
+            self.version += 1
+            for key, name, skills, years, *rest in records:
+                sections = rest[0] if rest else None
+                ids.append(self._apply(key, name, list(skills), years, sections))
+                if self._log is not None:
+                    record = {"key": key, "name": name, "skills": list(skills), "years": years}
+                    if sections:
+                        record["sections"] = sections
+                    self._log.write(json.dumps(record) + "\n")
+                    self._pending += 1
+            if self._log is not None:
+                self._log.flush()
+                if self._pending >= max(SNAPSHOT_EVERY, self.count // 2):
+                    self.save()
+        return ids
+
+    # -- queries -------------------------------------------------------------
+
+    def _skill_bitmap(self, skill):
+        skill_id = self._skill_ids.get(skill.strip().upper())
+        if skill_id is None:
+            raise QueryError(f"Unknown skill: {skill!r}")
+        return self._bits[skill_id, :self._words(self.count)]
+
+    def _all_bitmap(self):
+        import numpy as np
+
+        words = self._words(self.count)
+        bitmap = np.full(words, np.iinfo(np.uint64).max, dtype="<u8")
+        tail = self.count & 63
+        if tail:
+            bitmap[-1] = np.uint64((1 << tail) - 1)
+        elif self.count == 0:
+            bitmap[:] = 0
+        return bitmap
+
+    def _parse(self, expression):
+        """Evaluate 'A AND (B OR C) AND NOT D' into a bitmap; adjacent words form one skill"""
+        tokens = _TOKEN.findall(expression)
+        position = 0
+
+        def peek():
+            return tokens[position] if position < len(tokens) else None
+
+        def take():
+            nonlocal position
+            position += 1
+            return tokens[position - 1]
+
+        def parse_or():
+            bitmap = parse_and()
+            while peek() and peek().upper() == "OR":
+                take()
+                bitmap = bitmap | parse_and()
+            return bitmap
+
+        def parse_and():
+            bitmap = parse_not()
+            while peek() and peek().upper() == "AND":
+                take()
+                bitmap = bitmap & parse_not()
+            return bitmap
+
+        def parse_not():
+            if peek() and peek().upper() == "NOT":
+                take()
+                return self._all_bitmap() & ~parse_not()
+            return parse_atom()
+
+        def parse_atom():
+            token = peek()
+            if token is None:
+                raise QueryError("Query ended unexpectedly")
+            if token == "(":
+                take()
+                bitmap = parse_or()
+                if take_or_none() != ")":
+                    raise QueryError("Missing closing parenthesis")
+                return bitmap
+            words = []
+            while peek() not in (None, "(", ")") and peek().upper() not in _OPERATORS:
+                words.append(take())
+            if not words:
+                raise QueryError(f"Expected a skill near {token!r}")
+            return self._skill_bitmap(" ".join(words))
+
+        def take_or_none():
+            return take() if peek() is not None else None
+
+        bitmap = parse_or()
+        if peek() is not None:
+            raise QueryError(f"Unexpected {peek()!r}")
+        return bitmap
+
+    def query_ids(self, expression=None, all_of=(), any_of=(), none_of=(), min_years=None, max_years=None):
+        """Return matching candidate ids as a sorted NumPy array"""
+        import numpy as np
+
+        with self._lock:
+            self._follow_taxonomy()
+            bitmap = self._all_bitmap()
+            if expression and expression.strip():
+                bitmap &= self._parse(expression)
+            for skill in all_of:
+                bitmap &= self._skill_bitmap(skill)
+            if any_of:
+                any_bitmap = np.zeros_like(bitmap)
+                for skill in any_of:
+                    any_bitmap |= self._skill_bitmap(skill)
+                bitmap &= any_bitmap
+            for skill in none_of:
+                bitmap &= ~self._skill_bitmap(skill)
+
+            ids = np.flatnonzero(np.unpackbits(bitmap.view(np.uint8), bitorder="little"))
+            if min_years is not None or max_years is not None:
+                years = self._years[ids]
+                keep = np.ones(len(ids), dtype=bool)
+                if min_years is not None:
+                    keep &= years >= min_years
+                if max_years is not None:
+                    keep &= years <= max_years
+                ids = ids[keep]
+            return ids
+
+    def count_matches(self, *args, **kwargs):
+        return len(self.query_ids(*args, **kwargs))
+
+    def skill_matrix(self, matrix):
+        """Every candidate as rows over the vocabulary of a ``PositionMatrix``.
+
+        Returns ``(encoded, years, credited)``: the 0/1 float64 candidate x
+        skill matrix, years of experience per candidate and ``encoded`` with
+        related-skill credit. The result is cached until the store changes or
+        another matrix is passed, so re-scoring the pool under new weights
+        does not decode the bitmaps again.
+        """
+        import numpy as np
+
+        with self._lock:
+            self._follow_taxonomy()
+            cached = self._encoded
+            if cached is not None and cached[0] == self.version and cached[1] is matrix:
+                return cached[2]
+            words = self._words(self.count)
+            encoded = np.zeros((self.count, len(matrix.skills)), dtype=np.float64)
+            for column, skill in enumerate(matrix.skills):
+                skill_id = self._skill_ids.get(skill.upper())
+                if skill_id is not None:
+                    bits = np.unpackbits(self._bits[skill_id, :words].view(np.uint8), bitorder="little")
+                    encoded[:, column] = bits[:self.count]
+            result = (encoded, self._years[:self.count].astype(np.float64), matrix.credit(encoded))
+            self._encoded = (self.version, matrix, result)
+            return result
+
+    def section_strength(self, matrix, section_weights):
+        """Candidates' skill credit under ``section_weights``, as rows over a ``PositionMatrix`` vocabulary.
+
+        Returns ``(strength, credited)``: each listed skill at the weight of
+        the best section it appears in (full credit when its sections are
+        unknown), as ``section_credit`` gives it, and the same with
+        related-skill credit. Cached like ``skill_matrix`` and per weights.
+        """
+        import numpy as np
+
+        key = tuple(sorted(section_weights.items()))
+        with self._lock:
+            encoded = self.skill_matrix(matrix)[0]
+            cached = self._strength
+            if cached is not None and cached[:3] == (self.version, matrix, key):
+                return cached[3]
+            words = self._words(self.count)
+            strength = encoded.copy()
+            for column, skill in enumerate(matrix.skills):
+                skill_id = self._skill_ids.get(skill.upper())
+                if skill_id is None:
+                    continue
+                best = np.zeros(self.count)
+                known = np.zeros(self.count, dtype=bool)
+                for section, row in _SECTION_IDS.items():
+                    bitmap = self._section_bits[row, skill_id, :words]
+                    if not bitmap.any():
+                        continue
+                    bits = np.unpackbits(bitmap.view(np.uint8), bitorder="little")[:self.count].astype(bool)
+                    np.maximum(best, np.where(bits, section_weights.get(section, 1.0), 0.0), out=best)
+                    known |= bits
+                strength[known, column] = best[known]
+            result = (strength, matrix.credit(encoded, strength))
+            self._strength = (self.version, matrix, key, result)
+            return result
+
+    def candidate(self, candidate_id):
+        """Record for one candidate id, with skills read back from the index"""
+        import numpy as np
+
+        with self._lock:
+            word, bit = candidate_id >> 6, np.uint64(1 << (candidate_id & 63))
+            rows = np.flatnonzero(self._bits[:, word] & bit)
+            return {
+                "id": int(candidate_id),
+                "key": self.keys[candidate_id],
+                "name": self.names[candidate_id],
+                "years_experience": int(self._years[candidate_id]),
+                "skills": [self.skills[row] for row in rows],
+            }
+
+    def query(self, expression=None, limit=100, **filters):
+        """Matching candidate records, at most ``limit`` of them"""
+        ids = self.query_ids(expression, **filters)
+        return [self.candidate(candidate_id) for candidate_id in ids[:limit]]
+
+    def __contains__(self, key):
+        return key in self._ids
+
+    def __len__(self):
+        return self.count
+
+
+_default_store = None
+_default_lock = threading.Lock()
+
+
+def get_candidate_store():
+    """Process-wide store in ``ATS_STORE_DIR`` (default ``candidate_store``)"""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = CandidateStore(os.environ.get("ATS_STORE_DIR", "candidate_store"))
+        return _default_store
@@ -0,0 +1,373 @@
+"""Skill taxonomy compiled from ``taxonomy.yaml`` into a memory-mapped artifact
+
+``taxonomy.yaml`` is the one place skills, categories, aliases and
+related-skill credit are defined. ``python -m ats.taxonomy build`` compiles
+it into ``taxonomy.bin``: the skill list and its derived tables (the matcher's
+trie patterns and prefix table, the fuzzy ``SkillIndex`` arrays) in one file.
+
+Only the ``SkillIndex`` arrays are memory-mapped and shared between the
+worker processes that load the same artifact. The skill list, aliases,
+related credit, matcher index, prefix table and trie patterns live in the
+JSON header: each process parses them and compiles its own ``SkillMatcher``
+regex, which saves the build from ``taxonomy.yaml`` but not the per-process
+copy.
+
+``get_taxonomy`` serves the artifact named by ``ATS_TAXONOMY_FILE``, or the
+bundled one. A new version is published by writing the file with
+``write_artifact`` (a rename, so readers see the old or the new file, never
+a partial one); processes pick it up within ``RELOAD_CHECK_SECONDS`` and swap
+the whole ``Taxonomy`` object at once. When the bundled artifact is older
+than ``taxonomy.yaml`` the source is compiled in memory instead.
+
+Artifact layout: an 8-byte magic, the offset and length of a JSON header
+(two little-endian uint64), then the NumPy arrays aligned to 64 bytes,
+then the header.
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import tempfile
+import threading
+import time
+
+from ats.fuzzy import SkillIndex, index_tables
+
+SOURCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "taxonomy.yaml")
+ARTIFACT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "taxonomy.bin")
+
+MAGIC = b"ATSTAX01"
+_PREFIX = struct.Struct("<8sQQ")
+ALIGNMENT = 64
+
+# Minimum seconds between checks of the artifact file for a new version
+RELOAD_CHECK_SECONDS = 1.0
+
+
+class TaxonomyError(ValueError):
+    """Invalid taxonomy source or artifact"""
+
+
+def _trie_pattern(words):
+    """Build a regex alternation shaped like a prefix trie, longest branch first"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def build(node):
+        terminal = "" in node
+        branches = [re.escape(char) + build(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if len(branches) == 1 and not terminal:
+            return branches[0]
+        body = "(?:" + "|".join(branches) + ")"
+        # Greedy optional keeps the longest skill first and backtracks to the
+        # shorter one when the trailing word boundary does not hold
+        return body + "?" if terminal else body
+
+    return build(trie)
+
+
+def matcher_tables(skills, aliases=None):
+    """Everything a ``SkillMatcher`` derives from its skills, as JSON-friendly data.
+
+    ``index`` maps each upper-cased skill or alias to taxonomy indices,
+    ``aliases`` the upper-cased aliases to their spelling in the table,
+    ``trie`` is the alternation of every key and ``prefixes`` lists for a
+    key the other keys that are a strict prefix of it.
+    """
+    index = {}
+    for i, skill in enumerate(skills):
+        index.setdefault(skill.upper(), []).append(i)
+    alias_keys = {}
+    for alias, canonical in (aliases or {}).items():
+        key = alias.upper()
+        if canonical.upper() in index and key not in index:
+            index[key] = list(index[canonical.upper()])
+            alias_keys[key] = alias
+    keys = list(index)
+    prefixes = {}
+    for key in keys:
+        shorter = [other for other in keys if other != key and key.startswith(other)]
+        if shorter:
+            prefixes[key] = shorter
+    return {"index": index, "aliases": alias_keys, "trie": _trie_pattern(keys), "prefixes": prefixes}
+
+
+def _parse_source(data):
+    """(version, skills, categories, aliases, related) from taxonomy YAML, validated"""
+    import yaml
+
+    try:
+        spec = yaml.safe_load(data)
+    except yaml.YAMLError as e:
+        raise TaxonomyError(f"Invalid YAML: {e}") from None
+    if not isinstance(spec, dict) or not isinstance(spec.get("categories"), dict) or "version" not in spec:
+        raise TaxonomyError("A taxonomy needs a version and a categories mapping")
+
+    skills, categories, aliases, related = [], {}, {}, {}
+    names = set()
+    for category, entries in spec["categories"].items():
+        if not isinstance(entries, list) or not entries:
+            raise TaxonomyError(f"Category {category!r} must be a non-empty list of skills")
+        categories[str(category)] = []
+        for entry in entries:
+            entry = {"name": entry} if isinstance(entry, str) else entry
+            if not isinstance(entry, dict) or not isinstance(entry.get("name"), str) or not entry["name"]:
+                raise TaxonomyError(f"Every skill of {category!r} needs a name")
+            name = entry["name"]
+            if name.upper() in names:
+                raise TaxonomyError(f"Skill {name!r} is listed twice")
+            names.add(name.upper())
+            skills.append(name)
+            categories[str(category)].append(name)
+            for alias in entry.get("aliases") or []:
+                if not isinstance(alias, str) or not alias:
+                    raise TaxonomyError(f"Aliases of {name!r} must be strings")
+                aliases[alias] = name
+            credits = entry.get("related") or {}
+            if not isinstance(credits, dict):
+                raise TaxonomyError(f"related of {name!r} must map skills to credits")
+            for target, credit in credits.items():
+                if isinstance(credit, bool) or not isinstance(credit, (int, float)) or not 0 < credit <= 1:
+                    raise TaxonomyError(f"Credit of {name!r} toward {target!r} must be in (0, 1]")
+            if credits:
+                related[name] = {str(target): float(credit) for target, credit in credits.items()}
+
+    seen = {}
+    for alias, name in aliases.items():
+        if alias.upper() in names:
+            raise TaxonomyError(f"Alias {alias!r} of {name!r} is also a skill")
+        if seen.setdefault(alias.upper(), name) != name:
+            raise TaxonomyError(f"Alias {alias!r} is listed for {seen[alias.upper()]!r} and {name!r}")
+    return str(spec["version"]), skills, categories, aliases, related
+
+
+def compile_taxonomy(data):
+    """Compile taxonomy YAML (bytes) into artifact bytes"""
+    import numpy as np
+
+    version, skills, categories, aliases, related = _parse_source(data)
+    content = {"skills": skills, "categories": categories, "aliases": aliases, "related": related}
+    exact, arrays = index_tables(skills, aliases)
+    header = {
+        "version": version,
+        "digest": hashlib.sha256(json.dumps(content, sort_keys=True).encode("utf-8")).hexdigest()[:12],
+        "source_digest": hashlib.sha256(data).hexdigest(),
+        **content,
+        "matcher": {"exact": matcher_tables(skills), "fuzzy": matcher_tables(skills, aliases)},
+        "index_exact": exact,
+        "arrays": {},
+    }
+    body = bytearray()
+    offset = ALIGNMENT
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array, dtype=array.dtype.newbyteorder("<"))
+        header["arrays"][name] = [offset, array.dtype.str, list(array.shape)]
+        body += array.tobytes()
+        body += b"\0" * (-len(body) % ALIGNMENT)
+        offset = ALIGNMENT + len(body)
+    encoded = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    prefix = _PREFIX.pack(MAGIC, offset, len(encoded))
+    return prefix + b"\0" * (ALIGNMENT - len(prefix)) + bytes(body) + encoded
+
+
+def write_artifact(data, path=ARTIFACT_PATH):
+    """Publish artifact bytes atomically: readers see the old file or the new one"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        # Readable by workers running as other users, unlike mkstemp's 0600
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class Taxonomy:
+    """A compiled taxonomy backed by artifact bytes or a read-only memory map.
+
+    ``version`` is the source's version and ``digest`` a hash of its content;
+    ``tag`` combines both and is what results and cache keys record.
+    Matchers and the fuzzy index are built on first use from the stored
+    tables. Only the index arrays are views of the mapped file; everything
+    else is parsed from the header into this process's memory.
+    """
+
+    def __init__(self, buffer):
+        magic, offset, length = _PREFIX.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise TaxonomyError("Not a taxonomy artifact")
+        try:
+            header = json.loads(bytes(buffer[offset:offset + length]))
+        except ValueError:
+            raise TaxonomyError("Corrupt taxonomy artifact header") from None
+        self._buffer = buffer
+        self._header = header
+        self.version = header["version"]
+        self.digest = header["digest"]
+        self.source_digest = header["source_digest"]
+        self.skills = header["skills"]
+        self.categories = header["categories"]
+        self.aliases = header["aliases"]
+        self.related = header["related"]
+        self.category_of = {skill: category for category, skills in self.categories.items() for skill in skills}
+        # Upper-cased candidate skill -> {upper-cased position skill: credit}
+        self.related_upper = {skill.upper(): {target.upper(): credit for target, credit in targets.items()}
+                              for skill, targets in self.related.items()}
+        self._lock = threading.Lock()
+        self._matchers = {}
+        self._index = None
+
+    @property
+    def tag(self):
+        return f"{self.version}-{self.digest[:8]}"
+
+    def __repr__(self):
+        return f"Taxonomy({self.tag}, {len(self.skills)} skills)"
+
+    def matcher(self, fuzzy=False):
+        """``SkillMatcher`` of the taxonomy, with aliases in fuzzy mode"""
+        from ats.skills import SkillMatcher
+
+        matcher = self._matchers.get(fuzzy)
+        if matcher is None:
+            with self._lock:
+                matcher = self._matchers.get(fuzzy)
+                if matcher is None:
+                    tables = self._header["matcher"]["fuzzy" if fuzzy else "exact"]
+                    matcher = self._matchers[fuzzy] = SkillMatcher(self.skills, tables=tables)
+        return matcher
+
+    def index(self):
+        """Fuzzy ``SkillIndex`` over the memory-mapped bigram arrays"""
+        import numpy as np
+
+        if self._index is None:
+            arrays = {}
+            for name, (offset, dtype, shape) in self._header["arrays"].items():
+                count = int(np.prod(shape))
+                arrays[name] = np.frombuffer(self._buffer, dtype=dtype, count=count, offset=offset).reshape(shape)
+            self._index = SkillIndex(self.skills, tables=(self._header["index_exact"], arrays))
+        return self._index
+
+
+def load_artifact(path):
+    """Memory-map an artifact file as a ``Taxonomy``"""
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return Taxonomy(buffer)
+
+
+def _load_bundled():
+    """The bundled artifact, or ``taxonomy.yaml`` compiled in memory when the artifact is stale"""
+    with open(SOURCE_PATH, "rb") as f:
+        source = f.read()
+    try:
+        taxonomy = load_artifact(ARTIFACT_PATH)
+        if taxonomy.source_digest == hashlib.sha256(source).hexdigest():
+            return taxonomy
+    except (OSError, ValueError, struct.error):
+        pass
+    return Taxonomy(compile_taxonomy(source))
+
+
+class _TaxonomySource:
+    """Current taxonomy of an artifact file, swapped as a whole when the file changes"""
+
+    def __init__(self, path):
+        self.path = path
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._checked_at = time.monotonic()
+        self._signature = self._file_signature() if path else None
+        self.taxonomy = load_artifact(path) if path else _load_bundled()
+
+    def _file_signature(self):
+        stat = os.stat(self.path)
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def refresh(self):
+        """Load a new artifact if the file changed; returns True after a swap"""
+        now = time.monotonic()
+        if not self.path or now - self._checked_at < RELOAD_CHECK_SECONDS:
+            return False
+        with self._lock:
+            self._checked_at = now
+            try:
+                signature = self._file_signature()
+                if signature == self._signature:
+                    return False
+                self._signature = signature
+                taxonomy = load_artifact(self.path)
+            except (OSError, ValueError, struct.error) as e:
+                self.last_error = str(e)
+                return False
+            # One reference assignment: readers get the old or the new taxonomy
+            self.taxonomy = taxonomy
+            self.last_error = None
+            return True
+
+
+_source = None
+_source_lock = threading.Lock()
+
+
+def get_taxonomy():
+    """Process-wide taxonomy from ``ATS_TAXONOMY_FILE``, or the bundled one.
+
+    Each call checks (at most once a second) whether the artifact file was
+    replaced and swaps in the new version.
+    """
+    global _source
+    with _source_lock:
+        if _source is None:
+            _source = _TaxonomySource(os.environ.get("ATS_TAXONOMY_FILE") or None)
+    _source.refresh()
+    return _source.taxonomy
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m ats.taxonomy", description="Compile the skill taxonomy.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="compile a taxonomy YAML file into an artifact")
+    build.add_argument("source", nargs="?", default=SOURCE_PATH)
+    build.add_argument("-o", "--output", default=ARTIFACT_PATH)
+    show = commands.add_parser("show", help="print the version and size of an artifact")
+    show.add_argument("artifact", nargs="?", default=ARTIFACT_PATH)
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "build":
+            with open(args.source, "rb") as f:
+                data = compile_taxonomy(f.read())
+            write_artifact(data, args.output)
+            taxonomy = Taxonomy(data)
+            print(f"Wrote {args.output}: version {taxonomy.tag}, {len(taxonomy.skills)} skills, "
+                  f"{len(taxonomy.aliases)} aliases, {len(data):,} bytes")
+        else:
+            taxonomy = load_artifact(args.artifact)
+            print(f"{args.artifact}: version {taxonomy.tag}, {len(taxonomy.skills)} skills in "
+                  f"{len(taxonomy.categories)} categories, {len(taxonomy.aliases)} aliases")
+    except (OSError, TaxonomyError) as e:
+        print(f"Could not {args.command} the taxonomy: {e}", file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
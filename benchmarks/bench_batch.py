@@ -0,0 +1,62 @@
+"""Measure bulk screening throughput as the worker count grows
+
+Run from the repository root:
+
+    python benchmarks/bench_batch.py --docs 400 --workers 1 2 4
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import docx  # noqa: E402
+
+from ats.batch import screen_resumes  # noqa: E402
+from ats.skills import TECH_SKILLS  # noqa: E402
+
+JOB = {
+    "required_skills": ["Python", "Django", "Flask", "REST API", "PostgreSQL", "Docker", "Git", "AWS"],
+    "preferred_skills": ["Machine Learning", "Kubernetes", "Redis", "Celery", "FastAPI", "Microservices"],
+    "experience_years": 5,
+}
+
+
+def make_docx(rng, paragraphs):
+    """Build an in-memory DOCX resume with random skills"""
+    document = docx.Document()
+    document.add_paragraph(f"{rng.randint(1, 15)}+ years of experience")
+    for _ in range(paragraphs):
+        skills = ", ".join(rng.sample(TECH_SKILLS, 8))
+        document.add_paragraph(f"Delivered production systems using {skills}.")
+    buffer = BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=400)
+    parser.add_argument("--paragraphs", type=int, default=60)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    template = make_docx(rng, args.paragraphs)
+    files = [(f"resume_{i}.docx", template) for i in range(args.docs)]
+
+    baseline = None
+    for workers in args.workers:
+        start = time.perf_counter()
+        rows = list(screen_resumes(files, JOB, max_workers=workers))
+        elapsed = time.perf_counter() - start
+        rate = len(rows) / elapsed
+        baseline = baseline or rate / workers
+        print(f"workers={workers:<3} {rate:8.1f} docs/s  scaling efficiency {rate / (baseline * workers):.0%}")
+
+
+if __name__ == "__main__":
+    main()
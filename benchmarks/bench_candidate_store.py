@@ -0,0 +1,69 @@
+"""Benchmark boolean skill queries over a large candidate store
+
+Run from the repository root:
+
+    python benchmarks/bench_candidate_store.py --candidates 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ats.skills import TECH_SKILLS  # noqa: E402
+from ats.store import CandidateStore  # noqa: E402
+
+QUERIES = [
+    ("Kubernetes AND Terraform", {"min_years": 5}),
+    ("Python AND (Django OR Flask) AND NOT PHP", {}),
+    ("Machine Learning AND PyTorch", {"min_years": 3, "max_years": 8}),
+    ("C++ OR C# OR Rust", {}),
+    ("CI/CD AND Docker AND AWS AND Linux", {"min_years": 10}),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--candidates", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    directory = tempfile.mkdtemp(prefix="ats-store-")
+    store = CandidateStore(directory)
+
+    start = time.perf_counter()
+    batch = []
+    for i in range(args.candidates):
+        batch.append((f"candidate-{i}", f"Candidate {i}", rng.sample(TECH_SKILLS, rng.randint(3, 25)),
+                      rng.randint(0, 25)))
+        if len(batch) == 10000:
+            store.add_many(batch)
+            batch = []
+    store.add_many(batch)
+    store.save()
+    print(f"indexed {len(store):,} candidates in {time.perf_counter() - start:.1f}s")
+
+    start = time.perf_counter()
+    store.close()
+    reopened = CandidateStore(directory)
+    print(f"reopened from snapshot in {time.perf_counter() - start:.2f}s")
+
+    for expression, filters in QUERIES:
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            hits = reopened.count_matches(expression, **filters)
+        elapsed = (time.perf_counter() - start) / args.repeat
+        print(f"{elapsed * 1000:7.2f} ms  {hits:>9,} hits  {expression} {filters or ''}")
+
+    start = time.perf_counter()
+    reopened.add("candidate-new", "New Candidate", ["Kubernetes", "Terraform"], 7)
+    print(f"incremental add: {(time.perf_counter() - start) * 1000:.2f} ms")
+    reopened.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Benchmark near-duplicate lookups in a large MinHash/LSH dedup index
+
+Run from the repository root:
+
+    python benchmarks/bench_dedup.py --documents 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ats.dedup import DedupIndex  # noqa: E402
+from ats.skills import TECH_SKILLS  # noqa: E402
+
+WORDS = "led built designed shipped migrated reduced improved owned team platform services data".split()
+
+
+def resume_text(rng, words=400):
+    return " ".join(rng.choice(WORDS + TECH_SKILLS) for _ in range(words))
+
+
+def edit(rng, text, edits=4):
+    """A resent copy: a few words swapped, one line appended"""
+    words = text.split()
+    for _ in range(edits):
+        words[rng.randrange(len(words))] = rng.choice(WORDS)
+    return " ".join(words) + " References available on request"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=1000000)
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+
+    import numpy as np
+
+    rng = random.Random(11)
+    index = DedupIndex(max_documents=args.documents)
+
+    # Real signatures for the documents that will be queried, random ones as filler
+    originals = [resume_text(rng) for _ in range(args.queries)]
+    np_rng = np.random.default_rng(11)
+    start = time.perf_counter()
+    for i, text in enumerate(originals):
+        index.add(index.signature(text), {"id": i})
+    filler = args.documents - len(originals)
+    for block in range(0, filler, 10000):
+        signatures = np_rng.integers(0, 1 << 32, (min(10000, filler - block), index.hasher.num_perm),
+                                     dtype=np.uint32)
+        for signature in signatures:
+            index.add(signature, None)
+    print(f"indexed {len(index):,} documents in {time.perf_counter() - start:.1f}s, "
+          f"{index.nbytes() / 2 ** 20:.0f} MB")
+
+    copies = [edit(rng, text) for text in originals]
+    fresh = [resume_text(rng) for _ in range(args.queries)]
+    start = time.perf_counter()
+    signatures = [index.signature(text) for text in copies + fresh]
+    hash_ms = (time.perf_counter() - start) * 1000 / len(signatures)
+
+    start = time.perf_counter()
+    results = [index.find(signature) for signature in signatures]
+    lookup_ms = (time.perf_counter() - start) * 1000 / len(signatures)
+
+    found = sum(payload is not None and payload["id"] == i
+                for i, (payload, _) in enumerate(results[:args.queries]))
+    false_hits = sum(payload is not None for payload, _ in results[args.queries:])
+    print(f"signature: {hash_ms:.2f} ms/doc, lookup: {lookup_ms:.3f} ms/doc")
+    print(f"edited copies found: {found}/{args.queries}, unrelated documents matched: {false_hits}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Benchmark streaming DOCX extraction against the python-docx object model
+
+Each extractor runs in a fresh subprocess so peak RSS is measured on its own.
+Run from the repository root:
+
+    python benchmarks/bench_docx_extract.py --paragraphs 20000 --image-mb 20
+"""
+import argparse
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def legacy_extract(path):
+    """python-docx path as it shipped originally"""
+    import docx
+
+    text = ""
+    doc = docx.Document(path)
+    for paragraph in doc.paragraphs:
+        text += paragraph.text + "\n"
+    return text
+
+
+def streaming_extract(path):
+    from ats.extract import extract_text_from_docx
+
+    return extract_text_from_docx(path)
+
+
+def make_docx(path, paragraphs, image_mb, seed):
+    """Large resume-like DOCX with tables and an incompressible embedded image"""
+    import docx
+    from docx.shared import Inches
+    from PIL import Image
+
+    from ats.skills import TECH_SKILLS
+
+    rng = random.Random(seed)
+    document = docx.Document()
+    for i in range(paragraphs):
+        document.add_paragraph(f"Project {i}: delivered services with {', '.join(rng.sample(TECH_SKILLS, 5))}.")
+        if i % 500 == 0:
+            table = document.add_table(rows=4, cols=3)
+            for cell in table._cells:
+                cell.text = rng.choice(TECH_SKILLS)
+    if image_mb:
+        side = int((image_mb * 1024 * 1024 / 3) ** 0.5)
+        image = Image.frombytes("RGB", (side, side), os.urandom(side * side * 3))
+        image_path = path + ".png"
+        image.save(image_path)
+        document.add_picture(image_path, width=Inches(4))
+        os.remove(image_path)
+    document.save(path)
+
+
+def peak_rss_mb():
+    """Peak RSS of this process; VmHWM resets on exec, unlike ru_maxrss after fork"""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(mode, path):
+    """Child process entry: extract once and report seconds, peak RSS and text size"""
+    extract = legacy_extract if mode == "legacy" else streaming_extract
+    start = time.perf_counter()
+    text = extract(path)
+    elapsed = time.perf_counter() - start
+    peak_mb = peak_rss_mb()
+    print(f"{elapsed:.4f} {peak_mb:.1f} {len(text)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paragraphs", type=int, default=20000)
+    parser.add_argument("--image-mb", type=int, default=20)
+    parser.add_argument("--measure", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(*args.measure)
+        return
+
+    path = os.path.join(tempfile.mkdtemp(prefix="ats-docx-"), "large.docx")
+    make_docx(path, args.paragraphs, args.image_mb, seed=9)
+    print(f"document: {args.paragraphs} paragraphs, {os.path.getsize(path) / 1024 / 1024:.1f} MB on disk")
+
+    for mode in ("legacy", "streaming"):
+        output = subprocess.run([sys.executable, __file__, "--measure", mode, path],
+                                check=True, capture_output=True, text=True).stdout.split()
+        seconds, peak_mb, chars = float(output[0]), float(output[1]), int(output[2])
+        print(f"{mode:<10} {seconds:7.3f}s  peak RSS {peak_mb:7.1f} MB  {chars:,} chars")
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
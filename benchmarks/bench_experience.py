@@ -0,0 +1,103 @@
+"""Benchmark single-pass skill and experience extraction against two separate passes
+
+``SkillScanner`` must find the same skills as the matcher and never report
+fewer years than the stated-years regex (date ranges may raise them); the
+script exits with code 1 and shows the first offending document otherwise.
+Run from the repository root:
+
+    python benchmarks/bench_experience.py --docs 10000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ats.experience import EXPERIENCE_PATTERN  # noqa: E402
+from ats.skills import TECH_SKILLS, SkillScanner, get_matcher  # noqa: E402
+
+FILLER = (
+    "built led designed scalable services team delivered platform customers "
+    "reduced latency improved reliability mentored engineers stakeholders"
+).split()
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+
+def legacy_extract(text):
+    """Skill matcher plus the stated-years regex, as two passes over the text"""
+    text = text.upper()
+    matcher = get_matcher()
+    indices = matcher.find_indices(text)
+    skills = [skill for i, skill in enumerate(matcher.skills) if i in indices]
+    years = max([int(match) for match in EXPERIENCE_PATTERN.findall(text)], default=0)
+    return skills, years
+
+
+def make_resume(rng):
+    """Resume with a summary, dated jobs, skills under each job and an education section"""
+    lines = ["SUMMARY"]
+    if rng.random() < 0.7:
+        lines.append(f"Engineer with {rng.randint(1, 15)}+ years of experience in {rng.choice(TECH_SKILLS)}")
+    lines.append("EXPERIENCE")
+    year = rng.randint(2000, 2018)
+    for _ in range(rng.randint(1, 4)):
+        end = year + rng.randint(1, 4)
+        if rng.random() < 0.5:
+            dates = f"{rng.choice(MONTHS)} {year} - {rng.choice(MONTHS)} {end}"
+        else:
+            dates = f"{year}-{end}"
+        lines.append(f"Software Engineer | Company {rng.randint(1, 999)} | {dates}")
+        for _ in range(rng.randint(2, 5)):
+            words = rng.sample(FILLER, 5) + rng.sample(TECH_SKILLS, 3)
+            rng.shuffle(words)
+            lines.append("- " + " ".join(words))
+        year = end
+    lines.append("EDUCATION")
+    lines.append(f"B.S. Computer Science, State University, {year - 20}-{year - 16}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    docs = [make_resume(rng) for _ in range(args.docs)]
+    get_matcher()
+
+    start = time.perf_counter()
+    legacy = [legacy_extract(doc) for doc in docs]
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = []
+    for doc in docs:
+        scanner = SkillScanner()
+        scanner.feed(doc)
+        skills, years = scanner.finish()
+        results.append((skills, years, scanner.skill_years))
+    seconds = time.perf_counter() - start
+
+    skill_mismatches = sum(old[0] != new[0] for old, new in zip(legacy, results))
+    lower = sum(new[1] < old[1] for old, new in zip(legacy, results))
+    raised = sum(new[1] > old[1] for old, new in zip(legacy, results))
+    credited = sum(bool(new[2]) for new in results)
+
+    print(f"matcher + stated-years regex: {args.docs / legacy_seconds:8.0f} docs/s")
+    print(f"single-pass SkillScanner:     {args.docs / seconds:8.0f} docs/s "
+          f"({legacy_seconds / seconds:.2f}x)")
+    print(f"skill lists differing: {skill_mismatches}, years lower than before: {lower}, "
+          f"years raised by date ranges: {raised}, docs with per-skill years: {credited}")
+    for doc, old, new in zip(docs, legacy, results):
+        if old[0] != new[0] or new[1] < old[1]:
+            print(f"first mismatch: two passes {old[:2]}, single pass {new[:2]}\n{doc}")
+            break
+    return 1 if skill_mismatches or lower else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
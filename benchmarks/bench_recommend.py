@@ -0,0 +1,64 @@
+"""Benchmark top-k position recommendations against scoring every position
+
+Run from the repository root:
+
+    python benchmarks/bench_recommend.py --positions 10000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ats.positions import PositionCatalog, compile_position  # noqa: E402
+from ats.recommend import PositionIndex  # noqa: E402
+from ats.scoring import calculate_skill_match  # noqa: E402
+from ats.skills import TECH_SKILLS  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--positions", type=int, default=10000)
+    parser.add_argument("--resumes", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(13)
+    positions = {
+        f"Position {i}": compile_position(f"Position {i}", {
+            "required_skills": rng.sample(TECH_SKILLS, rng.randint(4, 10)),
+            "preferred_skills": rng.sample(TECH_SKILLS, rng.randint(2, 8)),
+            "experience_years": rng.randint(0, 10),
+        })
+        for i in range(args.positions)
+    }
+    resumes = [(rng.sample(TECH_SKILLS, rng.randint(5, 40)), rng.randint(0, 20)) for _ in range(args.resumes)]
+
+    start = time.perf_counter()
+    index = PositionIndex(positions)
+    print(f"indexed {len(positions):,} positions in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    start = time.perf_counter()
+    results = [index.top_k(skills, years, args.k) for skills, years in resumes]
+    indexed = (time.perf_counter() - start) / len(resumes)
+
+    start = time.perf_counter()
+    mismatches = 0
+    for (skills, _), top in zip(resumes, results):
+        scores = sorted((calculate_skill_match(skills, job)["overall_score"] for job in positions.values()),
+                        reverse=True)[:args.k]
+        mismatches += any(abs(a - b["overall_score"]) > 1e-9 for a, b in zip(scores, top))
+    baseline = (time.perf_counter() - start) / len(resumes)
+
+    print(f"calculate_skill_match on every position: {baseline * 1000:8.2f} ms/resume")
+    print(f"PositionIndex.top_k:                     {indexed * 1000:8.2f} ms/resume "
+          f"({baseline / indexed:.0f}x, {mismatches} mismatched rankings)")
+
+    catalog = PositionCatalog()
+    print(f"built-in catalog: {[r['position'] for r in catalog.index().top_k(resumes[0][0], resumes[0][1], 3)]}")
+
+
+if __name__ == "__main__":
+    main()
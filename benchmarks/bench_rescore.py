@@ -0,0 +1,65 @@
+"""Benchmark re-ranking a stored candidate pool after a scoring weight change
+
+Run from the repository root:
+
+    python benchmarks/bench_rescore.py --candidates 50000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ats.positions import PositionCatalog  # noqa: E402
+from ats.scoring import ScoringModel, calculate_skill_match, rank_pool  # noqa: E402
+from ats.skills import TECH_SKILLS  # noqa: E402
+from ats.store import CandidateStore  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--candidates", type=int, default=50000)
+    parser.add_argument("--moves", type=int, default=20, help="weight changes to time")
+    parser.add_argument("--position", default="Data Scientist")
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    store = CandidateStore()
+    records = [(f"key-{i}", f"candidate-{i}.pdf", rng.sample(TECH_SKILLS, rng.randint(3, 30)),
+                rng.randint(0, 20)) for i in range(args.candidates)]
+    store.add_many(records)
+    matrix = PositionCatalog().matrix()
+
+    start = time.perf_counter()
+    rank_pool(store, matrix, args.position)
+    first = time.perf_counter() - start
+
+    models = [ScoringModel(rng.random(), rng.random(), rng.random(), rng.random() < 0.5) for _ in range(args.moves)]
+    timings = []
+    for model in models:
+        start = time.perf_counter()
+        ranked = rank_pool(store, matrix, args.position, model, k=50)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+
+    # The same ranking from the per-candidate scorer
+    job = PositionCatalog()[args.position]
+    start = time.perf_counter()
+    scores = sorted((calculate_skill_match(skills, job, years, models[-1])["overall_score"]
+                     for _, _, skills, years in records), reverse=True)[:50]
+    loop = time.perf_counter() - start
+    mismatches = sum(abs(a - b["overall_score"]) > 1e-6 for a, b in zip(scores, ranked))
+
+    print(f"candidates:              {args.candidates:,}")
+    print(f"first ranking (decode):  {first * 1000:8.1f} ms")
+    print(f"re-rank after a change:  {timings[len(timings) // 2] * 1000:8.1f} ms median, "
+          f"{timings[-1] * 1000:.1f} ms max over {len(timings)} weight changes")
+    print(f"calculate_skill_match:   {loop * 1000:8.1f} ms ({loop / timings[len(timings) // 2]:.0f}x slower)")
+    print(f"mismatched top-50 scores: {mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
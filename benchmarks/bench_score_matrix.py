@@ -0,0 +1,95 @@
+"""Benchmark the vectorized candidate x position score matrix
+
+A sample of the pool is also scored with ``calculate_skill_match`` under the
+default model and under related-skill credit with experience and
+per-skill weights; any cell that differs (beyond float rounding) makes the
+script exit with code 1. Run from the repository root:
+
+    python benchmarks/bench_score_matrix.py --candidates 10000 --positions 200
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from ats.scoring import PositionMatrix, ScoringModel, calculate_skill_match, score_matrix  # noqa: E402
+from ats.skills import TECH_SKILLS  # noqa: E402
+
+
+def make_pool(n_candidates, n_positions, seed):
+    """Random candidate skill lists and positions drawn from the taxonomy"""
+    rng = random.Random(seed)
+    candidates = [rng.sample(TECH_SKILLS, rng.randint(3, 30)) for _ in range(n_candidates)]
+    positions = {}
+    for i in range(n_positions):
+        skills = rng.sample(TECH_SKILLS + ["Celery", "Bash", "GitOps"], rng.randint(6, 16))
+        split = rng.randint(3, len(skills) - 1)
+        positions[f"Position {i}"] = {
+            "required_skills": skills[:split],
+            "preferred_skills": skills[split:],
+            "experience_years": rng.randint(0, 10),
+            # A third of the positions weight some skills
+            "skill_weights": ({skill.upper(): rng.choice((0.5, 2.0, 3.0)) for skill in rng.sample(skills, 3)}
+                              if i % 3 == 0 else {}),
+        }
+    return candidates, positions
+
+
+def _mismatches(matrix, looped):
+    """Cells of ``score_matrix`` output that differ from per-pair results"""
+    mismatches = 0
+    for key in ("overall_score", "required_score", "preferred_score", "required_matches", "preferred_matches"):
+        expected = np.array([[result[key] for result in row] for row in looped])
+        mismatches += int(np.count_nonzero(np.abs(matrix[key][:len(looped)] - expected) > 1e-9))
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--candidates", type=int, default=10000)
+    parser.add_argument("--positions", type=int, default=200)
+    parser.add_argument("--loop-sample", type=int, default=500,
+                        help="candidates scored with the per-pair loop, extrapolated to the full pool")
+    args = parser.parse_args()
+
+    candidates, positions = make_pool(args.candidates, args.positions, seed=3)
+    jobs = list(positions.values())
+
+    start = time.perf_counter()
+    compiled = PositionMatrix(positions)
+    compile_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matrix = score_matrix(candidates, compiled)
+    matrix_time = time.perf_counter() - start
+
+    sample = candidates[:args.loop_sample]
+    start = time.perf_counter()
+    looped = [[calculate_skill_match(skills, job) for job in jobs] for skills in sample]
+    loop_time = (time.perf_counter() - start) * len(candidates) / len(sample)
+
+    mismatches = _mismatches(matrix, looped)
+    # The same sample under the other scoring paths: related credit, experience and weights
+    model = ScoringModel(0.5, 0.3, 0.2, related=True)
+    years = random.Random(4).choices(range(15), k=len(sample))
+    weighted = score_matrix(sample, compiled, years, model)
+    mismatches += _mismatches(weighted, [[calculate_skill_match(skills, job, candidate_years, model)
+                                          for job in jobs] for skills, candidate_years in zip(sample, years)])
+
+    pairs = len(candidates) * len(jobs)
+    print(f"pairs:            {len(candidates)} x {len(jobs)} = {pairs:,}")
+    print(f"compile:          {compile_time * 1000:.1f} ms")
+    print(f"matrix:           {matrix_time:.3f}s ({pairs / matrix_time:,.0f} pairs/s)")
+    print(f"loop (estimated): {loop_time:.3f}s ({pairs / loop_time:,.0f} pairs/s)")
+    print(f"speedup:          {loop_time / matrix_time:.0f}x")
+    print(f"mismatched cells: {mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
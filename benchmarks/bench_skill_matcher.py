@@ -0,0 +1,88 @@
+"""Benchmark the single-pass skill matcher against the per-skill regex loop
+
+The two must find the same skills in every document; the script exits with
+code 1 and shows the first difference otherwise, so a small run doubles as
+an equivalence check. Run from the repository root:
+
+    python benchmarks/bench_skill_matcher.py --docs 2000
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ats.skills import TECH_SKILLS, get_matcher  # noqa: E402
+
+FILLER = (
+    "built led designed scalable services team delivered platform customers "
+    "reduced latency improved reliability mentored engineers stakeholders "
+    "pipelines reporting migration cloud data production"
+).split()
+
+# Punctuation that sits next to skills in real resumes and stresses \b rules
+SEPARATORS = [" ", ", ", "; ", " / ", "\n", "(", ") ", ".", "-", "+", "#", "11 ", ""]
+
+
+def legacy_find(text):
+    """Per-skill regex loop as it shipped originally"""
+    text = text.upper()
+    found_skills = []
+    for skill in TECH_SKILLS:
+        pattern = r'\b' + re.escape(skill.upper()) + r'\b'
+        if re.search(pattern, text):
+            found_skills.append(skill)
+    return found_skills
+
+
+def make_corpus(n_docs, words_per_doc, seed):
+    """Random resume-like documents mixing filler words, skills and punctuation"""
+    rng = random.Random(seed)
+    vocab = FILLER + [skill.lower() if rng.random() < 0.3 else skill for skill in TECH_SKILLS]
+    docs = []
+    for _ in range(n_docs):
+        parts = []
+        for _ in range(words_per_doc):
+            parts.append(rng.choice(vocab))
+            parts.append(rng.choice(SEPARATORS))
+        docs.append("".join(parts))
+    return docs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=1000)
+    parser.add_argument("--words", type=int, default=600)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    docs = make_corpus(args.docs, args.words, args.seed)
+    matcher = get_matcher()
+
+    start = time.perf_counter()
+    legacy = [legacy_find(doc) for doc in docs]
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compiled = [matcher.find(doc) for doc in docs]
+    compiled_time = time.perf_counter() - start
+
+    mismatches = sum(1 for a, b in zip(legacy, compiled) if a != b)
+    print(f"documents:        {len(docs)} x ~{args.words} tokens")
+    print(f"per-skill loop:   {legacy_time:.3f}s ({len(docs) / legacy_time:,.0f} docs/s)")
+    print(f"single pass:      {compiled_time:.3f}s ({len(docs) / compiled_time:,.0f} docs/s)")
+    print(f"speedup:          {legacy_time / compiled_time:.1f}x")
+    print(f"mismatched docs:  {mismatches}")
+    for i, (a, b) in enumerate(zip(legacy, compiled)):
+        if a != b:
+            print(f"first mismatch, doc {i}: loop only {sorted(set(a) - set(b))}, "
+                  f"single pass only {sorted(set(b) - set(a))}, order equal: {sorted(a) == sorted(b)}")
+            break
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
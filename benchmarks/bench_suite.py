@@ -0,0 +1,259 @@
+"""Benchmark every pipeline stage on a synthetic corpus and check for drift
+
+Stages are PDF extraction, DOCX extraction, skill extraction (exact and
+fuzzy, see ``ats.fuzzy``; both include the heading tracking that records
+the section of each skill), scoring against every built-in position, and
+building the analysis charts (full and light mode, and light figures served
+from the figure cache on a rerun, see ``ats.charts``). Each stage runs in a
+fresh process and reads its peak RSS from ``VmHWM``, which starts over at
+exec; ``ru_maxrss`` would report the driver's, which a spawned child
+inherits. The report has docs/sec, p50/p99 latency per document and peak
+RSS per stage, plus a digest of the stage's results.
+
+With ``--baseline`` the run fails (exit code 1) when a digest differs from
+the stored one, when throughput drops or when peak RSS grows by more than
+``--tolerance``. Timings only compare on the machine that recorded the
+baseline; re-record it with ``--update-baseline`` after an intended change.
+
+Run from the repository root:
+
+    python benchmarks/bench_suite.py --baseline benchmarks/baseline.json
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import generate_corpus  # noqa: E402
+
+STAGES = ("extract_pdf", "extract_docx", "skills", "skills_fuzzy", "scoring", "render", "render_light",
+          "render_cached")
+CORPUS_FIELDS = ("docs", "words", "skill_density", "pages", "seed")
+
+
+def _files(directory, kind):
+    names = sorted((name for name in os.listdir(directory) if name.endswith("." + kind)),
+                   key=lambda name: int(name.split("_")[1].split(".")[0]))
+    for name in names:
+        with open(os.path.join(directory, name), "rb") as f:
+            yield name, f.read()
+
+
+def _texts(directory):
+    return [str(data, "utf-8") for _, data in _files(directory, "txt")]
+
+
+def _extracted(directory):
+    from ats.skills import SkillScanner
+
+    results = []
+    for text in _texts(directory):
+        scanner = SkillScanner(fuzzy=False)
+        scanner.feed(text)
+        skills, years = scanner.finish()
+        results.append((skills, years))
+    return results
+
+
+def _run_extract(directory, kind):
+    from ats.extract import extract_text
+
+    files = list(_files(directory, kind))
+    # Untimed first document so lazy imports of the parsers are not counted
+    extract_text(BytesIO(files[0][1]), files[0][0])
+    timings, digest = [], hashlib.sha256()
+    for name, data in files:
+        start = time.perf_counter()
+        text = extract_text(BytesIO(data), name)
+        timings.append(time.perf_counter() - start)
+        digest.update(text.encode("utf-8"))
+    return timings, digest
+
+
+def _run_skills(directory, fuzzy=False):
+    from ats.skills import SkillScanner
+
+    timings, digest = [], hashlib.sha256()
+    for text in _texts(directory):
+        start = time.perf_counter()
+        scanner = SkillScanner(fuzzy=fuzzy)
+        scanner.feed(text)
+        skills, years = scanner.finish()
+        timings.append(time.perf_counter() - start)
+        result = [skills, years, scanner.skill_years, scanner.skill_sections]
+        result += [scanner.fuzzy_matches] if fuzzy else []
+        digest.update(json.dumps(result).encode("utf-8"))
+    return timings, digest
+
+
+def _run_scoring(directory):
+    from ats.positions import JOB_POSITIONS, compile_position
+    from ats.scoring import calculate_skill_match
+
+    positions = [compile_position(name, spec) for name, spec in JOB_POSITIONS.items()]
+    timings, digest = [], hashlib.sha256()
+    for skills, years in _extracted(directory):
+        start = time.perf_counter()
+        scores = [calculate_skill_match(skills, job, years)["overall_score"] for job in positions]
+        timings.append(time.perf_counter() - start)
+        digest.update(json.dumps([round(score, 6) for score in scores]).encode("utf-8"))
+    return timings, digest
+
+
+def _run_render(directory):
+    # Imported here so the first figure does not pay for them
+    import pandas  # noqa: F401
+    import plotly.express  # noqa: F401
+    from plotly.utils import PlotlyJSONEncoder
+
+    from ats.charts import category_figure, skills_gap_figure
+    from ats.positions import JOB_POSITIONS
+
+    names = list(JOB_POSITIONS)
+    timings, digest = [], hashlib.sha256()
+    for i, (skills, _) in enumerate(_extracted(directory)):
+        job = JOB_POSITIONS[names[i % len(names)]]
+        start = time.perf_counter()
+        figures = [skills_gap_figure(skills, job), category_figure(skills)]
+        figures = [figure for figure in figures if figure is not None]
+        # Serializing is what Streamlit does with a figure before sending it
+        for figure in figures:
+            figure.to_json()
+        timings.append(time.perf_counter() - start)
+        data = [figure.to_plotly_json()["data"] for figure in figures]
+        digest.update(json.dumps(data, cls=PlotlyJSONEncoder, sort_keys=True).encode("utf-8"))
+    return timings, digest
+
+
+def _run_render_light(directory, cached=False):
+    import plotly.graph_objects  # noqa: F401
+    from plotly.utils import PlotlyJSONEncoder
+
+    from ats.charts import category_chart, gap_chart
+    from ats.positions import JOB_POSITIONS
+    from ats.scoring import calculate_skill_match
+
+    names = list(JOB_POSITIONS)
+    timings, digest = [], hashlib.sha256()
+    for i, (skills, years) in enumerate(_extracted(directory)):
+        name = names[i % len(names)]
+        job = JOB_POSITIONS[name]
+        match = calculate_skill_match(skills, job, years)
+        key = (str(i), "bench")
+        # A cached run renders each document once untimed, like the first script run of a session
+        for _ in range(2 if cached else 1):
+            start = time.perf_counter()
+            figures = [gap_chart(skills, job, match, key + (name,), "light"), category_chart(skills, key, "light")]
+            figures = [figure for figure in figures if figure is not None]
+            for figure in figures:
+                figure.to_json()
+            elapsed = time.perf_counter() - start
+        timings.append(elapsed)
+        data = [figure.to_plotly_json()["data"] for figure in figures]
+        digest.update(json.dumps(data, cls=PlotlyJSONEncoder, sort_keys=True).encode("utf-8"))
+    return timings, digest
+
+
+def run_stage(stage, directory):
+    """Time one stage over the corpus; meant to run in its own process"""
+    from bench_docx_extract import peak_rss_mb
+
+    if stage in ("extract_pdf", "extract_docx"):
+        timings, digest = _run_extract(directory, stage.split("_")[1])
+    elif stage == "skills_fuzzy":
+        timings, digest = _run_skills(directory, fuzzy=True)
+    elif stage == "render_cached":
+        timings, digest = _run_render_light(directory, cached=True)
+    else:
+        timings, digest = globals()["_run_" + stage](directory)
+    timings.sort()
+    total = sum(timings)
+    return {
+        "docs_per_sec": round(len(timings) / total, 1) if total else 0.0,
+        "p50_ms": round(timings[len(timings) // 2] * 1000, 3),
+        "p99_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.99))] * 1000, 3),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "digest": digest.hexdigest()[:16],
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Drift messages of ``results`` against a baseline run"""
+    problems = []
+    for stage, result in results.items():
+        expected = baseline["stages"].get(stage)
+        if expected is None:
+            continue
+        if result["digest"] != expected["digest"]:
+            problems.append(f"{stage}: results changed (digest {result['digest']}, baseline {expected['digest']})")
+        if result["docs_per_sec"] < expected["docs_per_sec"] * (1 - tolerance):
+            problems.append(f"{stage}: {result['docs_per_sec']} docs/sec, baseline {expected['docs_per_sec']}")
+        if result["peak_rss_mb"] > expected["peak_rss_mb"] * (1 + tolerance):
+            problems.append(f"{stage}: peak RSS {result['peak_rss_mb']} MB, baseline {expected['peak_rss_mb']} MB")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=200, help="resumes per format")
+    parser.add_argument("--words", type=int, default=400)
+    parser.add_argument("--skill-density", type=float, default=0.05)
+    parser.add_argument("--pages", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--baseline", help="JSON file of a previous run to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="write this run to --baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed throughput drop and peak RSS growth, as a fraction")
+    args = parser.parse_args()
+
+    corpus = {field: getattr(args, field) for field in CORPUS_FIELDS}
+    baseline = None
+    if args.baseline and not args.update_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline["corpus"] != corpus:
+            print(f"corpus settings differ from the baseline's: {baseline['corpus']}")
+            return 2
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for filename, data, _ in generate_corpus(args.docs, ("txt", "docx", "pdf"), args.words,
+                                                 args.skill_density, args.pages, args.seed):
+            with open(os.path.join(directory, filename), "wb") as f:
+                f.write(data)
+        context = multiprocessing.get_context("spawn")
+        for stage in args.stages:
+            # A fresh process per stage keeps imports and caches of earlier stages out of its RSS
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                results[stage] = pool.submit(run_stage, stage, directory).result()
+
+    print(f"{'stage':<14}{'docs/sec':>10}{'p50 ms':>10}{'p99 ms':>10}{'peak RSS MB':>13}  digest")
+    for stage, result in results.items():
+        print(f"{stage:<14}{result['docs_per_sec']:>10.1f}{result['p50_ms']:>10.3f}{result['p99_ms']:>10.3f}"
+              f"{result['peak_rss_mb']:>13.1f}  {result['digest']}")
+
+    if args.update_baseline and args.baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({"corpus": corpus, "stages": results}, f, indent=2)
+            f.write("\n")
+        print(f"baseline written to {args.baseline}")
+        return 0
+    if baseline is not None:
+        problems = compare(results, baseline, args.tolerance)
+        for problem in problems:
+            print("DRIFT", problem)
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
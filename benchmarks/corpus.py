@@ -0,0 +1,184 @@
+"""Generate a synthetic resume corpus in TXT, DOCX and PDF
+
+Resumes are built from the ``TECH_SKILLS`` vocabulary with the layout of the
+app's sample resumes: a summary with stated years, dated jobs with bullet
+points, a skills line and an education section. The same seed always gives
+the same texts, so benchmark results can be compared run to run.
+
+Run from the repository root:
+
+    python benchmarks/corpus.py /tmp/corpus --docs 1000 --formats txt docx pdf --pages 2
+"""
+import argparse
+import os
+import random
+import sys
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ats.skills import TECH_SKILLS  # noqa: E402
+
+FILLER = (
+    "built led designed scalable services team delivered platform customers reduced latency "
+    "improved reliability mentored engineers stakeholders pipelines reporting migration cloud "
+    "data production owned roadmap automated testing monitoring release shipped features"
+).split()
+TITLES = ["Software Engineer", "Senior Software Engineer", "Data Scientist", "DevOps Engineer",
+          "Backend Developer", "Full Stack Developer", "Machine Learning Engineer"]
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+FORMATS = ("txt", "docx", "pdf")
+
+# Characters per line and lines per page of the generated PDFs
+LINE_CHARS = 90
+PAGE_LINES = 60
+
+
+def _sentence(rng, words, skill_density):
+    """``words`` tokens where each one is a skill with probability ``skill_density``"""
+    tokens = [rng.choice(TECH_SKILLS) if rng.random() < skill_density else rng.choice(FILLER)
+              for _ in range(words)]
+    return " ".join(tokens).capitalize() + "."
+
+
+def make_resume(rng, words=400, skill_density=0.05, jobs=3):
+    """Text of one resume with about ``words`` words in its job descriptions"""
+    lines = [f"Candidate {rng.randint(1, 10 ** 6)}",
+             f"Email: candidate{rng.randint(1, 10 ** 6)}@example.com | Phone: (555) 010-{rng.randint(0, 9999):04d}",
+             "", "PROFESSIONAL SUMMARY",
+             f"{rng.choice(TITLES)} with {rng.randint(1, 15)}+ years of experience. "
+             + _sentence(rng, 20, skill_density), "", "EXPERIENCE"]
+    year = rng.randint(2000, 2016)
+    per_job = max(1, words // max(1, jobs))
+    for job in range(jobs):
+        end = year + rng.randint(1, 4)
+        last = job == jobs - 1
+        if rng.random() < 0.5:
+            dates = f"{rng.choice(MONTHS)} {year} - " + ("Present" if last else f"{rng.choice(MONTHS)} {end}")
+        else:
+            dates = f"{year}-" + ("Present" if last else str(end))
+        lines.append(f"{rng.choice(TITLES)} | Company {rng.randint(1, 999)} | {dates}")
+        remaining = per_job
+        while remaining > 0:
+            count = min(remaining, rng.randint(8, 16))
+            lines.append("- " + _sentence(rng, count, skill_density))
+            remaining -= count
+        year = end
+    lines += ["", "SKILLS", ", ".join(rng.sample(TECH_SKILLS, rng.randint(5, 15))),
+              "", "EDUCATION", f"B.S. Computer Science, State University, {year - 24}-{year - 20}"]
+    return "\n".join(lines)
+
+
+def make_txt(text):
+    return text.encode("utf-8")
+
+
+def make_docx(text):
+    """One paragraph per line, like a resume typed in Word"""
+    import docx
+
+    document = docx.Document()
+    for line in text.split("\n"):
+        document.add_paragraph(line)
+    buffer = BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def _wrap(line, width):
+    while len(line) > width:
+        cut = line.rfind(" ", 0, width)
+        cut = cut if cut > 0 else width
+        yield line[:cut]
+        line = line[cut:].lstrip()
+    yield line
+
+
+def _pdf_escape(line):
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(text, pages=1):
+    """Minimal text PDF with Helvetica lines spread over at least ``pages`` pages.
+
+    Written by hand rather than through a PDF library so the bytes are
+    deterministic and generating a large corpus takes seconds.
+    """
+    lines = [wrapped for line in text.split("\n") for wrapped in _wrap(line, LINE_CHARS)]
+    per_page = min(PAGE_LINES, max(1, -(-len(lines) // max(1, pages))))
+    chunks = [lines[i:i + per_page] for i in range(0, len(lines), per_page)] or [[]]
+    while len(chunks) < pages:
+        chunks.append([])
+
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"]
+    kids = []
+    for chunk in chunks:
+        body = ["BT /F1 10 Tf 12 TL 50 750 Td"]
+        body += [f"({_pdf_escape(line)}) '" for line in chunk]
+        body.append("ET")
+        stream = "\n".join(body).encode("cp1252", "replace")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /CropBox [0 0 612 792] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects))
+        kids.append(len(objects))
+    objects[1] = (b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % kid for kid in kids)
+                  + b"] /Count %d >>" % len(kids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def generate_corpus(docs, formats=FORMATS, words=400, skill_density=0.05, pages=1, seed=1):
+    """Yield ``(filename, bytes, text)`` for ``docs`` resumes in each format.
+
+    Every format carries the same texts, so ``resume_7.txt``,
+    ``resume_7.docx`` and ``resume_7.pdf`` should give the same skills.
+    """
+    rng = random.Random(seed)
+    for i in range(docs):
+        text = make_resume(rng, words, skill_density)
+        for kind in formats:
+            if kind == "txt":
+                data = make_txt(text)
+            elif kind == "docx":
+                data = make_docx(text)
+            elif kind == "pdf":
+                data = make_pdf(text, pages)
+            else:
+                raise ValueError(f"Unknown format: {kind}")
+            yield f"resume_{i}.{kind}", data, text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("directory", help="where to write the corpus")
+    parser.add_argument("--docs", type=int, default=1000, help="resumes per format")
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--words", type=int, default=400, help="words of job descriptions per resume")
+    parser.add_argument("--skill-density", type=float, default=0.05,
+                        help="share of description words that are skills")
+    parser.add_argument("--pages", type=int, default=1, help="minimum pages per PDF")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    os.makedirs(args.directory, exist_ok=True)
+    total = 0
+    for filename, data, _ in generate_corpus(args.docs, args.formats, args.words, args.skill_density,
+                                             args.pages, args.seed):
+        with open(os.path.join(args.directory, filename), "wb") as f:
+            f.write(data)
+        total += len(data)
+    print(f"wrote {args.docs * len(args.formats)} files ({total / 1e6:.1f} MB) to {args.directory}")
+
+
+if __name__ == "__main__":
+    main()
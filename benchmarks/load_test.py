@@ -0,0 +1,185 @@
+"""Benchmark upload latency of concurrent sessions sharing one server
+
+Simulates ``--sessions`` browser sessions of one deployment. Heavy sessions
+(recruiting teams screening a batch) each submit ``--heavy-docs`` multi-page
+PDFs at once through ``screen_resumes``; light sessions upload one small
+resume at a time, ``--think`` seconds apart, and wait for its analysis.
+Every mode processes the same documents with fresh caches:
+
+- ``separate``: how the app runs without server mode. Each batch starts a
+  process pool of its own next to the shared upload queue, so the pools
+  compete for the same CPUs.
+- ``shared``: every session goes through one ``JobQueue`` as the same
+  tenant, first come first served.
+- ``fair``: one ``JobQueue`` with a tenant per session, dispatched
+  round-robin (``ATS_SERVER_MODE``), optionally with
+  ``--tenant-max-running``.
+
+The report has p50/p99 latency of light uploads (submit to result) and of
+heavy documents (batch start to row), plus the wall time of the mode. With
+``--repeats`` every mode runs once per seed (``--seed``, ``--seed`` + 1, ...),
+in a rotated order so no mode always goes first, and the summary gives the
+median and range of each column. With few light uploads the p99 is close to
+the maximum of a handful of samples and moves a lot between runs, on a
+single CPU especially; compare medians over several seeds before drawing
+conclusions.
+
+Run from the repository root:
+
+    python benchmarks/load_test.py --sessions 8 --heavy-sessions 2
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import generate_corpus  # noqa: E402
+
+MODES = ("separate", "shared", "fair")
+
+
+def _percentile(values, fraction):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def _documents(args, seed):
+    """(heavy batches, light uploads) of every session, each document unique"""
+    heavy = []
+    for session in range(args.heavy_sessions):
+        heavy.append([(f"heavy{session}_{name}", data) for name, data, _ in
+                      generate_corpus(args.heavy_docs, ("pdf",), args.heavy_words, pages=args.heavy_pages,
+                                      seed=seed * 1000 + session)])
+    light = []
+    for session in range(args.sessions - args.heavy_sessions):
+        light.append([(f"light{session}_{name}", data) for name, data, _ in
+                      generate_corpus(args.uploads, ("pdf",), 400, pages=1,
+                                      seed=seed * 1000 + 500 + session)])
+    return heavy, light
+
+
+def _wait(job_queue, job):
+    done = threading.Event()
+    job_queue.add_done_callback(job, lambda _: done.set())
+    done.wait()
+
+
+def _light_session(job_queue, tenant, uploads, think, latencies):
+    from ats.jobs import QueueFull
+
+    for filename, data in uploads:
+        time.sleep(think)
+        start = time.perf_counter()
+        while True:
+            try:
+                job = job_queue.submit(data, filename, "application/pdf", tenant=tenant)
+                break
+            except QueueFull:
+                # What the page does: tell the user and let them retry
+                time.sleep(0.25)
+        _wait(job_queue, job)
+        latencies.append(time.perf_counter() - start)
+
+
+def _heavy_session(job_queue, tenant, files, position, workers, latencies):
+    from ats.batch import screen_resumes
+
+    start = time.perf_counter()
+    queue = job_queue if tenant is not None else None
+    for row in screen_resumes(files, position, max_workers=workers, job_queue=queue, tenant=tenant):
+        if row.get("error"):
+            raise RuntimeError(f"{row['filename']}: {row['error']}")
+        latencies.append(time.perf_counter() - start)
+
+
+def run_mode(mode, heavy, light, args, seed):
+    from ats.cache import ResumeCache
+    from ats.jobs import DEFAULT_TENANT, JobQueue
+    from ats.positions import get_position_catalog
+
+    position = next(iter(get_position_catalog().positions.values()))
+    job_queue = JobQueue(max_workers=args.workers, max_pending=args.max_pending, cache=ResumeCache(),
+                         tenant_max_running=args.tenant_max_running if mode == "fair" else None)
+    try:
+        # Start the workers and import the extraction stack before timing
+        _, warmup, _ = next(generate_corpus(1, ("pdf",), seed=seed + 7))
+        for slot in range(args.workers):
+            _wait(job_queue, job_queue.submit(warmup + b" " * slot, f"warmup_{slot}.pdf", "application/pdf"))
+
+        light_latencies, heavy_latencies = [], []
+        threads = []
+        for session, files in enumerate(heavy):
+            tenant = {"separate": None, "shared": DEFAULT_TENANT}.get(mode, f"heavy{session}")
+            threads.append(threading.Thread(target=_heavy_session, args=(job_queue, tenant, files, position,
+                                                                         args.workers, heavy_latencies)))
+        for session, uploads in enumerate(light):
+            tenant = f"light{session}" if mode == "fair" else DEFAULT_TENANT
+            threads.append(threading.Thread(target=_light_session,
+                                            args=(job_queue, tenant, uploads, args.think, light_latencies)))
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - start
+    finally:
+        job_queue.shutdown()
+    return {"light": light_latencies, "heavy": heavy_latencies, "wall": wall}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=8, help="concurrent sessions, heavy ones included")
+    parser.add_argument("--heavy-sessions", type=int, default=2)
+    parser.add_argument("--heavy-docs", type=int, default=24, help="PDFs in each heavy session's batch")
+    parser.add_argument("--heavy-pages", type=int, default=6)
+    parser.add_argument("--heavy-words", type=int, default=1500)
+    parser.add_argument("--uploads", type=int, default=4, help="uploads of each light session")
+    parser.add_argument("--think", type=float, default=0.5, help="seconds between a light session's uploads")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-pending", type=int, default=32)
+    parser.add_argument("--tenant-max-running", type=int, default=None, help="quota of the fair mode")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--seed", type=int, default=1, help="seed of the first run")
+    parser.add_argument("--repeats", type=int, default=1, help="runs of every mode, one seed each")
+    args = parser.parse_args()
+    if not 0 <= args.heavy_sessions <= args.sessions:
+        parser.error("--heavy-sessions must be between 0 and --sessions")
+    if args.repeats < 1:
+        parser.error("--repeats must be at least 1")
+
+    print(f"{args.sessions} sessions ({args.heavy_sessions} heavy x {args.heavy_docs} PDFs of "
+          f"{args.heavy_pages} pages, {args.sessions - args.heavy_sessions} light x {args.uploads} uploads), "
+          f"{args.workers} workers, {args.repeats} run(s) per mode")
+    print(f"{'mode':<10}{'seed':>5}{'light p50':>11}{'light p99':>11}{'heavy p50':>11}{'heavy p99':>11}{'wall':>9}")
+    runs = {mode: [] for mode in args.modes}
+    for repeat in range(args.repeats):
+        seed = args.seed + repeat
+        heavy, light = _documents(args, seed)
+        shift = repeat % len(args.modes)
+        for mode in args.modes[shift:] + args.modes[:shift]:
+            result = run_mode(mode, heavy, light, args, seed)
+            row = [_percentile(result[kind], fraction) for kind in ("light", "heavy") for fraction in (0.5, 0.99)]
+            runs[mode].append(row + [result["wall"]])
+            print(f"{mode:<10}{seed:>5}" + "".join(f"{value:>10.2f}s" for value in row) + f"{result['wall']:>8.1f}s")
+
+    if args.repeats > 1:
+        print("\nmedian [min-max] over all runs")
+        print(f"{'mode':<10}" + "".join(f"{name:>20}" for name in ("light p50", "light p99", "heavy p50",
+                                                                   "heavy p99", "wall")))
+        for mode, rows in runs.items():
+            cells = []
+            for column in zip(*rows):
+                cells.append(f"{statistics.median(column):.2f} [{min(column):.2f}-{max(column):.2f}]")
+            print(f"{mode:<10}" + "".join(f"{cell:>20}" for cell in cells))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+import datetime
+
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+from ats.results import get_result_log, positions_summary, results_dir, score_histogram, skill_gap_stats
+
+st.set_page_config(
+    page_title="Screening Analytics",
+    page_icon="📊",
+    layout="wide"
+)
+
+st.title("Screening Analytics")
+st.markdown("Skill gaps and score distributions across every screening recorded in the results dataset.")
+
+# Make the latest screenings of this server visible
+get_result_log().flush()
+directory = results_dir()
+
+date_col, position_col = st.columns([1, 2])
+with date_col:
+    today = datetime.date.today()
+    date_range = st.date_input("Screened between", value=(today - datetime.timedelta(days=30), today))
+since, until = (date_range[0], date_range[-1]) if date_range else (None, None)
+
+summary = positions_summary(directory, since, until)
+if not summary:
+    st.info("No screenings recorded in this period yet. Results appear here once resumes are scored.")
+    st.stop()
+
+with position_col:
+    position = st.selectbox(
+        "Position",
+        options=[""] + [row["position"] for row in summary],
+        format_func=lambda name: name or "All positions"
+    )
+
+screenings, missing = skill_gap_stats(directory, position or None, since, until)
+
+metric_col1, metric_col2, metric_col3 = st.columns(3)
+metric_col1.metric("Screenings", f"{screenings:,}")
+metric_col2.metric("Positions", f"{len(summary):,}")
+metric_col3.metric("Most missed skill", missing.most_common(1)[0][0] if missing else "-")
+
+chart_col1, chart_col2 = st.columns(2)
+
+with chart_col1:
+    if missing:
+        df_missing = pd.DataFrame(missing.most_common(15), columns=["Skill", "Missing"])
+        df_missing["Missing %"] = df_missing["Missing"] / screenings * 100
+        fig = px.bar(
+            df_missing,
+            x="Missing %",
+            y="Skill",
+            orientation="h",
+            title="Most Frequently Missing Required Skills",
+            template="plotly_dark"
+        )
+        fig.update_layout(yaxis={"categoryorder": "total ascending"})
+        st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.success("No required skills were missing in these screenings.")
+
+with chart_col2:
+    counts = score_histogram(directory, position or None, since, until)
+    df_scores = pd.DataFrame({
+        "Overall Score": [f"{band * 10}-{band * 10 + 10}%" for band in range(len(counts))],
+        "Resumes": counts
+    })
+    fig = px.bar(df_scores, x="Overall Score", y="Resumes", title="Overall Score Distribution",
+                 template="plotly_dark")
+    st.plotly_chart(fig, use_container_width=True)
+
+st.markdown("### Screenings by Position")
+df_summary = pd.DataFrame(summary)
+df_summary["mean_score"] = df_summary["mean_score"].round(1)
+df_summary["best_score"] = df_summary["best_score"].round(1)
+st.dataframe(df_summary, use_container_width=True, hide_index=True)